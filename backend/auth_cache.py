@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+# 인증된 사용자의 최소 정보 (소유권 검사에는 id만 있으면 충분합니다)
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    username: str
+
+
+class PrincipalCache:
+    """
+    토큰 subject -> Principal 을 저장하는 TTL + LRU 캐시입니다.
+    - 최대 max_size 개까지만 보관하고, 넘치면 가장 오래 사용하지 않은 항목부터 버립니다.
+    - 각 항목의 만료 시각은 (지금 + ttl)과 토큰의 exp 중 더 이른 시각입니다.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 10.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[Principal, float]]" = OrderedDict()
+        # 동기 엔드포인트는 스레드풀에서 실행되므로 잠금이 필요합니다.
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Principal | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return principal
+
+    def set(self, subject: str, principal: Principal, token_exp: float | None = None):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        # (중요) 캐시 항목이 토큰보다 오래 살아남지 않도록 합니다.
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._entries[subject] = (principal, expires_at)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        """사용자가 수정/삭제되었을 때 해당 사용자의 항목을 모두 제거합니다."""
+        with self._lock:
+            stale = [key for key, (principal, _) in self._entries.items() if principal.id == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,216 @@
+"""
+실시간 알림(WebSocket /ws/trips/{trip_id}) 벤치마크
+
+한 워커(프로세스)에 구독자 N개(기본 5,000)를 연결해 두고, 일정 수정(PUT /api/items/{id})을 반복하며
+- 연결 비용 (연결 시간, 구독자당 메모리 증가량)
+- 쓰기 요청 시작부터 각 구독자가 이벤트를 받기까지의 전달 지연 (p50/p95/p99/max)
+- 구독자가 많을 때 쓰기 요청 자체의 지연
+을 JSON으로 출력합니다.
+
+구독자는 네트워크 없이 실제 앱의 WebSocket 엔드포인트를 ASGI로 직접 호출합니다. (인증/소유권 확인/허브 모두 실제 코드)
+(파일 디스크립터 제한 없이 5,000개를 열 수 있으며, 네트워크 송신 비용은 포함되지 않습니다)
+
+    cd backend
+    python -m benchmarks.live_updates --subscribers 5000 --trips 1 --events 20
+    python -m benchmarks.live_updates --subscribers 5000 --trips 100 --events 20   # 여행 100개에 나누어 구독
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@lru_cache(maxsize=64)
+def parse_event(text: str) -> dict:
+    """(모든 구독자가 같은 문자열을 받으므로 한 번만 파싱하여 측정 쪽 비용을 줄입니다)"""
+    return json.loads(text)
+
+
+class AsgiWebSocket:
+    """앱의 WebSocket 엔드포인트에 연결하는 최소한의 ASGI 클라이언트"""
+
+    def __init__(self, app, path: str, query: str, on_message):
+        self.on_message = on_message
+        self.subscribed = asyncio.Event()
+        self.close_code = None
+        self._connected = False
+        self._disconnect = asyncio.Event()
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "ws",
+            "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+            "headers": [], "subprotocols": [], "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+        }
+        self.task = asyncio.create_task(app(scope, self._receive, self._send))
+
+    async def _receive(self):
+        if not self._connected:
+            self._connected = True
+            return {"type": "websocket.connect"}
+        await self._disconnect.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def _send(self, message):
+        if message["type"] == "websocket.send":
+            event = parse_event(message["text"])
+            if event["type"] == "subscribed":
+                self.subscribed.set()
+            else:
+                self.on_message(event)
+        elif message["type"] == "websocket.close":
+            self.close_code = message.get("code")
+            self.subscribed.set()
+
+    async def close(self):
+        self._disconnect.set()
+        await self.task
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentiles(values: list[float]) -> dict:
+    values = sorted(values)
+    if not values:
+        return {}
+    pick = lambda fraction: values[min(len(values) - 1, int(fraction * len(values)))]
+    return {
+        "p50": round(pick(0.50), 2),
+        "p95": round(pick(0.95), 2),
+        "p99": round(pick(0.99), 2),
+        "max": round(values[-1], 2),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import insert, select
+
+    import database
+    import main
+    import models
+
+    app = main.create_app()
+    engine = database.get_engine()
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "live@example.com", "username": "live", "hashed_password": "-"}])
+        user_id = conn.scalar(select(models.User.id))
+        conn.execute(insert(models.Trip), [{"owner_id": user_id, "title": f"여행 {n}"} for n in range(args.trips)])
+        trip_ids = conn.scalars(select(models.Trip.id).order_by(models.Trip.id)).all()
+        conn.execute(insert(models.ItineraryItem), [
+            {"trip_id": trip_id, "day": 1, "order_sequence": 1, "place_name": "장소"} for trip_id in trip_ids
+        ])
+        item_ids = dict(conn.execute(select(models.ItineraryItem.trip_id, models.ItineraryItem.id)).all())
+    token = main.create_access_token({"sub": "live@example.com", "uid": user_id})
+
+    # (ASGI로 직접 호출하면 lifespan이 실행되지 않으므로 직접 실행합니다. 끝나면 엔진도 정리됩니다)
+    async with app.router.lifespan_context(app):
+        # 구독자별로 받은 이벤트 수 (trip_id, version) -> 받은 시각 목록
+        received: dict[tuple[int, int], list[float]] = {}
+
+        def on_message(event):
+            received.setdefault((event["trip_id"], event["version"]), []).append(time.perf_counter())
+
+        # 1. 연결
+        gc.collect()
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        sockets = []
+        for index in range(args.subscribers):
+            trip_id = trip_ids[index % len(trip_ids)]
+            sockets.append(AsgiWebSocket(app, f"/ws/trips/{trip_id}", f"token={token}", on_message))
+            if len(sockets) % 500 == 0:
+                await asyncio.gather(*(socket.subscribed.wait() for socket in sockets[-500:]))
+        await asyncio.gather(*(socket.subscribed.wait() for socket in sockets))
+        connect_seconds = time.perf_counter() - start
+        failed = sum(1 for socket in sockets if socket.close_code is not None)
+
+        # (연결만 해 둔 채 잠시 쉬게 한 뒤 메모리를 잽니다)
+        await asyncio.sleep(args.idle_seconds)
+        gc.collect()
+        rss_idle = rss_mb()
+
+        # 2. 이벤트 전달 지연: 여행을 차례로 돌며 일정을 수정하고, 그 여행의 구독자가 모두 받을 때까지 기다립니다.
+        per_trip = {trip_id: 0 for trip_id in trip_ids}
+        for index in range(args.subscribers):
+            per_trip[trip_ids[index % len(trip_ids)]] += 1
+        delivery_ms, write_ms, timeouts = [], [], 0
+        headers = {"Authorization": f"Bearer {token}"}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            for number in range(args.events):
+                trip_id = trip_ids[number % len(trip_ids)]
+                sent_at = time.perf_counter()
+                response = await client.put(f"/api/items/{item_ids[trip_id]}", json={"memo": f"수정 {number}"}, headers=headers)
+                write_ms.append((time.perf_counter() - sent_at) * 1000)
+                response.raise_for_status()
+                version = (await client.get(f"/api/trips/{trip_id}", headers=headers)).json()["version"]
+                deadline = time.perf_counter() + args.timeout
+                while len(received.get((trip_id, version), ())) < per_trip[trip_id] and time.perf_counter() < deadline:
+                    await asyncio.sleep(0.001)
+                arrivals = received.get((trip_id, version), [])
+                timeouts += per_trip[trip_id] - len(arrivals)
+                delivery_ms += [(arrival - sent_at) * 1000 for arrival in arrivals]
+
+        # 3. 정리
+        for socket in sockets:
+            socket._disconnect.set()
+        await asyncio.gather(*(socket.task for socket in sockets), return_exceptions=True)
+        remaining = len(main.live_hub)
+
+    return {
+        "config": vars(args),
+        "connect": {
+            "subscribers": args.subscribers,
+            "failed": failed,
+            "seconds": round(connect_seconds, 2),
+            "per_second": round(args.subscribers / connect_seconds, 1),
+        },
+        "memory": {
+            "rss_before_mb": round(rss_before, 1),
+            "rss_idle_mb": round(rss_idle, 1),
+            "per_subscriber_kb": round((rss_idle - rss_before) * 1024 / max(1, args.subscribers), 2),
+        },
+        "delivery_ms": {"deliveries": len(delivery_ms), "timeouts": timeouts, **percentiles(delivery_ms)},
+        "write_ms": percentiles(write_ms),
+        "subscribers_left_after_close": remaining,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench-live.db", help="(테이블을 지우고 다시 만듭니다)")
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--trips", type=int, default=1, help="구독자를 나누어 붙일 여행 수")
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--idle-seconds", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=10.0, help="이벤트 하나를 모두 받을 때까지 기다리는 최대 시간")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("LIVE_MAX_SUBSCRIBERS", str(args.subscribers))
+    # (연결이 몰릴 때 커넥션 풀 대기로 느린 쿼리 로그가 쏟아지지 않도록)
+    os.environ.setdefault("SLOW_QUERY_MS", "0")
+
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,673 @@
+"""
+부하 테스트 / 벤치마크
+
+로컬 DB(SQLite 파일 또는 로컬 Postgres)에 사용자/여행/일정을 채운 뒤, 실제 FastAPI 앱에
+회원가입, 로그인, 여행 목록, 여행 상세, 일정 생성/수정/삭제, 일괄 재정렬 요청을 동시에 보내고
+시나리오별 처리량, 지연 시간(p50/p95/p99), 요청당 DB 쿼리 수(Server-Timing 헤더, 스트리밍인 내보내기는 /metrics)를 JSON으로 출력합니다.
+같은 옵션으로 다시 실행하면 같은 데이터가 만들어지므로, 결과 JSON을 커밋 전/후로 비교할 수 있습니다.
+
+    cd backend
+
+    # (기본) httpx ASGI transport로 같은 프로세스 안에서 앱을 호출합니다. (네트워크 없이 실행)
+    python -m benchmarks.load --database-url sqlite:///./bench.db --users 20 --trips-per-user 10 \\
+        --items-per-trip 30 --concurrency 10 --requests 200 --output bench-result.json
+
+    # 로컬 uvicorn 서버 대상: 먼저 시딩만 하고, 같은 DB로 서버를 띄운 뒤 --base-url로 실행합니다.
+    python -m benchmarks.load --database-url sqlite:///./bench.db --seed-only
+    DATABASE_URL=sqlite:///./bench.db RATE_LIMIT_ENABLED=false uvicorn main:create_app --factory --port 8000
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --no-seed
+
+    # 기본 시나리오 외에 위치 검색/검색/동선/내보내기도 측정할 수 있습니다.
+    python -m benchmarks.load --scenarios search,item_search,trip_route,export --items-per-trip 500
+
+    # 일정 N개 추가: 일괄 추가 요청 1번(items_batch)과 단건 추가 N번(items_single)을 나란히 잽니다.
+    python -m benchmarks.load --scenarios items_batch --batch-size 100
+
+    # 로그인(비밀번호 해싱)이 몰리는 동안의 읽기 지연: 로그인과 여행 목록/상세 요청을 동시에 보냅니다.
+    # (해싱 프로세스 풀을 끈 경우와 비교: PASSWORD_HASH_WORKERS=0 python -m benchmarks.load ...)
+    python -m benchmarks.load --scenarios login_with_reads --concurrency 50
+
+    # 설정/인덱스를 바꿔 가며 같은 시나리오를 비교합니다. (--compare, ASGI 모드 전용, 결과: variants.{이름})
+    python -m benchmarks.load --compare principal_cache --scenarios list_trips,trip_detail        # 사용자 캐시 on/off
+    python -m benchmarks.load --compare geo_index --scenarios item_search \\
+        --users 10 --trips-per-user 100 --items-per-trip 1000                                     # 일정 100만 개: 지오해시 인덱스 vs 전체 스캔
+    python -m benchmarks.load --compare search_backend --scenarios search \\
+        --users 2 --trips-per-user 100 --items-per-trip 1000                                      # 사용자당 일정 10만 개: SQL vs 메모리 인덱스
+
+    # 일괄 재정렬할 일정 수별로 잽니다. (사용자마다 1일차 일정이 N개인 여행을 만들어 사용하고 끝나면 삭제)
+    python -m benchmarks.load --scenarios bulk_reorder --reorder-sizes 10,100,1000
+
+    # 동기/비동기 비교: 같은 쿼리를 동기 엔드포인트(def + 동기 Session, 스레드풀)로 처리하는 *_sync 시나리오와
+    # 비동기 엔드포인트를 동시 요청 수별로 잽니다. (ASGI 모드 전용, benchmarks/sync_endpoints.py)
+    python -m benchmarks.load --scenarios list_trips,list_trips_sync,trip_detail,trip_detail_sync \\
+        --concurrency-levels 50,200,1000 --requests 3000
+
+(주의) 시딩할 때 --database-url 의 테이블을 모두 지우고 다시 만듭니다. 운영 DB를 지정하지 마세요.
+"""
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+# (python benchmarks/load.py 로 실행해도 backend 모듈을 찾도록 합니다.
+#  설정을 읽는 모듈(settings, database, main 등)은 main()에서 환경 변수를 넣은 뒤에 임포트합니다)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testing_utils import asgi_stream, rss_mb
+
+BENCH_PASSWORD = "benchmark-password"
+PLACE_WORDS = ["제주", "서울", "부산", "강릉", "경주", "전주", "여수", "카페", "시장", "해변", "박물관", "공원", "맛집", "호텔"]
+SEED_CHUNK_SIZE = 10000
+
+DEFAULT_SCENARIOS = ["register", "login", "list_trips", "trip_detail", "item_crud", "bulk_reorder"]
+EXTRA_SCENARIOS = ["item_search", "search", "trip_route", "export", "items_batch", "login_with_reads"]
+# 지연 시간을 성공한 요청만으로 계산하는 시나리오. (SQLite에서는 동시 쓰기가 잠금 경합으로 500이 나는데,
+# 실패한 실행의 시간이 섞이면 일괄/단건 비교가 왜곡됩니다. 실패 수는 errors로 따로 보고합니다)
+ERRORS_EXCLUDED_FROM_LATENCY = {"items_batch"}
+# (동기/비동기 비교용, ASGI 모드 전용) benchmarks/sync_endpoints.py 의 동기 엔드포인트
+SYNC_SCENARIOS = ["list_trips_sync", "trip_detail_sync"]
+
+REORDER_CHUNK_SIZE = 500    # (--reorder-sizes 여행을 만들 때 일괄 추가 요청 하나의 일정 수, MAX_BATCH_ITEMS 이하)
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+SYNC_PREFIX = "/sync"   # (benchmarks/sync_endpoints.PREFIX)
+
+
+# --- 시딩 ---
+
+def seed_database(database, models, password_hash: str, args, rng: random.Random) -> dict:
+    """테이블을 다시 만들고 사용자/여행/일정을 Core 일괄 INSERT로 채웁니다."""
+    from sqlalchemy import insert, select
+
+    start = time.perf_counter()
+    engine = database.get_engine()
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"email": f"bench{index}@example.com", "username": f"bench{index}", "hashed_password": password_hash}
+            for index in range(args.users)
+        ])
+        user_ids = conn.scalars(select(models.User.id).order_by(models.User.id)).all()
+
+        trips = []
+        for user_id in user_ids:
+            for number in range(args.trips_per_user):
+                start_date = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+                trips.append({
+                    "owner_id": user_id,
+                    "title": f"{rng.choice(PLACE_WORDS)} 여행 {number + 1}",
+                    "start_date": start_date,
+                    "end_date": start_date + timedelta(days=args.days_per_trip - 1),
+                })
+        for offset in range(0, len(trips), SEED_CHUNK_SIZE):
+            conn.execute(insert(models.Trip), trips[offset:offset + SEED_CHUNK_SIZE])
+        trip_ids = conn.scalars(select(models.Trip.id).order_by(models.Trip.id)).all()
+
+        items_per_day = max(1, -(-args.items_per_trip // args.days_per_trip))
+        batch = []
+        for trip_id in trip_ids:
+            center_lat, center_lng = 33.2 + rng.random() * 4.5, 126.2 + rng.random() * 3.2
+            for index in range(args.items_per_trip):
+                batch.append({
+                    "trip_id": trip_id,
+                    "day": index // items_per_day + 1,
+                    "order_sequence": index % items_per_day + 1,
+                    "place_name": f"{rng.choice(PLACE_WORDS)} {rng.choice(PLACE_WORDS)} {index}",
+                    "address": f"{rng.choice(PLACE_WORDS)}시 {rng.randrange(1, 300)}번길",
+                    "memo": rng.choice([None, "예약 필요", "사진 찍기", "점심"]),
+                    "latitude": center_lat + rng.uniform(-0.05, 0.05),
+                    "longitude": center_lng + rng.uniform(-0.05, 0.05),
+                })
+                if len(batch) >= SEED_CHUNK_SIZE:
+                    conn.execute(insert(models.ItineraryItem), batch)
+                    batch = []
+        if batch:
+            conn.execute(insert(models.ItineraryItem), batch)
+
+    return {
+        "users": args.users,
+        "trips": len(trip_ids),
+        "items": len(trip_ids) * args.items_per_trip,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+# --- 측정 ---
+
+@dataclass
+class Record:
+    label: str
+    seconds: float
+    status: int
+    queries: int | None
+
+
+@dataclass
+class Variant:
+    """--compare 의 비교 대상 하나"""
+    env: dict = field(default_factory=dict)                 # 덮어쓸 설정 (환경 변수 이름)
+    drop_indexes: list = field(default_factory=list)        # 실행하는 동안 지울 인덱스 (끝나면 다시 만듭니다)
+
+
+# --compare 이름 -> {variant 이름: Variant}
+COMPARISONS = {
+    # 인증마다 사용자 행을 조회하는 경우와 비교 (PRINCIPAL_CACHE_TTL_SECONDS=0 이면 캐시하지 않음)
+    "principal_cache": {"on": Variant(), "off": Variant(env={"PRINCIPAL_CACHE_TTL_SECONDS": "0"})},
+    # 위치 검색: 지오해시 인덱스가 없으면 사용자의 일정을 모두 읽어 위경도로 거릅니다.
+    "geo_index": {"index": Variant(), "full_scan": Variant(drop_indexes=["ix_itinerary_items_geohash"])},
+    # 검색: SQL 점수 계산과 (사용자별) 메모리 인덱스
+    "search_backend": {
+        "sql": Variant(env={"SEARCH_BACKEND": "sql"}),
+        "memory": Variant(env={"SEARCH_BACKEND": "memory"}),
+    },
+}
+
+
+@dataclass
+class UserContext:
+    email: str
+    headers: dict
+    trip_ids: list[int] = field(default_factory=list)
+    reorder_trip_id: int | None = None
+    reorder_item_ids: list[int] = field(default_factory=list)
+
+
+def queries_of(headers) -> int | None:
+    match = SERVER_TIMING_QUERIES.search(headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+
+async def timed(client, records: list[Record], label: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    records.append(Record(label, time.perf_counter() - start, response.status_code, queries_of(response.headers)))
+    return response
+
+
+class Scenarios:
+    """시나리오 이름 -> 한 번의 작업 (작업 하나가 요청 여러 개를 보낼 수 있습니다)"""
+
+    def __init__(self, client, app, rng: random.Random, batch_size: int = 50):
+        self.client = client
+        self.app = app      # ASGI 모드일 때만 (내보내기 메모리 측정)
+        self.rng = rng
+        self._register_counter = itertools.count()
+        self._run_id = f"{int(time.time())}{os.getpid()}"
+        self.export_bytes = 0
+        self.batch_size = batch_size
+
+    async def register(self, ctx: UserContext, records):
+        number = next(self._register_counter)
+        await timed(self.client, records, "register", "POST", "/api/auth/register", json={
+            "email": f"load{self._run_id}-{number}@example.com",
+            "username": f"load{number}",
+            "password": BENCH_PASSWORD,
+        })
+
+    async def login(self, ctx: UserContext, records):
+        await timed(self.client, records, "login", "POST", "/api/auth/login",
+                    data={"username": ctx.email, "password": BENCH_PASSWORD})
+
+    async def login_with_reads(self, ctx: UserContext, records):
+        """로그인 1번과 읽기(여행 목록, 여행 상세) 2번을 동시에 보냅니다. (읽기는 "read" 하나로 집계)"""
+        trip_id = self.rng.choice(ctx.trip_ids)
+        await asyncio.gather(
+            self.login(ctx, records),
+            timed(self.client, records, "read", "GET", "/api/trips", headers=ctx.headers),
+            timed(self.client, records, "read", "GET", f"/api/trips/{trip_id}", headers=ctx.headers),
+        )
+
+    async def list_trips(self, ctx: UserContext, records):
+        await timed(self.client, records, "list_trips", "GET", "/api/trips", headers=ctx.headers)
+
+    async def trip_detail(self, ctx: UserContext, records):
+        trip_id = self.rng.choice(ctx.trip_ids)
+        await timed(self.client, records, "trip_detail", "GET", f"/api/trips/{trip_id}", headers=ctx.headers)
+
+    async def list_trips_sync(self, ctx: UserContext, records):
+        await timed(self.client, records, "list_trips_sync", "GET", f"{SYNC_PREFIX}/api/trips", headers=ctx.headers)
+
+    async def trip_detail_sync(self, ctx: UserContext, records):
+        trip_id = self.rng.choice(ctx.trip_ids)
+        await timed(self.client, records, "trip_detail_sync", "GET", f"{SYNC_PREFIX}/api/trips/{trip_id}",
+                    headers=ctx.headers)
+
+    async def item_crud(self, ctx: UserContext, records):
+        trip_id = self.rng.choice(ctx.trip_ids)
+        response = await timed(self.client, records, "item_create", "POST", f"/api/trips/{trip_id}/items",
+                               headers=ctx.headers,
+                               json={"day": 1, "order_sequence": 999, "place_name": "부하 테스트", "memo": "생성"})
+        if response.status_code != 201:
+            return
+        item_id = response.json()["id"]
+        await timed(self.client, records, "item_update", "PUT", f"/api/items/{item_id}",
+                    headers=ctx.headers, json={"memo": "수정"})
+        await timed(self.client, records, "item_delete", "DELETE", f"/api/items/{item_id}", headers=ctx.headers)
+
+    async def items_batch(self, ctx: UserContext, records):
+        """
+        일정 batch_size개를 일괄 추가 요청 1번(items_batch)과 단건 추가 요청 batch_size번(items_single)으로 각각 추가합니다.
+        items_single은 batch_size번을 이어서 보낸 전체 시간을 기록 하나로 남깁니다. (쿼리 수는 합계)
+        (측정하지 않는) 빈 여행을 만들어 사용하고 끝나면 삭제하므로, 다른 시나리오의 데이터는 바뀌지 않습니다.
+        """
+        items = [
+            {"day": 1, "order_sequence": index + 1, "place_name": f"일괄 추가 {index}", "memo": "부하 테스트"}
+            for index in range(self.batch_size)
+        ]
+        for label in ("items_batch", "items_single"):
+            response = await self.client.post("/api/trips", headers=ctx.headers, json={"title": "부하 테스트 (일괄 추가)"})
+            if response.status_code != 201:
+                records.append(Record(label, 0.0, response.status_code, None))
+                continue
+            trip_id = response.json()["id"]
+            if label == "items_batch":
+                await timed(self.client, records, label, "POST", f"/api/trips/{trip_id}/items:batch",
+                            headers=ctx.headers, json=items)
+            else:
+                start, worst_status, queries = time.perf_counter(), 0, 0
+                for item in items:
+                    response = await self.client.post(f"/api/trips/{trip_id}/items", headers=ctx.headers, json=item)
+                    worst_status = max(worst_status, response.status_code)
+                    queries += queries_of(response.headers) or 0
+                records.append(Record(label, time.perf_counter() - start, worst_status, queries))
+            await self.client.delete(f"/api/trips/{trip_id}", headers=ctx.headers)
+
+    async def bulk_reorder(self, ctx: UserContext, records):
+        if not ctx.reorder_item_ids:
+            return
+        ctx.reorder_item_ids.reverse()
+        updates = [{"id": item_id, "order_sequence": index + 1} for index, item_id in enumerate(ctx.reorder_item_ids)]
+        await timed(self.client, records, "bulk_reorder", "POST",
+                    f"/api/items/reorder?trip_id={ctx.reorder_trip_id}&day=1", headers=ctx.headers, json=updates)
+
+    async def item_search(self, ctx: UserContext, records):
+        lat, lng = 33.2 + self.rng.random() * 4.5, 126.2 + self.rng.random() * 3.2
+        await timed(self.client, records, "item_search", "GET", "/api/items/search",
+                    headers=ctx.headers, params={"near": f"{lat},{lng}", "radius": 20000})
+
+    async def search(self, ctx: UserContext, records):
+        await timed(self.client, records, "search", "GET", "/api/search",
+                    headers=ctx.headers, params={"q": self.rng.choice(PLACE_WORDS)})
+
+    async def trip_route(self, ctx: UserContext, records):
+        trip_id = self.rng.choice(ctx.trip_ids)
+        await timed(self.client, records, "trip_route", "GET", f"/api/trips/{trip_id}/route", headers=ctx.headers)
+
+    async def export(self, ctx: UserContext, records):
+        start = time.perf_counter()
+        if self.app is not None:
+            status, headers, size = await asgi_stream(self.app, "/api/trips/export", "format=ndjson", ctx.headers)
+        else:
+            async with self.client.stream("GET", "/api/trips/export", headers=ctx.headers,
+                                          params={"format": "ndjson"}) as response:
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                status, headers = response.status_code, response.headers
+        self.export_bytes += size
+        # (Server-Timing은 첫 바이트 전에 보내므로 스트리밍 중 쿼리가 빠집니다. 쿼리 수는 끝난 뒤 /metrics에서 셉니다)
+        records.append(Record("export", time.perf_counter() - start, status, None))
+
+
+async def route_query_totals(client, method: str, route: str) -> tuple[float, float] | None:
+    """
+    /metrics 의 (요청 수, 쿼리 수 합) 누적값. 응답을 끝까지 보낸 뒤에 집계되므로 스트리밍 응답의 쿼리도 포함됩니다.
+    (서버 워커가 여러 개면 한 워커의 값만 보이므로 쓸 수 없습니다. 읽을 수 없으면 None)
+    """
+    token = os.environ.get("INTERNAL_API_TOKEN")
+    response = await client.get("/metrics", headers={"X-Internal-Token": token} if token else {})
+    if response.status_code != 200:
+        return None
+    labels = f'method="{method}",route="{route}"'
+    totals = {"_count": 0.0, "_sum": 0.0}
+    for line in response.text.splitlines():
+        for suffix in totals:
+            if line.startswith(f"http_request_db_queries{suffix}{{{labels}}} "):
+                totals[suffix] = float(line.rsplit(" ", 1)[1])
+    return totals["_count"], totals["_sum"]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-int(fraction * 1000) * len(sorted_values) // 1000))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(records: list[Record], elapsed: float, exclude_errors: bool = False) -> dict:
+    """exclude_errors: 지연 시간(latency_ms)을 성공한 요청만으로 계산합니다. (실패 수는 errors에 그대로 남음)"""
+    timed_records = [record for record in records if record.status < 400] if exclude_errors else records
+    latencies = sorted(record.seconds * 1000 for record in timed_records)
+    queries = [record.queries for record in records if record.queries is not None]
+    status_codes: dict[str, int] = {}
+    for record in records:
+        status_codes[str(record.status)] = status_codes.get(str(record.status), 0) + 1
+    summary = {
+        "requests": len(records),
+        "errors": sum(1 for record in records if record.status >= 400),
+        "status_codes": status_codes,
+        "throughput_rps": round(len(records) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "queries_per_request": {
+            "mean": round(statistics.fmean(queries), 2) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+    }
+    if exclude_errors:
+        summary["latency_excludes_errors"] = True
+    return summary
+
+
+async def run_scenario(name: str, operation, contexts: list[UserContext], args) -> dict:
+    """concurrency개의 작업자가 합계 requests번의 작업을 나누어 실행합니다."""
+    records: list[Record] = []
+    remaining = args.requests
+    rss_peak = rss_mb()
+    done = asyncio.Event()
+
+    async def sample_memory():
+        nonlocal rss_peak
+        while not done.is_set():
+            current = rss_mb()
+            if current is not None and rss_peak is not None:
+                rss_peak = max(rss_peak, current)
+            await asyncio.sleep(0.05)
+
+    async def worker(index: int):
+        nonlocal remaining
+        ctx = contexts[index % len(contexts)]
+        while remaining > 0:
+            remaining -= 1
+            await operation(ctx, records)
+
+    sampler = asyncio.create_task(sample_memory())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await sampler
+
+    labels = sorted({record.label for record in records}, key=[record.label for record in records].index)
+    exclude_errors = name in ERRORS_EXCLUDED_FROM_LATENCY
+    result = {"seconds": round(elapsed, 2)}
+    if len(labels) > 1:
+        result["total"] = summarize(records, elapsed, exclude_errors)
+    for label in labels:
+        result[label] = summarize([record for record in records if record.label == label], elapsed, exclude_errors)
+    if rss_peak is not None and args.base_url is None:
+        result["rss_peak_mb"] = round(rss_peak, 1)
+    return result
+
+
+async def prepare_contexts(client, args, rng: random.Random) -> list[UserContext]:
+    """시딩된 사용자로 로그인하고, 각자의 여행 id와 재정렬할 일정(1일차)을 준비합니다."""
+    contexts = []
+    for index in range(min(args.users, args.concurrency)):
+        email = f"bench{index}@example.com"
+        response = await client.post("/api/auth/login", data={"username": email, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        ctx = UserContext(email=email, headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+        trips = (await client.get("/api/trips", params={"fields": "id"}, headers=ctx.headers)).json()
+        ctx.trip_ids = [trip["id"] for trip in trips]
+        if ctx.trip_ids:
+            ctx.reorder_trip_id = rng.choice(ctx.trip_ids)
+            detail = (await client.get(f"/api/trips/{ctx.reorder_trip_id}", headers=ctx.headers)).json()
+            ctx.reorder_item_ids = [item["id"] for item in detail["items"] if item["day"] == 1]
+        contexts.append(ctx)
+    if not contexts or not all(ctx.trip_ids for ctx in contexts):
+        raise SystemExit("벤치마크할 여행이 없습니다. (--trips-per-user 1 이상으로 시딩하세요)")
+    return contexts
+
+
+async def create_reorder_trips(client, contexts: list[UserContext], size: int) -> list[tuple]:
+    """
+    사용자마다 1일차 일정이 size개인 여행을 만들어 재정렬 대상으로 바꿉니다.
+    (정리할 때 쓰도록 (ctx, 원래 재정렬 여행 id, 원래 일정 id 목록, 만든 여행 id) 목록을 반환합니다)
+    """
+    created = []
+    for ctx in contexts:
+        response = await client.post("/api/trips", headers=ctx.headers, json={"title": f"부하 테스트 (재정렬 {size})"})
+        response.raise_for_status()
+        trip_id = response.json()["id"]
+        created.append((ctx, ctx.reorder_trip_id, ctx.reorder_item_ids, trip_id))
+        item_ids = []
+        for offset in range(0, size, REORDER_CHUNK_SIZE):
+            response = await client.post(f"/api/trips/{trip_id}/items:batch", headers=ctx.headers, json=[
+                {"day": 1, "order_sequence": index + 1, "place_name": f"재정렬 {index}"}
+                for index in range(offset, min(size, offset + REORDER_CHUNK_SIZE))
+            ])
+            response.raise_for_status()
+            item_ids += [item["id"] for item in response.json()]
+        ctx.reorder_trip_id, ctx.reorder_item_ids = trip_id, item_ids
+    return created
+
+
+async def delete_reorder_trips(client, created: list[tuple]):
+    for ctx, reorder_trip_id, reorder_item_ids, trip_id in created:
+        await client.delete(f"/api/trips/{trip_id}", headers=ctx.headers)
+        ctx.reorder_trip_id, ctx.reorder_item_ids = reorder_trip_id, reorder_item_ids
+
+
+async def run_benchmark(args, app) -> dict:
+    import httpx
+
+    rng = random.Random(args.random_seed)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        # (커넥션 풀 대기 시간 초과 등 앱 예외는 벤치마크를 멈추지 않고 500 응답으로 집계합니다)
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=args.timeout)
+
+    report = {}
+    async with client:
+        contexts = await prepare_contexts(client, args, rng)
+        scenarios = Scenarios(client, app if not args.base_url else None, rng, batch_size=args.batch_size)
+        for name in args.scenarios:
+            if name == "bulk_reorder" and args.reorder_sizes:
+                # (결과: bulk_reorder_{일정 수})
+                for size in args.reorder_sizes:
+                    created = await create_reorder_trips(client, contexts, size)
+                    try:
+                        report[f"{name}_{size}"] = await run_scenario(name, scenarios.bulk_reorder, contexts, args)
+                    finally:
+                        await delete_reorder_trips(client, created)
+                continue
+            before = await route_query_totals(client, "GET", "/api/trips/export") if name == "export" else None
+            report[name] = await run_scenario(name, getattr(scenarios, name), contexts, args)
+            if name == "export":
+                report[name]["bytes_total"] = scenarios.export_bytes
+                after = await route_query_totals(client, "GET", "/api/trips/export")
+                # (다른 요청이 섞였으면(요청 수가 다르면) N/A)
+                exports = report[name]["export"]["requests"]
+                queries = report[name]["export"]["queries_per_request"]
+                if before is not None and after is not None and after[0] - before[0] == exports > 0:
+                    queries["mean"] = round((after[1] - before[1]) / exports, 2)
+                    queries["source"] = "metrics"
+            if name == "login_with_reads":
+                report[name]["logins_per_second"] = report[name]["login"]["throughput_rps"]
+                report[name]["read_p95_ms"] = report[name]["read"]["latency_ms"]["p95"]
+            if name == "items_batch":
+                # (기록 하나 = 일정 batch_size개) 성공한 실행의 평균 지연 시간 기준 초당 추가한 일정 수
+                report[name]["items_per_second"] = {
+                    label: round(args.batch_size * 1000 / report[name][label]["latency_ms"]["mean"], 1)
+                    for label in ("items_batch", "items_single")
+                    if label in report[name] and report[name][label]["latency_ms"]["mean"] > 0
+                }
+    return report
+
+
+@contextmanager
+def dropped_indexes(database_url: str, names: list[str]):
+    """(--compare) 모델에 선언된 인덱스를 잠시 지웠다가 끝나면 다시 만듭니다."""
+    if not names:
+        yield
+        return
+    from sqlalchemy import create_engine
+
+    models = importlib.import_module("models")
+    indexes = [index for table in models.Base.metadata.tables.values() for index in table.indexes if index.name in names]
+    engine = create_engine(database_url)
+    try:
+        for index in indexes:
+            index.drop(engine, checkfirst=True)
+        yield
+    finally:
+        for index in indexes:
+            index.create(engine, checkfirst=True)
+        engine.dispose()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench.db", help="시딩할 DB (테이블을 지우고 다시 만듭니다)")
+    parser.add_argument("--base-url", default=None, help="로컬 uvicorn 서버 주소 (없으면 ASGI transport로 앱을 직접 호출)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--trips-per-user", type=int, default=10)
+    parser.add_argument("--items-per-trip", type=int, default=30)
+    parser.add_argument("--days-per-trip", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--concurrency-levels", default=None,
+                        help="쉼표로 구분한 동시 요청 수마다 모든 시나리오를 실행합니다. (예: 50,200,1000, --concurrency 대신 사용)")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오마다 실행할 작업 수")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help=f"쉼표로 구분 (가능: {', '.join(DEFAULT_SCENARIOS + EXTRA_SCENARIOS + SYNC_SCENARIOS)})")
+    parser.add_argument("--reorder-sizes", default=None,
+                        help="쉼표로 구분한 일정 수마다 bulk_reorder 시나리오를 실행합니다. (예: 10,100,1000)")
+    parser.add_argument("--compare", default=None, choices=sorted(COMPARISONS),
+                        help="설정/인덱스를 바꿔 가며 같은 시나리오를 실행합니다. (ASGI 모드 전용)")
+    parser.add_argument("--batch-size", type=int, default=50, help="items_batch 시나리오에서 한 번에 추가할 일정 수")
+    parser.add_argument("--random-seed", type=int, default=42, help="같은 값이면 같은 데이터/요청 순서를 만듭니다.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--no-seed", action="store_true", help="시딩하지 않고 기존 데이터로 실행")
+    parser.add_argument("--seed-only", action="store_true", help="시딩만 하고 종료")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 (없으면 표준 출력)")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in DEFAULT_SCENARIOS + EXTRA_SCENARIOS + SYNC_SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+    if args.base_url and any(name in SYNC_SCENARIOS for name in args.scenarios):
+        parser.error(f"{', '.join(SYNC_SCENARIOS)} 시나리오는 ASGI 모드(--base-url 없이)에서만 실행할 수 있습니다.")
+    if args.base_url and args.compare:
+        parser.error("--compare 는 ASGI 모드(--base-url 없이)에서만 실행할 수 있습니다.")
+    for option in ("concurrency_levels", "reorder_sizes"):
+        text = getattr(args, option)
+        if not text:
+            continue
+        flag = "--" + option.replace("_", "-")
+        try:
+            values = [int(value) for value in text.split(",") if value.strip()]
+        except ValueError:
+            parser.error(f"{flag} 는 쉼표로 구분한 정수여야 합니다.")
+        if not values or min(values) < 1:
+            parser.error(f"{flag} 는 1 이상이어야 합니다.")
+        setattr(args, option, values)
+    if args.users < 1 or args.concurrency < 1 or args.days_per_trip < 1 or args.batch_size < 1:
+        parser.error("--users, --concurrency, --days-per-trip, --batch-size 는 1 이상이어야 합니다.")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # (설정은 처음 사용할 때 환경 변수에서 한 번만 읽으므로, 그 전에 벤치마크용 설정을 넣습니다)
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-benchmark-secret-key")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # (내보내기 쿼리 수를 /metrics에서 읽습니다. --base-url 서버도 같은 INTERNAL_API_TOKEN으로 띄워야 합니다)
+    os.environ.setdefault("INTERNAL_API_TOKEN", "benchmark-internal-token")
+
+    report = {
+        "config": {
+            key: getattr(args, key) for key in (
+                "database_url", "base_url", "users", "trips_per_user", "items_per_trip", "days_per_trip",
+                "concurrency", "concurrency_levels", "requests", "scenarios", "batch_size", "reorder_sizes",
+                "compare", "random_seed",
+            )
+        },
+    }
+
+    app = None
+    if not args.no_seed or not args.base_url:
+        database = importlib.import_module("database")
+        models = importlib.import_module("models")
+        password_hashing = importlib.import_module("password_hashing")
+        if not args.no_seed:
+            # (앱과 같은 해싱 비용(PASSWORD_HASH_ROUNDS)으로 만들어야 로그인 때 다시 해싱하지 않습니다)
+            settings = importlib.import_module("settings").get_settings()
+            password_hashing.set_rounds(settings.password_hash_rounds)
+            password_hash = password_hashing.hash_password(BENCH_PASSWORD)
+            report["seed"] = seed_database(database, models, password_hash, args, random.Random(args.random_seed))
+            # (시딩에 쓴 엔진을 닫아, 앱이 자기 설정(--compare의 variant)으로 엔진을 만들게 합니다)
+            asyncio.run(database.dispose_engines())
+    if args.seed_only:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    async def run_levels(app):
+        if not args.concurrency_levels:
+            return {"scenarios": await run_benchmark(args, app)}
+        # 동시 요청 수별로 같은 시나리오를 실행합니다. (결과: by_concurrency.{동시 요청 수}.{시나리오})
+        return {"by_concurrency": {
+            str(level): await run_benchmark(argparse.Namespace(**{**vars(args), "concurrency": level}), app)
+            for level in args.concurrency_levels
+        }}
+
+    async def run_app(app_settings=None):
+        app = importlib.import_module("main").create_app(app_settings)
+        if any(name in SYNC_SCENARIOS for name in args.scenarios):
+            app.include_router(importlib.import_module("benchmarks.sync_endpoints").router)
+        # (ASGI transport는 lifespan을 실행하지 않으므로 직접 실행합니다. 종료할 때 엔진/해싱 프로세스 풀도 정리됩니다)
+        async with app.router.lifespan_context(app):
+            return await run_levels(app)
+
+    async def run():
+        if args.base_url:
+            return await run_levels(None)
+        if not args.compare:
+            return await run_app()
+        settings_module = importlib.import_module("settings")
+        base = settings_module.get_settings()
+        variants = {}
+        for name, variant in COMPARISONS[args.compare].items():
+            overrides = {key.lower(): value for key, value in variant.env.items()}
+            app_settings = settings_module.Settings.model_validate({**base.model_dump(), **overrides})
+            with dropped_indexes(args.database_url, variant.drop_indexes):
+                variants[name] = await run_app(app_settings)
+        return {"variants": variants}
+
+    report.update(asyncio.run(run()))
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
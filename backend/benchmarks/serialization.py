@@ -0,0 +1,106 @@
+"""
+응답 직렬화 마이크로 벤치마크
+
+일정 N개짜리 여행 1건(schemas.Trip)과 여행 목록(List[schemas.Trip])을
+- FastAPI 기본 경로 (응답 모델 검증 -> dict -> JSONResponse의 json.dumps)
+- serialization.json_response 빠른 경로 (캐시된 TypeAdapter -> pydantic-core가 바로 JSON 바이트)
+로 직렬화하는 시간을 비교하고 결과를 JSON으로 출력합니다. (DB 없이 메모리의 ORM 객체만 사용)
+
+    cd backend
+    python -m benchmarks.serialization --items 1000 --repeat 200
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import date
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+import models
+import schemas
+from serialization import dump_json
+
+
+def make_trip(trip_id: int, item_count: int) -> models.Trip:
+    items = [
+        models.ItineraryItem(
+            id=trip_id * 100000 + index,
+            trip_id=trip_id,
+            day=index // 20 + 1,
+            order_sequence=index % 20 + 1,
+            place_name=f"장소 {index}",
+            address=f"서울특별시 중구 세종대로 {index}",
+            memo="메모 " * 10,
+            latitude=37.5 + index / 10000,
+            longitude=127.0 + index / 10000,
+        )
+        for index in range(item_count)
+    ]
+    return models.Trip(
+        id=trip_id, title=f"여행 {trip_id}", start_date=date(2025, 1, 1), end_date=date(2025, 1, 31),
+        owner_id=1, version=1, items=items,
+    )
+
+
+def fastapi_default(field):
+    """FastAPI의 serialize_response + JSONResponse.render 와 같은 단계"""
+    def run(content) -> bytes:
+        value, errors = field.validate(content, {}, loc=("response",))
+        assert not errors, errors
+        return JSONResponse(content=field.serialize(value)).body
+    return run
+
+
+def measure(func, content, repeat: int) -> dict:
+    func(content)  # (워밍업: 스키마/TypeAdapter 빌드는 측정에서 제외)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000, help="여행 1건의 일정 수")
+    parser.add_argument("--trips", type=int, default=20, help="목록 벤치마크의 여행 수 (여행마다 --items / --trips 개의 일정)")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = {
+        "trip_detail": (schemas.Trip, make_trip(1, args.items)),
+        "trip_list": (
+            List[schemas.Trip],
+            [make_trip(trip_id, max(args.items // args.trips, 1)) for trip_id in range(1, args.trips + 1)],
+        ),
+    }
+    report = {"items": args.items, "repeat": args.repeat, "results": {}}
+    for name, (response_type, content) in cases.items():
+        field = create_model_field(name="Response", type_=response_type, mode="serialization")
+        default = measure(fastapi_default(field), content, args.repeat)
+        fast = measure(lambda value: dump_json(response_type, value), content, args.repeat)
+        # (두 경로의 결과가 같은지 확인)
+        assert json.loads(dump_json(response_type, content)) == json.loads(fastapi_default(field)(content)), name
+        report["results"][name] = {
+            "fastapi_default": default,
+            "fast_path": fast,
+            "speedup": round(default["mean_ms"] / fast["mean_ms"], 2),
+        }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
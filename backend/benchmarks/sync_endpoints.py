@@ -0,0 +1,54 @@
+"""
+동기/비동기 비교용 엔드포인트 (benchmarks/load.py 의 *_sync 시나리오)
+
+여행 목록/상세를 비동기 전환 이전 방식(def 엔드포인트 + 동기 Session, 스레드풀에서 실행)으로 처리합니다.
+쿼리와 직렬화는 main.py의 비동기 엔드포인트와 같게 두어, DB 접근 방식만 다르게 비교합니다.
+(벤치마크가 ASGI 모드에서 앱에 직접 추가하며, 실제 앱에는 등록하지 않습니다)
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+import models, schemas
+from auth_cache import Principal
+from database import get_db
+from main import get_current_user
+from ownership import TRIP_NOT_FOUND
+from serialization import json_response
+
+PREFIX = "/sync"
+
+router = APIRouter(prefix=PREFIX)
+
+
+@router.get("/api/trips", response_model=List[schemas.Trip])
+def read_my_trips(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    # (비동기 엔드포인트의 ETag 확인과 같은 쿼리)
+    db.execute(
+        select(func.count(models.Trip.id), func.max(models.Trip.id), func.coalesce(func.sum(models.Trip.version), 0))
+        .where(models.Trip.owner_id == current_user.id)
+    ).one()
+    trips = db.scalars(
+        select(models.Trip).options(selectinload(models.Trip.items))
+        .where(models.Trip.owner_id == current_user.id).order_by(models.Trip.id)
+    ).all()
+    return json_response(List[schemas.Trip], trips)
+
+
+@router.get("/api/trips/{trip_id}", response_model=schemas.Trip)
+def read_trip_details(trip_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    db_trip = db.scalars(
+        select(models.Trip).where(models.Trip.id == trip_id, models.Trip.owner_id == current_user.id)
+    ).first()
+    if db_trip is None:
+        raise HTTPException(status_code=404, detail=TRIP_NOT_FOUND)
+    items = db.scalars(
+        select(models.ItineraryItem)
+        .where(models.ItineraryItem.trip_id == db_trip.id)
+        .order_by(models.ItineraryItem.day, models.ItineraryItem.order_sequence, models.ItineraryItem.id)
+    ).all()
+    set_committed_value(db_trip, "items", items)
+    return json_response(schemas.Trip, db_trip)
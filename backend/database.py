@@ -1,22 +1,249 @@
-import os
-from sqlalchemy import create_engine
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-# .env 파일에서 환경 변수 로드
-load_dotenv()
+from pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolMetrics
+from read_replicas import RecentWriters, Replica, ReplicaSet
+from request_metrics import attach_query_metrics
+from settings import Settings, get_settings
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+logger = logging.getLogger("app.database")
+
+# (엔진/커넥션 풀은 임포트할 때가 아니라 init_engines()에서 만듭니다. 설정은 settings.py 참고)
+
+# 동기 드라이버 URL을 같은 DB를 가리키는 비동기 드라이버 URL로 변환합니다.
+# (예: postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+def async_url(settings: Settings) -> str:
+    """(필요하면 .env의 ASYNC_DATABASE_URL로 직접 지정할 수 있습니다)"""
+    return settings.async_database_url or to_async_url(settings.database_url)
+
+def engine_options(settings: Settings, url: str, async_mode: bool = False) -> dict:
+    """create_engine / create_async_engine 에 넘길 풀 옵션을 만듭니다."""
+    parsed = make_url(url)
+    options = {"pool_pre_ping": settings.db_pool_pre_ping}
+
+    # 메모리 SQLite는 단일 커넥션 풀을 쓰므로 풀 크기 설정이 의미가 없습니다.
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if async_mode else InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    timeout_ms = settings.db_statement_timeout_ms
+    if timeout_ms > 0 and parsed.get_backend_name() == "postgresql":
+        if async_mode:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+def attach_pool_metrics(pool) -> PoolMetrics:
+    metrics = PoolMetrics()
+    pool.metrics = metrics
+    return metrics
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+class PrimarySession(Session):
+    """primary(읽기/쓰기) 세션. 커밋하면 read-your-writes 기록을 남깁니다."""
+
+# --- 읽기 복제본 ---
+def create_replica(settings: Settings, index: int, url: str) -> Replica:
+    replica_url = to_async_url(url)
+    options = engine_options(settings, replica_url, async_mode=True)
+    options["pool_pre_ping"] = options["pool_pre_ping"] or settings.db_replica_pre_ping
+    replica_engine = create_async_engine(replica_url, **options)
+    attach_pool_metrics(replica_engine.sync_engine.pool)
+    attach_query_metrics(replica_engine.sync_engine)
+    return Replica(
+        name=f"replica{index}",
+        engine=replica_engine,
+        sessionmaker=async_sessionmaker(
+            bind=replica_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+        ),
+    )
+
+class Engines:
+    """
+    프로세스(워커)당 하나인 엔진/세션 팩토리 묶음.
+    엔진을 만들어도 DB에 접속하지는 않습니다. (첫 요청 또는 warm_up()에서 커넥션을 엽니다)
+    """
+
+    __slots__ = ("settings", "engine", "SessionLocal", "async_engine", "AsyncSessionLocal", "replica_set", "recent_writers")
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+        self.engine = create_engine(settings.database_url, **engine_options(settings, settings.database_url))
+        attach_pool_metrics(self.engine.pool)
+        attach_query_metrics(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        # --- 비동기 엔진/세션 ---
+        # 비동기 엔드포인트는 스레드풀을 거치지 않으므로, 동시 요청 수가 스레드 수에 묶이지 않습니다.
+        # (expire_on_commit=False: 커밋 후 속성 접근 시 암묵적인 재조회(lazy IO)가 일어나지 않도록 함)
+        url = async_url(settings)
+        self.async_engine = create_async_engine(url, **engine_options(settings, url, async_mode=True))
+        attach_pool_metrics(self.async_engine.sync_engine.pool)
+        attach_query_metrics(self.async_engine.sync_engine)
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession,
+            sync_session_class=PrimarySession,
+        )
+
+        self.replica_set = ReplicaSet(
+            [create_replica(settings, index, url) for index, url in enumerate(settings.database_replica_urls)],
+            retry_seconds=settings.db_replica_retry_seconds,
+        )
+        self.recent_writers = RecentWriters(window_seconds=settings.db_read_your_writes_seconds)
+
+    def pools(self) -> dict:
+        """이름 -> 커넥션 풀 (지표용)"""
+        return {
+            "sync": self.engine.pool,
+            "async": self.async_engine.sync_engine.pool,
+            **{replica.name: replica.engine.sync_engine.pool for replica in self.replica_set.replicas},
+        }
+
+_engines: Engines | None = None
+
+def init_engines(settings: Settings | None = None) -> Engines:
+    """엔진을 만듭니다. (이미 있으면 그대로 반환)"""
+    global _engines
+    if _engines is None:
+        _engines = Engines(settings or get_settings())
+    return _engines
+
+def get_engines() -> Engines:
+    """
+    (lifespan 없이 실행하는 스크립트/벤치마크에서도 쓸 수 있도록) 처음 호출할 때 엔진을 만듭니다.
+    (그런 스크립트에서 비동기 세션을 썼다면 끝날 때 dispose_engines()를 await 해야 합니다.
+     aiosqlite 커넥션 스레드가 남아 있으면 프로세스가 끝나지 않습니다)
+    """
+    return _engines or init_engines()
+
+def get_engine():
+    """동기 엔진 (시딩 스크립트, 마이그레이션 확인 등)"""
+    return get_engines().engine
+
+async def _open_connections(engine, count: int):
+    """커넥션 count개(풀 크기까지)를 동시에 열었다가 풀에 돌려줍니다."""
+    pool = engine.sync_engine.pool
+    # (메모리 SQLite 등 커넥션 하나를 공유하는 풀은 하나만 엽니다)
+    count = min(count, pool.size()) if isinstance(pool, QueuePool) else min(count, 1)
+    connections = await asyncio.gather(*(engine.connect() for _ in range(count)), return_exceptions=True)
+    errors = [conn for conn in connections if isinstance(conn, BaseException)]
+    for conn in connections:
+        if not isinstance(conn, BaseException):
+            await conn.close()
+    if errors:
+        raise errors[0]
+
+async def warm_up(count: int | None = None, statements=()):
+    """
+    시작할 때 커넥션 풀을 미리 채워, 첫 요청들이 DB 접속(TCP/TLS/인증) 시간을 기다리지 않게 합니다.
+    primary는 count개(없으면 DB_WARMUP_CONNECTIONS, 그것도 없으면 DB_POOL_SIZE), 복제본은 1개씩 엽니다.
+    statements(예: select(Model).limit(0))는 primary 세션으로 한 번씩 실행하여, 첫 요청에서 하던
+    ORM 쿼리 컴파일/결과 로딩 초기화를 시작할 때 끝내 둡니다.
+    (실패해도 시작은 계속합니다. 커넥션은 첫 요청에서 다시 열고, 연결할 수 없는 복제본은 건너뜁니다)
+    """
+    engines = get_engines()
+    settings = engines.settings
+    if count is None:
+        count = settings.db_warmup_connections
+        if count is None:
+            count = settings.db_pool_size
+    if count <= 0:
+        return
+    try:
+        await _open_connections(engines.async_engine, count)
+        async with engines.AsyncSessionLocal() as session:
+            for statement in statements:
+                (await session.scalars(statement)).all()
+    except (SQLAlchemyError, OSError) as error:
+        logger.warning("database warm-up failed: %s", error)
+    for replica in engines.replica_set.replicas:
+        try:
+            await _open_connections(replica.engine, 1)
+        except (SQLAlchemyError, OSError) as error:
+            engines.replica_set.mark_down(replica, error)
+
+async def dispose_engines():
+    """(종료 시) 모든 엔진의 커넥션을 닫습니다. 다시 get_engines()를 호출하면 새로 만듭니다."""
+    global _engines
+    engines, _engines = _engines, None
+    if engines is None:
+        return
+    # (하나가 실패해도 나머지 엔진은 닫습니다)
+    try:
+        await engines.async_engine.dispose()
+        for replica in engines.replica_set.replicas:
+            await replica.engine.dispose()
+    finally:
+        engines.engine.dispose()
+
+# (get_current_user가 세션에 사용자 id를 남겨 두면) 커밋한 사용자를 기록합니다.
+@event.listens_for(PrimarySession, "after_commit")
+def remember_writer(session):
+    user_id = session.info.get("user_id")
+    if user_id is not None and _engines is not None:
+        _engines.recent_writers.mark(user_id)
+
 # (의존성 주입을 위한) DB 세션 생성 함수
 def get_db():
-    db = SessionLocal()
+    db = get_engines().SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# (의존성 주입을 위한) 비동기 DB 세션 생성 함수 (primary, 읽기/쓰기)
+async def get_async_db():
+    async with get_engines().AsyncSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def read_session(prefer_primary: bool = False):
+    """
+    읽기 전용 세션. 복제본이 있으면 돌아가며 사용하고, 연결할 수 없는 복제본은 건너뜁니다. (모두 안 되면 primary)
+    prefer_primary=True 이면 (최근에 쓰기를 한 사용자) primary에서 읽습니다.
+    """
+    engines = get_engines()
+    if not prefer_primary:
+        for replica in engines.replica_set.candidates():
+            session = replica.sessionmaker()
+            try:
+                # 커넥션을 미리 체크아웃하여 연결 상태를 확인합니다. (pre-ping)
+                await session.connection()
+            except (SQLAlchemyError, OSError) as error:
+                await session.close()
+                engines.replica_set.mark_down(replica, error)
+                continue
+            engines.replica_set.mark_up(replica)
+            async with session:
+                yield session
+            return
+    async with engines.AsyncSessionLocal() as session:
+        yield session
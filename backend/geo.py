@@ -0,0 +1,104 @@
+import math
+
+# --- 지오해시(geohash) / 거리 계산 유틸리티 ---
+# 지오해시는 위경도를 문자열로 바꾼 값으로, 가까운 위치일수록 앞부분(prefix)이 같습니다.
+# 따라서 일반 B-tree 인덱스의 범위 검색만으로 "이 영역 안의 장소"를 빠르게 찾을 수 있습니다.
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9          # 저장 정밀도 (약 5m x 5m)
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE_LAT = 111320.0
+
+
+def _cell_bits(precision: int) -> tuple[int, int]:
+    """정밀도(문자 수)에 따른 (경도 비트 수, 위도 비트 수)"""
+    total = precision * 5
+    return (total + 1) // 2, total // 2
+
+
+def _encode_cell(lng_index: int, lat_index: int, precision: int) -> str:
+    """격자 좌표(경도/위도 칸 번호)를 지오해시 문자열로 바꿉니다. (경도 비트부터 번갈아 배치)"""
+    lng_bits, lat_bits = _cell_bits(precision)
+    value = 0
+    for bit in range(precision * 5):
+        if bit % 2 == 0:
+            lng_bits -= 1
+            value = (value << 1) | ((lng_index >> lng_bits) & 1)
+        else:
+            lat_bits -= 1
+            value = (value << 1) | ((lat_index >> lat_bits) & 1)
+    chars = []
+    for _ in range(precision):
+        chars.append(GEOHASH_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def _cell_index(lat: float, lng: float, precision: int) -> tuple[int, int]:
+    lng_bits, lat_bits = _cell_bits(precision)
+    lng_index = int((lng + 180.0) / 360.0 * (1 << lng_bits))
+    lat_index = int((lat + 90.0) / 180.0 * (1 << lat_bits))
+    # 경계값(경도 180, 위도 90)은 마지막 칸에 넣습니다.
+    return min(lng_index, (1 << lng_bits) - 1), min(lat_index, (1 << lat_bits) - 1)
+
+
+def encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    return _encode_cell(*_cell_index(lat, lng, precision), precision)
+
+
+def covering_prefixes(
+    min_lat: float, min_lng: float, max_lat: float, max_lng: float, max_cells: int = 32
+) -> list[str]:
+    """
+    영역(bbox)을 덮는 지오해시 prefix 목록을 반환합니다.
+    칸 수가 max_cells를 넘지 않는 범위에서 가장 세밀한 정밀도를 고릅니다.
+    """
+    best = [""]
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lng_lo, lat_lo = _cell_index(min_lat, min_lng, precision)
+        lng_hi, lat_hi = _cell_index(max_lat, max_lng, precision)
+        if (lng_hi - lng_lo + 1) * (lat_hi - lat_lo + 1) > max_cells:
+            break
+        best = [
+            _encode_cell(lng_index, lat_index, precision)
+            for lng_index in range(lng_lo, lng_hi + 1)
+            for lat_index in range(lat_lo, lat_hi + 1)
+        ]
+    return best
+
+
+def prefix_range(prefix: str) -> tuple[str, str]:
+    """prefix로 시작하는 지오해시의 [하한, 상한] (B-tree 범위 검색용, 정렬 규칙(collation)과 무관)"""
+    padding = GEOHASH_PRECISION - len(prefix)
+    return prefix + "0" * padding, prefix + "z" * padding
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """두 지점 사이의 대원 거리(m)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lng: float, radius_m: float) -> tuple[float, float, float, float]:
+    """중심점과 반경(m)을 감싸는 (min_lat, min_lng, max_lat, max_lng)"""
+    d_lat = radius_m / METERS_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    d_lng = min(radius_m / (METERS_PER_DEGREE_LAT * cos_lat), 180.0)
+    return max(lat - d_lat, -90.0), lng - d_lng, min(lat + d_lat, 90.0), lng + d_lng
+
+
+def split_antimeridian(
+    min_lat: float, min_lng: float, max_lat: float, max_lng: float
+) -> list[tuple[float, float, float, float]]:
+    """날짜변경선(경도 ±180)을 넘는 영역을 두 영역으로 나눕니다."""
+    # 경도를 -180 ~ 180 범위로 정규화
+    if max_lng - min_lng >= 360:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    normalize = lambda lng: lng if -180.0 <= lng <= 180.0 else (lng + 180.0) % 360.0 - 180.0
+    min_lng, max_lng = normalize(min_lng), normalize(max_lng)
+    if min_lng <= max_lng:
+        return [(min_lat, min_lng, max_lat, max_lng)]
+    return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
@@ -0,0 +1,38 @@
+"""
+gunicorn 설정 (Linux/macOS 운영 서버에서 여러 워커로 실행)
+
+    cd backend
+    pip install gunicorn uvicorn-worker
+    gunicorn -c gunicorn.conf.py
+
+gunicorn 없이 (Windows 등) uvicorn의 워커 관리로 실행:
+
+    uvicorn main:create_app --factory --host 0.0.0.0 --port 8000 --workers 4
+
+- 앱은 워커마다 create_app()으로 만듭니다. (preload_app = False)
+  마스터 프로세스는 DB에 접속하지 않고(.env는 아래 기본값 계산에만 읽음), 각 워커가 lifespan에서 자기 커넥션 풀을 만들고 미리 채웁니다.
+- 워커 수 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) 가 Postgres max_connections 를 넘지 않도록 맞춰야 합니다.
+- 요청 속도 제한/실시간 알림을 워커끼리 공유하려면 RATE_LIMIT_BACKEND=redis, LIVE_BROKER=redis 로 설정합니다.
+- 시작 시간은 benchmarks/startup.py 로 잴 수 있습니다.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+# (.env 값이 아래 기본값보다 우선하도록 먼저 읽습니다)
+load_dotenv()
+
+wsgi_app = "main:create_app()"
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = False
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, multiprocessing.cpu_count()))))
+
+# 비밀번호 해싱 프로세스 풀은 워커마다 만들어지므로, 지정하지 않았으면 CPU를 워커 수로 나눕니다.
+os.environ.setdefault("PASSWORD_HASH_WORKERS", str(max(1, multiprocessing.cpu_count() // workers)))
+
+timeout = 60            # 이보다 오래 응답이 없는 워커는 다시 시작
+graceful_timeout = 30   # 종료 신호 후 lifespan 종료(커넥션 정리)까지 기다리는 시간
+keepalive = 5
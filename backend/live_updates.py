@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+
+# --- 여행 변경 실시간 알림 (WebSocket /ws/trips/{trip_id}) ---
+# 쓰기 엔드포인트가 커밋한 뒤 이벤트(JSON 문자열)를 발행하면, 허브가 그 여행을 구독 중인 연결마다 큐에 넣습니다.
+# 이벤트는 발행할 때 한 번만 직렬화하고, 구독자 수만큼 같은 문자열을 나누어 보냅니다.
+# 여러 워커(프로세스)로 실행할 때는 브로커(Redis pub/sub)를 거쳐 모든 워커의 허브로 전달됩니다.
+#
+# 느린 구독자(백프레셔): 구독자마다 큐 크기가 정해져 있고, 가득 차면 쌓인 이벤트를 모두 버리고
+# {"type": "resync"} 하나만 남깁니다. 클라이언트는 이 알림을 받으면 여행을 다시 조회합니다.
+# (발행하는 쪽은 절대 기다리지 않으므로, 느린 연결 하나가 쓰기 요청이나 다른 구독자를 막지 않습니다)
+#
+# 브로커 연결이 끊기면(Redis 재시작 등) 점점 길게 기다리며 다시 구독하고, 다시 받기 시작하면
+# 끊긴 동안 놓친 이벤트가 있을 수 있으므로 이 워커의 모든 구독자에게 resync를 보냅니다.
+
+logger = logging.getLogger("app.live_updates")
+
+
+def resync_message(trip_id: int) -> str:
+    return json.dumps({"type": "resync", "trip_id": trip_id})
+
+
+class Subscription:
+    """연결 하나의 구독 (보낼 이벤트 큐)"""
+
+    __slots__ = ("trip_id", "_queue", "dropped")
+
+    def __init__(self, trip_id: int, max_queue: int):
+        self.trip_id = trip_id
+        self._queue: asyncio.Queue[str] = asyncio.Queue(max_queue)
+        self.dropped = 0
+
+    def push(self, message: str) -> int:
+        """이벤트를 큐에 넣고, 큐가 가득 차서 버린 이벤트 수를 반환합니다."""
+        try:
+            self._queue.put_nowait(message)
+            return 0
+        except asyncio.QueueFull:
+            pass
+        dropped = 0
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            dropped += 1
+        self._queue.put_nowait(resync_message(self.trip_id))
+        self.dropped += dropped + 1
+        return dropped + 1
+
+    async def get(self) -> str:
+        return await self._queue.get()
+
+
+class LocalBroker:
+    """(기본) 한 프로세스 안에서만 전달합니다."""
+
+    shared = False
+
+    async def start(self, deliver, resync):
+        self._deliver = deliver
+
+    async def publish(self, trip_id: int, message: str):
+        self._deliver(trip_id, message)
+
+    async def close(self):
+        pass
+
+
+class RedisBroker:
+    """
+    Redis pub/sub 채널 하나로 모든 워커의 허브에 이벤트를 전달합니다. (redis 패키지가 필요합니다: pip install redis)
+    발행한 워커도 채널을 통해 받으므로, 로컬 구독자에게도 같은 경로로 전달됩니다.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        url: str,
+        channel: str = "trip-events",
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        client=None,
+    ):
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as error:
+                raise RuntimeError("LIVE_BROKER=redis 를 사용하려면 redis 패키지를 설치해야 합니다.") from error
+            client = Redis.from_url(url)
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._redis = client
+        self._listener: asyncio.Task | None = None
+
+    async def start(self, deliver, resync):
+        # (처음 구독은 여기서 해서, Redis에 연결할 수 없으면 start가 바로 실패합니다)
+        pubsub = await self._subscribe()
+        self._listener = asyncio.create_task(self._listen(pubsub, deliver, resync))
+
+    async def _subscribe(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.channel)
+        except BaseException:
+            await pubsub.aclose()
+            raise
+        return pubsub
+
+    async def _listen(self, pubsub, deliver, resync):
+        delay = self.reconnect_delay
+        try:
+            while True:
+                try:
+                    if pubsub is None:
+                        pubsub = await self._subscribe()
+                        logger.warning("live broker resubscribed channel=%s", self.channel)
+                        delay = self.reconnect_delay
+                        resync()
+                    async for message in pubsub.listen():
+                        self._deliver_message(message, deliver)
+                    raise ConnectionError("pubsub stream ended")
+                except Exception:
+                    # (redis.exceptions.ConnectionError/TimeoutError 등) 연결을 버리고 잠시 뒤 다시 구독합니다.
+                    logger.warning(
+                        "live broker connection lost channel=%s, retrying in %.1fs", self.channel, delay, exc_info=True
+                    )
+                    if pubsub is not None:
+                        await asyncio.gather(pubsub.aclose(), return_exceptions=True)
+                        pubsub = None
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            if pubsub is not None:
+                await pubsub.aclose()
+
+    @staticmethod
+    def _deliver_message(message, deliver):
+        """메시지 하나를 전달합니다. 형식이 잘못된 메시지는 로그만 남기고 건너뜁니다."""
+        try:
+            trip_id, _, payload = message["data"].decode().partition(":")
+            trip_id = int(trip_id)
+        except (KeyError, AttributeError, ValueError):
+            # (UnicodeDecodeError도 ValueError입니다)
+            logger.warning("live broker dropped malformed message %r", message.get("data"))
+            return
+        deliver(trip_id, payload)
+
+    async def publish(self, trip_id: int, message: str):
+        await self._redis.publish(self.channel, f"{trip_id}:{message}")
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        await self._redis.aclose()
+
+
+class TripEventHub:
+    """
+    trip_id -> 구독 집합. 발행/전달은 모두 이벤트 루프 안에서 실행되므로 잠금이 필요 없습니다.
+    max_subscribers: 이 워커가 받을 수 있는 최대 연결 수 (넘으면 subscribe가 None을 반환)
+    """
+
+    def __init__(self, broker=None, max_queue: int = 100, max_subscribers: int = 10000):
+        self.broker = broker or LocalBroker()
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._count = 0
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        """브로커 연결을 시작합니다. (여러 번 호출해도 한 번만 시작)"""
+        if self._started:
+            return
+        async with self._start_lock:
+            if not self._started:
+                await self.broker.start(self.deliver, self.resync)
+                self._started = True
+
+    async def close(self):
+        if self._started:
+            await self.broker.close()
+            self._started = False
+
+    def subscribe(self, trip_id: int) -> Subscription | None:
+        if self._count >= self.max_subscribers:
+            return None
+        subscription = Subscription(trip_id, self.max_queue)
+        self._subscriptions.setdefault(trip_id, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscriptions.get(subscription.trip_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        self._count -= 1
+        if not subscribers:
+            del self._subscriptions[subscription.trip_id]
+
+    def wants(self, trip_id: int) -> bool:
+        """이 여행의 이벤트를 발행할 필요가 있는지 (로컬 브로커이고 구독자가 없으면 직렬화도 하지 않습니다)"""
+        return self.broker.shared or trip_id in self._subscriptions
+
+    async def publish(self, trip_id: int, message: str):
+        """
+        (커밋한 뒤 호출) 브로커로 이벤트를 보냅니다.
+        이미 커밋된 변경이므로 브로커 오류는 요청을 실패시키지 않고 로그만 남깁니다.
+        """
+        try:
+            await self.start()
+            await self.broker.publish(trip_id, message)
+            self.published += 1
+        except Exception:
+            logger.exception("trip event publish failed trip_id=%s", trip_id)
+
+    def deliver(self, trip_id: int, message: str):
+        """이 워커의 구독자들에게 전달합니다. (기다리지 않음)"""
+        for subscription in self._subscriptions.get(trip_id, ()):
+            self.dropped += subscription.push(message)
+            self.delivered += 1
+
+    def resync(self):
+        """(브로커 재연결 뒤) 이 워커의 모든 구독자에게 resync를 보냅니다. 놓친 이벤트가 있을 수 있습니다."""
+        for trip_id, subscribers in self._subscriptions.items():
+            message = resync_message(trip_id)
+            for subscription in subscribers:
+                self.dropped += subscription.push(message)
+                self.delivered += 1
+
+    def render(self) -> list[str]:
+        """Prometheus 텍스트 형식의 줄 목록"""
+        return [
+            "# HELP live_subscribers 현재 연결된 실시간 알림 구독자 수",
+            "# TYPE live_subscribers gauge",
+            f"live_subscribers {self._count}",
+            "# HELP live_events_published_total 발행한 이벤트 수",
+            "# TYPE live_events_published_total counter",
+            f"live_events_published_total {self.published}",
+            "# HELP live_events_delivered_total 구독자 큐에 넣은 이벤트 수",
+            "# TYPE live_events_delivered_total counter",
+            f"live_events_delivered_total {self.delivered}",
+            "# HELP live_events_dropped_total 느린 구독자의 큐가 가득 차서 버린 이벤트 수 (resync로 대체)",
+            "# TYPE live_events_dropped_total counter",
+            f"live_events_dropped_total {self.dropped}",
+        ]
+
+    def __len__(self):
+        return self._count
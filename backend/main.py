@@ -1,25 +1,91 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import APIRouter, FastAPI, Depends, Header, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 # OAuth2, JWT를 위한 임포트 추가
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy import and_, case, event, func, insert, or_, select, update
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from pydantic import ValidationError
 from jose import JWTError, jwt # JWT 라이브러리 임포트
-from datetime import datetime, timedelta, timezone # 시간 처리를 위해 3개 임포트
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone # 시간 처리를 위해 임포트
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-import os # .env 파일 읽기용
+from typing import List, Literal
+import asyncio
+import hashlib
+import hmac
+import json
 
 # 내부 모듈 임포트
+import database
+import geo
+import ownership
 import models, schemas
-from database import engine, get_db
+import password_hashing
+import routing
+import search
+import trip_transfer
+from serialization import json_response, type_adapter
+from database import get_async_db, read_session
+from pool_metrics import pool_status, render_prometheus
+from request_metrics import RequestMetricsMiddleware, request_metrics
+from auth_cache import Principal, PrincipalCache
+from password_hashing import get_password_hash, shutdown_executor, verify_and_update_password
+from rate_limit import MemoryTokenBucketStore, RateLimitMiddleware, RateLimitPolicy, RedisTokenBucketStore, bearer_token
+from live_updates import LocalBroker, RedisBroker, TripEventHub
+from settings import Settings, get_settings
 
 # --- 설정 ---
 
-# (테이블 생성은 그대로 둠)
-models.Base.metadata.create_all(bind=engine)
+# (테이블 생성/변경은 Alembic 마이그레이션으로 관리합니다: backend 폴더에서 `alembic upgrade head`)
 
-# (FastAPI 앱 인스턴스는 그대로 둠)
-app = FastAPI()
+# 설정(.env)은 임포트할 때가 아니라 create_app()에서 한 번만 읽고 검증합니다. (settings.py)
+# 아래 전역 객체들은 configure()가 설정값으로 만듭니다. (워커 프로세스당 앱 하나)
+settings: Settings | None = None
+principal_cache: PrincipalCache | None = None   # 인증 사용자(Principal) 캐시 - 있으면 get_current_user가 DB를 조회하지 않음
+route_cache: routing.RouteCache | None = None   # 동선 계산 결과 캐시 (여행 version이 바뀌면 다시 계산)
+search_index_cache: search.SearchIndexCache | None = None
+live_hub: TripEventHub | None = None            # 실시간 알림 (WebSocket /ws/trips/{trip_id})
+# 검색 방식 - sql: 트라이그램 인덱스를 쓰는 ILIKE 쿼리 (Postgres), memory: 사용자별 메모리 역색인 (SQLite 등)
+search_backend = "memory"
+
+# (엔드포인트는 router에 등록하고, create_app()이 앱에 붙입니다)
+router = APIRouter()
+
+# --- 요청 속도 제한 (토큰 버킷, .env로 조정) ---
+# auth: 로그인/회원가입 (비밀번호 해싱이 비싸므로 IP당 엄격하게)
+# write: 그 밖의 쓰기 요청 (로그인 사용자는 사용자별, 아니면 IP별)
+# BURST는 한 번에 허용하는 요청 수, PER_MINUTE는 분당 다시 채워지는 요청 수입니다. (0이면 해당 제한 끔)
+AUTH_PATHS = {"/api/auth/login", "/api/auth/register"}
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+def rate_limit_policies(app_settings: Settings) -> list[RateLimitPolicy]:
+    return [
+        RateLimitPolicy(
+            name="auth",
+            capacity=app_settings.rate_limit_auth_burst,
+            refill_per_second=app_settings.rate_limit_auth_per_minute / 60,
+            match=lambda method, path: method == "POST" and path in AUTH_PATHS,
+        ),
+        RateLimitPolicy(
+            name="write",
+            capacity=app_settings.rate_limit_write_burst,
+            refill_per_second=app_settings.rate_limit_write_per_minute / 60,
+            match=lambda method, path: method in WRITE_METHODS and path.startswith("/api/"),
+            per_user=True,
+        ),
+    ]
+
+def rate_limit_subject(token: str) -> str | None:
+    """토큰 서명만 확인하여 사용자 식별자(uid, 없으면 이메일)를 꺼냅니다. (유효하지 않으면 None -> IP로 제한)"""
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except JWTError:
+        return None
+    subject = payload.get("uid") or payload.get("sub")
+    return str(subject) if subject is not None else None
 
 # React 앱이 실행되는 주소 (Vite 기본값: 5173)
 origins = [
@@ -27,40 +93,194 @@ origins = [
     "http://127.0.0.1:5173",
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,       # origins 리스트에 있는 주소에서의 요청을 허용
-    allow_credentials=True,    # 쿠키를 포함한 요청을 허용
-    allow_methods=["*"],         # 모든 HTTP 메소드(GET, POST 등)를 허용
-    allow_headers=["*"],         # 모든 HTTP 헤더를 허용
-)
-
-# --- .env에서 JWT 설정값 불러오기 ---
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
-
-# (비밀번호 해싱 설정은 그대로 둠)
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# (비밀번호 해싱 설정은 password_hashing.py로 이동 - 별도 프로세스 풀에서 실행)
 
 # (OAuth2 스키마 설정 - /api/auth/login 엔드포인트를 사용)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# 사용자 정보가 수정/삭제되면 인증 사용자 캐시에서 즉시 제거합니다.
+# (주의) 이 워커(프로세스)에서 실행한 쿼리만 알 수 있습니다. 다른 워커나 DB에서 직접 바꾼 사용자는
+# 그 워커의 캐시에 최대 PRINCIPAL_CACHE_TTL_SECONDS(기본 10초) 동안 예전 정보로 남습니다.
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def invalidate_cached_principal(mapper, connection, target):
+    if principal_cache is not None:
+        principal_cache.invalidate_user(target.id)
+
+# ORM 객체를 거치지 않는 UPDATE/DELETE(update(models.User), Core 쿼리)는 어떤 사용자인지 알 수 없으므로
+# 이 워커의 캐시를 모두 비웁니다. (사용자 수정은 드물어서, 비운 뒤 사용자마다 한 번 다시 조회하는 정도입니다)
+@event.listens_for(Engine, "after_execute")
+def invalidate_principals_after_bulk_write(conn, clauseelement, multiparams, params, execution_options, result):
+    if principal_cache is None or not (getattr(clauseelement, "is_update", False) or getattr(clauseelement, "is_delete", False)):
+        return
+    if clauseelement.table.name == models.User.__tablename__:
+        principal_cache.clear()
+
+# --- 여행 목록 페이지네이션/필드 선택 설정 ---
+MAX_TRIPS_PAGE_SIZE = 200
+
+# 위치 검색 설정
+MAX_SEARCH_RESULTS = 500
+MAX_SEARCH_RADIUS_M = 1_000_000     # near 검색 최대 반경 (1000km)
+
+# 검색 페이지 설정
+MAX_SEARCH_PAGE_SIZE = 100
+MAX_SEARCH_OFFSET = 1000
+
+def configure(app_settings: Settings):
+    """설정값으로 캐시/실시간 알림 허브 등 전역 객체를 만듭니다. (create_app에서 호출)"""
+    global settings, principal_cache, route_cache, search_index_cache, live_hub, search_backend
+    settings = app_settings
+    password_hashing.configure(app_settings.password_hash_rounds, app_settings.password_hash_workers)
+    request_metrics.slow_query_ms = app_settings.slow_query_ms
+    principal_cache = PrincipalCache(
+        max_size=app_settings.principal_cache_max_size,
+        ttl_seconds=app_settings.principal_cache_ttl_seconds,
+    )
+    route_cache = routing.RouteCache(max_size=app_settings.route_cache_max_size)
+    search_index_cache = search.SearchIndexCache(max_size=app_settings.search_index_cache_max_size)
+    live_hub = TripEventHub(
+        broker=RedisBroker(app_settings.live_redis_url) if app_settings.live_broker == "redis" else LocalBroker(),
+        max_queue=app_settings.live_queue_size,
+        max_subscribers=app_settings.live_max_subscribers,
+    )
+    search_backend = app_settings.search_backend or (
+        "sql" if make_url(database.async_url(app_settings)).get_backend_name() == "postgresql" else "memory"
+    )
+
 # --- 유틸리티 함수 ---
 
-# (get_password_hash는 그대로 둠)
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
+def trip_item_count():
+    """여행별 일정 개수를 구하는 상관 서브쿼리 (목록 쿼리 1번에 함께 계산)"""
+    return (
+        select(func.count(models.ItineraryItem.id))
+        .where(models.ItineraryItem.trip_id == models.Trip.id)
+        .correlate(models.Trip)
+        .scalar_subquery()
+    )
+
+def group_items_by_day(items) -> list[schemas.TripDay]:
+    """(day, order_sequence) 순으로 정렬된 일정을 한 번 순회하며 날짜별로 묶습니다."""
+    days: list[schemas.TripDay] = []
+    for item in items:
+        if not days or days[-1].day != item.day:
+            days.append(schemas.TripDay(day=item.day, items=[]))
+        days[-1].items.append(schemas.ItineraryItem.model_validate(item))
+    return days
+
+async def trips_fingerprint(db: AsyncSession, owner_id: int) -> tuple:
+    """사용자의 여행 (개수, 최대 id, version 합). 여행 추가/삭제/수정, 일정 변경이 모두 이 값을 바꿉니다."""
+    return tuple((await db.execute(
+        select(
+            func.count(models.Trip.id),
+            func.max(models.Trip.id),
+            func.coalesce(func.sum(models.Trip.version), 0),
+        ).where(models.Trip.owner_id == owner_id)
+    )).one())
+
+async def bump_trip_versions(db: AsyncSession, trip_ids) -> dict[int, int]:
+    """여행(또는 그 일정)이 바뀌면 version을 1 올리고 {trip_id: 새 version}을 반환합니다."""
+    result = await db.execute(
+        update(models.Trip)
+        .where(models.Trip.id.in_(set(trip_ids)))
+        .values(version=models.Trip.version + 1)
+        .returning(models.Trip.id, models.Trip.version),
+        execution_options={"synchronize_session": False},
+    )
+    return dict(result.all())
+
+# --- 쓰기 엔드포인트 응답 형식 (?return=item|trip|delta) ---
+# trip: 갱신된 여행 전체, delta: 바뀐 일정 + 새 version (클라이언트가 다시 조회하지 않고 바로 반영)
+WriteReturnMode = Literal["item", "trip", "delta"]
+
+async def load_trip_with_items(db: AsyncSession, trip_id: int) -> schemas.Trip:
+    """같은 트랜잭션 안에서 여행과 일정을 (쿼리 2번으로) 다시 읽어 응답 스키마로 만듭니다."""
+    result = await db.execute(
+        select(models.Trip)
+        .options(selectinload(models.Trip.items))
+        .where(models.Trip.id == trip_id)
+        .execution_options(populate_existing=True)
+    )
+    return schemas.Trip.model_validate(result.scalars().one())
+
+async def build_write_response(
+    db: AsyncSession,
+    mode: str,
+    trip_id: int,
+    version: int,
+    items=(),
+    deleted_item_ids=(),
+):
+    """mode에 맞는 응답을 만듭니다. (item 이면 None을 반환하여 각 엔드포인트의 기본 응답을 사용)"""
+    if mode == "trip":
+        return await load_trip_with_items(db, trip_id)
+    if mode == "delta":
+        return schemas.TripDelta(
+            trip_id=trip_id,
+            version=version,
+            items=[schemas.ItineraryItem.model_validate(item) for item in items],
+            deleted_item_ids=list(deleted_item_ids),
+        )
+    return None
 
-# (get_user_by_email은 그대로 둠)
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+# --- 실시간 알림 발행 (커밋한 뒤 호출) ---
 
-# --- 새 유틸리티 함수 (비밀번호 검증, 토큰 생성) ---
+async def publish_trip_event(event: schemas.TripEvent):
+    if live_hub.wants(event.trip_id):
+        await live_hub.publish(event.trip_id, event.model_dump_json())
 
-def verify_password(plain_password, hashed_password):
-    """입력된 비밀번호와 해시된 비밀번호를 비교합니다."""
-    return pwd_context.verify(plain_password, hashed_password)
+async def publish_item_changes(versions: dict[int, int], items=(), deleted_item_ids=()):
+    """바뀐 일정을 여행별 delta 이벤트로 발행합니다. (deleted_item_ids는 여행이 하나일 때만 사용)"""
+    for trip_id, version in versions.items():
+        if not live_hub.wants(trip_id):
+            continue
+        await publish_trip_event(schemas.TripEvent(
+            type="delta",
+            trip_id=trip_id,
+            version=version,
+            items=[schemas.ItineraryItem.model_validate(item) for item in items if item.trip_id == trip_id],
+            deleted_item_ids=list(deleted_item_ids),
+        ))
+
+# --- ETag (조건부 GET) 유틸리티 ---
+# 브라우저가 매번 If-None-Match로 재검증하도록 하여, 바뀌지 않았으면 304(본문 없음)를 받게 합니다.
+CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 헤더 값 중 하나라도 etag와 같으면 True (W/ 약한 비교)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    strip_weak = lambda tag: tag.strip().removeprefix("W/")
+    return strip_weak(etag) in {strip_weak(tag) for tag in if_none_match.split(",")}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **CACHE_HEADERS})
+
+# fields= 로 선택할 수 있는 컬럼 (이름 -> SELECT 식)
+TRIP_LIST_FIELDS = {
+    "id": lambda: models.Trip.id,
+    "title": lambda: models.Trip.title,
+    "start_date": lambda: models.Trip.start_date,
+    "end_date": lambda: models.Trip.end_date,
+    "owner_id": lambda: models.Trip.owner_id,
+    "item_count": trip_item_count,
+}
+
+# (비동기 세션용) 사용자 조회 함수
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
+
+# --- 새 유틸리티 함수 (토큰 생성) ---
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """Access Token을 생성합니다."""
@@ -70,68 +290,96 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15) # 기본 15분
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 # --- API 엔드포인트 ---
 
 # (루트 엔드포인트는 그대로 둠)
-@app.get("/")
+@router.get("/")
 def read_root():
     return {"Hello": "Backend"}
 
-# (회원가입 엔드포인트는 그대로 둠)
-@app.post("/api/auth/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user_by_email(db, email=user.email)
+# (회원가입 엔드포인트)
+@router.post("/api/auth/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
+async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="이미 사용 중인 이메일입니다."
         )
-    hashed_password = get_password_hash(user.password)
+    # (해싱은 별도 프로세스에서 실행되므로 다른 요청을 막지 않습니다)
+    hashed_password = await get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         username=user.username,
-        hashed_password=hashed_password
+        hashed_password=hashed_password,
+        trips=[] # 새 사용자의 여행 목록은 비어 있으므로 응답 시 추가 조회가 필요 없습니다.
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user) 
+    await db.commit()
     return db_user
 
 # --- 로그인 엔드포인트 ---
-@app.post("/api/auth/login", response_model=schemas.Token)
-def login_for_access_token(
+@router.post("/api/auth/login", response_model=schemas.Token)
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    credentials_error = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="이메일 또는 비밀번호가 잘못되었습니다.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
     # 1. 이메일(username 필드 사용)로 사용자 확인
-    user = get_user_by_email(db, email=form_data.username)
+    user = await get_user_by_email(db, email=form_data.username)
     
     # 2. 사용자가 없거나 비밀번호가 틀린 경우
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="이메일 또는 비밀번호가 잘못되었습니다.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    if not user:
+        raise credentials_error
+    is_valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not is_valid:
+        raise credentials_error
+
+    # (추가) 해싱 비용(PASSWORD_HASH_ROUNDS)이 바뀌었으면 새 비용으로 다시 저장합니다.
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     
     # 3. 토큰 생성
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    # (추가) 숫자 user id("uid")도 함께 담아, 소유권 검사에 User 행이 필요 없게 합니다.
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    토큰을 디코딩하고, 해당 이메일의 사용자를 DB에서 찾아 반환합니다.
+    토큰을 디코딩하고, 해당 사용자의 Principal(id, email, username)을 반환합니다.
+    캐시에 있으면 DB를 조회하지 않고, 없을 때만 DB에서 한 번 조회합니다.
+    """
+    principal = await authenticate_token(db, token)
+    # (read-your-writes) 이 요청의 primary 세션이 커밋하면, 이 사용자는 잠시 primary에서 읽습니다.
+    db.info["user_id"] = principal.id
+    return principal
+
+async def get_read_db(current_user: Principal = Depends(get_current_user)):
+    """
+    읽기 전용 엔드포인트용 세션. 복제본(DATABASE_REPLICA_URLS)이 있으면 복제본에서 읽고,
+    최근에 쓰기를 커밋한 사용자는 DB_READ_YOUR_WRITES_SECONDS 동안 primary에서 읽습니다.
     """
+    async with read_session(prefer_primary=database.get_engines().recent_writers.is_recent(current_user.id)) as db:
+        yield db
+
+async def authenticate_token(db: AsyncSession, token: str) -> Principal:
+    """(get_current_user / WebSocket 공용) 토큰의 사용자를 확인합니다. 유효하지 않으면 401 HTTPException."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="유효한 자격 증명을 찾을 수 없습니다.",
@@ -139,102 +387,339 @@ async def get_current_user(
     )
     try:
         # 토큰 디코딩
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         email: str = payload.get("sub") # "sub" (subject)는 우리가 토큰 생성 시 넣은 이메일입니다.
         if email is None:
             raise credentials_exception
         
         # 토큰 데이터 스키마로 유효성 검사 (선택적이지만 좋음)
-        token_data = schemas.TokenData(email=email)
+        token_data = schemas.TokenData(email=email, user_id=payload.get("uid"))
         
     except JWTError:
         raise credentials_exception
-    
-    # DB에서 사용자 조회
-    user = get_user_by_email(db, email=token_data.email)
+
+    # 1. 캐시 조회 (DB 왕복 없음)
+    principal = principal_cache.get(token_data.email)
+    if principal is not None and (token_data.user_id is None or principal.id == token_data.user_id):
+        return principal
+
+    # 2. 캐시에 없으면 DB에서 사용자 조회 (uid가 있으면 기본 키로 조회)
+    if token_data.user_id is not None:
+        user = await get_user_by_id(db, token_data.user_id)
+        if user is not None and user.email != token_data.email:
+            user = None
+    else:
+        user = await get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
-        
-    return user # user 객체를 반환합니다.
+
+    principal = Principal(id=user.id, email=user.email, username=user.username)
+    principal_cache.set(token_data.email, principal, token_exp=payload.get("exp"))
+    return principal # Principal 객체를 반환합니다.
 
 
 # --- "내 정보" 엔드포인트  ---
-@app.get("/api/users/me", response_model=schemas.User)
+@router.get("/api/users/me", response_model=schemas.User)
 async def read_users_me(
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     현재 로그인된 사용자의 정보를 반환합니다.
     Depends(get_current_user)가 토큰을 검사하고 사용자 정보를 주입해줍니다.
     """
-    return current_user
+    # 응답에 trips(+items)가 포함되므로 이 엔드포인트에서만 User 행을 불러옵니다.
+    # selectinload로 trips/items를 각각 쿼리 1번씩에 미리 불러옵니다. (N+1 방지)
+    result = await db.execute(
+        select(models.User).options(
+            selectinload(models.User.trips).selectinload(models.Trip.items)
+        ).where(models.User.id == current_user.id)
+    )
+    db_user = result.scalars().first()
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    return json_response(schemas.User, db_user)
 
-@app.post("/api/trips", response_model=schemas.Trip, status_code=status.HTTP_201_CREATED)
-def create_trip(
+@router.post("/api/trips", response_model=schemas.Trip, status_code=status.HTTP_201_CREATED)
+async def create_trip(
     trip: schemas.TripCreate, 
-    db: Session = Depends(get_db), 
-    current_user: models.User = Depends(get_current_user) # (중요) 로그인한 사용자만
+    db: AsyncSession = Depends(get_async_db), 
+    current_user: Principal = Depends(get_current_user) # (중요) 로그인한 사용자만
 ):
     """
     새로운 여행(Trip)을 생성합니다.
     """
     # trip 객체와 owner_id를 함께 DB 모델로 만듭니다.
-    db_trip = models.Trip(**trip.model_dump(), owner_id=current_user.id)
+    # (items=[]) 새 여행의 일정 목록은 비어 있으므로 응답 시 추가 조회가 필요 없습니다.
+    db_trip = models.Trip(**trip.model_dump(), owner_id=current_user.id, items=[])
     db.add(db_trip)
-    db.commit()
-    db.refresh(db_trip)
+    await db.commit()
     return db_trip
 
 
-@app.get("/api/trips", response_model=List[schemas.Trip])
-def read_my_trips(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user) # (중요) 로그인한 사용자만
+@router.get("/api/trips", response_model=List[schemas.Trip] | List[schemas.TripSummary])
+async def read_my_trips(
+    request: Request,
+    view: Literal["full", "summary"] = "full",
+    limit: int | None = Query(default=None, ge=1, le=MAX_TRIPS_PAGE_SIZE),
+    cursor: int | None = None,
+    fields: str | None = None,
+    start_from: date | None = None,
+    start_to: date | None = None,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user) # (중요) 로그인한 사용자만
 ):
     """
-    현재 로그인한 사용자의 모든 여행(Trip) 목록을 조회합니다.
+    현재 로그인한 사용자의 여행(Trip) 목록을 id 순으로 조회합니다.
+    - view=summary 이면 items 대신 일정 개수(item_count)만 담은 요약 목록을 반환합니다.
+    - limit/cursor: 키셋 페이지네이션. 다음 페이지가 있으면 X-Next-Cursor 헤더로 cursor 값을 알려줍니다.
+    - fields: 필요한 컬럼만 조회합니다. (예: fields=id,title,start_date,end_date)
+    - start_from/start_to: 시작일 범위 필터 (trips(owner_id, start_date) 인덱스 사용)
+    - ETag를 반환하며, If-None-Match가 일치하면 목록을 만들지 않고 304를 반환합니다.
     """
-    # current_user.trips는 models.py의 "relationship" 덕분에 사용 가능합니다.
-    return current_user.trips
+    # (ETag) 내 여행 전체의 (개수, 최대 id, version 합)이 같으면 목록도 같습니다.
+    fingerprint = await trips_fingerprint(db, current_user.id)
+    etag = make_etag("trips", current_user.id, *fingerprint, request.url.query)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # current_user는 Principal이므로 owner_id로 직접 조회합니다.
+    conditions = [models.Trip.owner_id == current_user.id]
+    if cursor is not None:
+        conditions.append(models.Trip.id > cursor)
+    if start_from is not None:
+        conditions.append(models.Trip.start_date >= start_from)
+    if start_to is not None:
+        conditions.append(models.Trip.start_date <= start_to)
+
+    def paginate(stmt):
+        stmt = stmt.where(*conditions).order_by(models.Trip.id)
+        # 다음 페이지가 있는지 알기 위해 한 개 더 조회합니다.
+        return stmt.limit(limit + 1) if limit is not None else stmt
+
+    def next_cursor(rows, get_id) -> str | None:
+        if limit is None or len(rows) <= limit:
+            return None
+        del rows[limit:]
+        return str(get_id(rows[-1]))
+
+    if fields:
+        # (필드 선택) 요청한 컬럼만 SELECT 합니다. items는 선택할 수 없습니다.
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in TRIP_LIST_FIELDS]
+        if not names or unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"선택할 수 없는 필드입니다: {', '.join(unknown)} (가능: {', '.join(TRIP_LIST_FIELDS)})"
+            )
+        columns = [TRIP_LIST_FIELDS[name]().label(name) for name in names]
+        if "id" not in names:
+            columns.append(models.Trip.id.label("_cursor_id"))
+        rows = list((await db.execute(paginate(select(*columns)))).mappings().all())
+        cursor_value = next_cursor(rows, lambda row: row["id"] if "id" in names else row["_cursor_id"])
+        headers = {"ETag": etag, **CACHE_HEADERS}
+        if cursor_value:
+            headers["X-Next-Cursor"] = cursor_value
+        content = [{name: row[name] for name in names} for row in rows]
+        return json_response(List[dict], content, headers=headers)
+
+    if view == "summary":
+        # 일정 개수는 상관 서브쿼리로 계산하여 쿼리 1번으로 끝냅니다.
+        rows = list((await db.execute(
+            paginate(select(models.Trip, trip_item_count()))
+        )).all())
+        cursor_value = next_cursor(rows, lambda row: row[0].id)
+        trips = [
+            schemas.TripSummary.model_validate(db_trip).model_copy(update={"item_count": count})
+            for db_trip, count in rows
+        ]
+    else:
+        # (N+1 방지) 모든 여행의 items를 IN 쿼리 1번으로 함께 불러옵니다.
+        result = await db.execute(
+            paginate(select(models.Trip).options(selectinload(models.Trip.items)))
+        )
+        trips = list(result.scalars().all())
+        cursor_value = next_cursor(trips, lambda db_trip: db_trip.id)
+
+    headers = {"ETag": etag, **CACHE_HEADERS}
+    if cursor_value:
+        headers["X-Next-Cursor"] = cursor_value
+    return json_response(List[schemas.TripSummary] if view == "summary" else List[schemas.Trip], trips, headers=headers)
+
+# --- 내 여행 전체 내보내기 (백업 / 계정 이전) ---
+# (주의) /api/trips/{trip_id} 보다 먼저 등록해야 "export"가 trip_id로 해석되지 않습니다.
+@router.get("/api/trips/export", response_class=StreamingResponse)
+async def export_my_trips(
+    format: trip_transfer.TransferFormat = "ndjson",
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    내 여행과 모든 세부 일정을 ndjson 또는 csv 로 스트리밍합니다.
+    서버 측 커서(yield_per)로 EXPORT_BATCH_SIZE 행씩 읽어 바로 내보내므로, 일정이 많아도 메모리 사용량이 일정합니다.
+    """
+    Trip, Item = models.Trip, models.ItineraryItem
+    stmt = (
+        select(
+            Trip.id.label("trip_id"),
+            Trip.title.label("trip_title"),
+            Trip.start_date.label("trip_start_date"),
+            Trip.end_date.label("trip_end_date"),
+            Item.id.label("item_id"),
+            Item.day,
+            Item.order_sequence,
+            Item.place_name,
+            Item.address,
+            Item.memo,
+            Item.latitude,
+            Item.longitude,
+        )
+        .outerjoin(Item, Item.trip_id == Trip.id)
+        .where(Trip.owner_id == current_user.id)
+        .order_by(Trip.id, Item.day, Item.order_sequence, Item.id)
+        .execution_options(yield_per=settings.export_batch_size)
+    )
+
+    async def body():
+        # (응답을 보내는 동안 커서를 열어 두어야 하므로 요청 의존성과 별도의 세션을 사용합니다)
+        writer = trip_transfer.ExportWriter(format)
+        yield writer.header()
+        async with read_session(prefer_primary=database.get_engines().recent_writers.is_recent(current_user.id)) as session:
+            result = await session.stream(stmt)
+            async for rows in result.partitions():
+                yield writer.write(rows)
+
+    return StreamingResponse(
+        body(),
+        media_type=trip_transfer.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="trips.{format}"'},
+    )
+
+# --- 여행 데이터 가져오기 ---
+@router.post("/api/trips/import", response_model=schemas.ImportResult, status_code=status.HTTP_201_CREATED)
+async def import_my_trips(
+    request: Request,
+    format: trip_transfer.TransferFormat = "ndjson",
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    내보내기 파일(ndjson/csv)을 요청 본문으로 받아 새 여행/일정으로 추가합니다.
+    본문을 스트리밍으로 읽으며 IMPORT_CHUNK_SIZE 개씩 일괄 INSERT 하고, 전체를 하나의 트랜잭션으로 커밋합니다.
+    (파일의 id는 여행-일정 연결에만 쓰이며, 새 id가 부여됩니다. 오류가 있으면 아무것도 저장되지 않습니다)
+    """
+    trip_ids: dict[str, int] = {}            # 파일의 여행 id -> 새 여행 id
+    pending_trips: list[tuple[str, dict]] = []
+    pending_items: list[tuple[str, dict]] = []
+    counts = {"trips_created": 0, "items_created": 0}
+
+    async def flush():
+        if pending_trips:
+            # (파일의 id와 새 id를 짝짓기 위해 입력 순서대로 RETURNING 받습니다)
+            new_ids = (await db.scalars(
+                insert(models.Trip).returning(models.Trip.id, sort_by_parameter_order=True),
+                [{**values, "owner_id": current_user.id} for _, values in pending_trips],
+            )).all()
+            trip_ids.update(zip((source_id for source_id, _ in pending_trips), new_ids))
+            counts["trips_created"] += len(pending_trips)
+        if pending_items:
+            await db.execute(
+                insert(models.ItineraryItem),
+                [{**values, "trip_id": trip_ids[source_id]} for source_id, values in pending_items],
+            )
+            counts["items_created"] += len(pending_items)
+        pending_trips.clear()
+        pending_items.clear()
+
+    known_trip_ids: set[str] = set()
+    line_no = 0
+    try:
+        async for line_no, record in trip_transfer.read_records(request.stream(), format):
+            kind = record.get("type")
+            source_id = str(record.get("id" if kind == "trip" else "trip_id"))
+            if kind == "trip":
+                if source_id in known_trip_ids:
+                    raise trip_transfer.ImportFormatError(line_no, f"여행 id {source_id} 가 중복되었습니다.")
+                known_trip_ids.add(source_id)
+                pending_trips.append((source_id, schemas.TripCreate.model_validate(record).model_dump()))
+            elif kind == "item":
+                if source_id not in known_trip_ids:
+                    raise trip_transfer.ImportFormatError(line_no, "일정보다 여행(trip)이 먼저 나와야 합니다.")
+                pending_items.append((source_id, schemas.ItineraryItemCreate.model_validate(record).model_dump()))
+            else:
+                raise trip_transfer.ImportFormatError(line_no, 'type은 "trip" 또는 "item" 이어야 합니다.')
+
+            if len(pending_trips) + len(pending_items) >= settings.import_chunk_size:
+                await flush()
+        await flush()
+    except trip_transfer.ImportFormatError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    except ValidationError as error:
+        message = error.errors()[0]["msg"].removeprefix("Value error, ")
+        raise HTTPException(status_code=400, detail=f"{line_no}번째 줄: {message}")
+
+    await db.commit()
+    return counts
 
 # --- 특정 여행의 상세 정보 (세부 일정 포함) ---
-@app.get("/api/trips/{trip_id}", response_model=schemas.Trip)
-def read_trip_details(
+@router.get("/api/trips/{trip_id}", response_model=schemas.Trip | schemas.TripGrouped)
+async def read_trip_details(
     trip_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    view: Literal["full", "grouped"] = "full",
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     특정 여행(Trip)의 상세 정보와 모든 세부 일정(items)을 조회합니다.
+    일정은 (day, order_sequence) 순으로 정렬되어 있으며,
+    view=grouped 이면 items 대신 날짜별로 묶은 days: [{day, items}] 형태로 반환합니다.
+    ETag(여행 version 기반)를 반환하며, If-None-Match가 일치하면 일정을 불러오지 않고 304를 반환합니다.
     """
-    db_trip = db.query(models.Trip).filter(
-        models.Trip.id == trip_id,
-        models.Trip.owner_id == current_user.id # (보안) 본인 여행만 조회
-    ).first()
-    
-    if db_trip is None:
-        raise HTTPException(status_code=404, detail="여행을 찾을 수 없습니다.")
-        
-    return db_trip
+    # (보안) 본인 여행만 조회
+    db_trip = await ownership.get_trip(db, trip_id, current_user.id)
+
+    etag = make_etag("trip", db_trip.id, db_trip.version, view)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, **CACHE_HEADERS}
+
+    # 바뀐 경우에만 일정을 (day, order_sequence) 순으로 불러옵니다.
+    # (refresh(attribute_names=["items"])는 여행 행을 한 번 더 조회하므로 일정만 직접 조회합니다)
+    items = (await db.scalars(
+        select(models.ItineraryItem)
+        .where(models.ItineraryItem.trip_id == db_trip.id)
+        .order_by(models.ItineraryItem.day, models.ItineraryItem.order_sequence, models.ItineraryItem.id)
+    )).all()
+    set_committed_value(db_trip, "items", items)
+
+    if view == "grouped":
+        grouped = schemas.TripGrouped(
+            id=db_trip.id,
+            owner_id=db_trip.owner_id,
+            title=db_trip.title,
+            start_date=db_trip.start_date,
+            end_date=db_trip.end_date,
+            version=db_trip.version,
+            days=group_items_by_day(db_trip.items),
+        )
+        return json_response(schemas.TripGrouped, grouped, headers=headers)
+
+    return json_response(schemas.Trip, db_trip, headers=headers)
 
 # --- 여행(Trip) 수정 ---
-@app.put("/api/trips/{trip_id}", response_model=schemas.Trip)
-def update_trip(
+@router.put("/api/trips/{trip_id}", response_model=schemas.Trip)
+async def update_trip(
     trip_id: int,
     trip_update: schemas.TripUpdate, 
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     특정 여행(Trip)의 정보를 (제목, 날짜) 수정합니다.
     """
-    db_trip = db.query(models.Trip).filter(
-        models.Trip.id == trip_id,
-        models.Trip.owner_id == current_user.id 
-    ).first()
-    
-    if db_trip is None:
-        raise HTTPException(status_code=404, detail="여행을 찾을 수 없습니다.")
+    # (응답에 items가 포함되므로 함께 불러옵니다)
+    db_trip = await ownership.get_trip(db, trip_id, current_user.id, selectinload(models.Trip.items))
 
     # Pydantic 모델에서 받은 데이터를 딕셔너리로 변환
     update_data = trip_update.model_dump(exclude_unset=True)
@@ -252,166 +737,755 @@ def update_trip(
 
     for key, value in update_data.items():
         setattr(db_trip, key, value) 
+
+    new_versions = await bump_trip_versions(db, [db_trip.id])
+    set_committed_value(db_trip, "version", new_versions[db_trip.id])
         
-    db.commit()
-    db.refresh(db_trip)
+    await db.commit()
+    await publish_trip_event(schemas.TripEvent(
+        type="trip",
+        trip_id=db_trip.id,
+        version=db_trip.version,
+        title=db_trip.title,
+        start_date=db_trip.start_date,
+        end_date=db_trip.end_date,
+    ))
     return db_trip
 
-@app.delete("/api/trips/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_trip(
+@router.delete("/api/trips/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_trip(
     trip_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     특정 여행(Trip)을 삭제합니다.
-    (models.py의 cascade 설정으로 인해 관련 items도 자동 삭제됩니다.)
+    (관련 items도 함께 삭제합니다. 일정 수와 관계없이 DELETE 두 문)
     """
-    db_trip = db.query(models.Trip).filter(
-        models.Trip.id == trip_id,
-        models.Trip.owner_id == current_user.id # 본인 여행만 삭제 가능
-    ).first()
-    
-    if db_trip is None:
-        raise HTTPException(status_code=404, detail="여행을 찾을 수 없습니다.")
-        
-    db.delete(db_trip)
-    db.commit()
+    # (보안) 본인 여행만 삭제 가능
+    await ownership.delete_trip(db, trip_id, current_user.id)
+    await db.commit()
+    await publish_trip_event(schemas.TripEvent(type="deleted", trip_id=trip_id))
     return # 204 No Content는 응답 본문이 없어야 합니다.
 
 # === ItineraryItem API 엔드포인트 ===
 
-@app.post("/api/trips/{trip_id}/items", response_model=schemas.ItineraryItem, status_code=status.HTTP_201_CREATED)
-def create_itinerary_item_for_trip(
+@router.post("/api/trips/{trip_id}/items", response_model=schemas.ItineraryItem | schemas.Trip | schemas.TripDelta, status_code=status.HTTP_201_CREATED)
+async def create_itinerary_item_for_trip(
     trip_id: int,
     item: schemas.ItineraryItemCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    return_mode: WriteReturnMode = Query(default="item", alias="return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     특정 여행(Trip)에 새로운 세부 일정(ItineraryItem)을 추가합니다.
+    ?return=trip 이면 갱신된 여행 전체를, ?return=delta 이면 변경분과 새 version을 반환합니다.
     """
-    # 1. 이 여행이 현재 로그인한 사용자의 소유인지 확인
-    db_trip = db.query(models.Trip).filter(
-        models.Trip.id == trip_id,
-        models.Trip.owner_id == current_user.id
-    ).first()
-    
-    if db_trip is None:
-        raise HTTPException(status_code=404, detail="여행을 찾을 수 없습니다.")
+    # 1. 이 여행이 현재 로그인한 사용자의 소유인지 확인하면서 version을 올립니다. (UPDATE 한 문)
+    versions = {trip_id: await ownership.bump_trip_version(db, trip_id, current_user.id)}
     
-    # 2. 세부 일정(Item) 객체 생성 및 DB에 추가
-    db_item = models.ItineraryItem(**item.model_dump(), trip_id=trip_id)
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
-    return db_item
+    # 2. 세부 일정(Item)을 INSERT ... RETURNING으로 추가 (커밋 후 refresh 왕복 없음)
+    db_item = (await db.scalars(
+        insert(models.ItineraryItem).returning(models.ItineraryItem),
+        [{**item.model_dump(), "trip_id": trip_id}],
+    )).one()
+    response = await build_write_response(db, return_mode, trip_id, versions[trip_id], items=[db_item])
+    await db.commit()
+    await publish_item_changes(versions, items=[db_item])
+    return response or db_item
+
+# --- 세부 일정(Item) 일괄 추가 (다른 서비스의 일정 가져오기용) ---
+@router.post("/api/trips/{trip_id}/items:batch", response_model=List[schemas.ItineraryItem] | schemas.Trip | schemas.TripDelta, status_code=status.HTTP_201_CREATED)
+async def create_itinerary_items_batch(
+    trip_id: int,
+    items: List[schemas.ItineraryItemCreate],
+    return_mode: WriteReturnMode = Query(default="item", alias="return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    특정 여행(Trip)에 여러 세부 일정을 한 번에 추가합니다.
+    소유권은 한 번만 확인하고, 다중 행 INSERT ... RETURNING으로 한꺼번에 저장합니다.
+    (전부 저장되거나 전부 저장되지 않습니다)
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="추가할 일정이 없습니다.")
+    if len(items) > settings.max_batch_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"한 번에 최대 {settings.max_batch_items}개의 일정만 추가할 수 있습니다."
+        )
+
+    # 1. 이 여행이 현재 로그인한 사용자의 소유인지 확인하면서 version을 올립니다. (한 번만)
+    versions = {trip_id: await ownership.bump_trip_version(db, trip_id, current_user.id)}
+
+    # 2. 다중 행 INSERT ... RETURNING 으로 한 번에 저장하고 생성된 행을 돌려받습니다.
+    #    (sort_by_parameter_order를 쓰면 DB에 따라 행마다 INSERT로 바뀌므로,
+    #     VALUES 순서대로 부여되는 id로 정렬하여 요청 순서를 맞춥니다)
+    stmt = insert(models.ItineraryItem).returning(models.ItineraryItem)
+    created_items = (await db.scalars(
+        stmt, [{**item.model_dump(), "trip_id": trip_id} for item in items]
+    )).all()
+    created_items = sorted(created_items, key=lambda db_item: db_item.id)
+
+    # 3. 하나의 트랜잭션으로 커밋
+    response = await build_write_response(db, return_mode, trip_id, versions[trip_id], items=created_items)
+    await db.commit()
+    await publish_item_changes(versions, items=created_items)
+    return response or created_items
 
 # --- 세부 일정(Item) 수정 ---
-@app.put("/api/items/{item_id}", response_model=schemas.ItineraryItem)
-def update_itinerary_item(
+@router.put("/api/items/{item_id}", response_model=schemas.ItineraryItem | schemas.Trip | schemas.TripDelta)
+async def update_itinerary_item(
     item_id: int,
     item_update: schemas.ItineraryItemUpdate, # 방금 만든 스키마 사용
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    return_mode: WriteReturnMode = Query(default="item", alias="return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     특정 세부 일정(ItineraryItem)을 (메모, 날짜, 순서) 수정합니다.
+    ?return=trip 이면 갱신된 여행 전체를, ?return=delta 이면 변경분과 새 version을 반환합니다.
     """
-    db_item = db.query(models.ItineraryItem).filter(
-        models.ItineraryItem.id == item_id
-    ).first()
-
-    if db_item is None:
-        raise HTTPException(status_code=404, detail="일정을 찾을 수 없습니다.")
-
-    # (보안) 이 아이템이 속한 여행이 현재 사용자 소유인지 확인
-    if db_item.trip.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="수정 권한이 없습니다.")
-
     # Pydantic 모델에서 받은 데이터를 딕셔너리로 변환 (보낸 필드만)
     update_data = item_update.model_dump(exclude_unset=True)
-    
-    for key, value in update_data.items():
-        setattr(db_item, key, value)
-        
-    db.commit()
-    db.refresh(db_item)
-    return db_item
+
+    # (보안) 소유권 확인과 수정을 UPDATE ... WHERE 소유권 RETURNING 한 문으로 처리합니다.
+    # (없는 일정이면 404, 다른 사용자의 일정이면 403)
+    db_item = await ownership.update_item(db, item_id, current_user.id, update_data)
+    trip_id = db_item.trip_id
+
+    versions = await bump_trip_versions(db, [trip_id])
+    response = await build_write_response(db, return_mode, trip_id, versions[trip_id], items=[db_item])
+    await db.commit()
+    await publish_item_changes(versions, items=[db_item])
+    return response or db_item
 
 # --- 세부 일정(Item) 삭제 ---
-@app.delete("/api/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_itinerary_item(
+@router.delete("/api/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
+async def delete_itinerary_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    return_mode: WriteReturnMode = Query(default="item", alias="return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     특정 세부 일정(ItineraryItem)을 삭제합니다.
+    기본은 204(본문 없음)이며, ?return=trip / ?return=delta 이면 200과 함께 갱신된 여행/변경분을 반환합니다.
     """
-    # 1. 삭제할 아이템을 찾습니다.
-    db_item = db.query(models.ItineraryItem).filter(
-        models.ItineraryItem.id == item_id
-    ).first()
+    # (보안) 소유권 확인과 삭제를 DELETE ... WHERE 소유권 RETURNING 한 문으로 처리합니다.
+    # (없는 일정이면 404, 다른 사용자의 일정이면 403)
+    trip_id = await ownership.delete_item(db, item_id, current_user.id)
+    versions = await bump_trip_versions(db, [trip_id])
+    response = await build_write_response(db, return_mode, trip_id, versions[trip_id], deleted_item_ids=[item_id])
+    await db.commit()
+    await publish_item_changes(versions, deleted_item_ids=[item_id])
+    if response is not None:
+        return json_response(type(response), response)
+    return Response(status_code=status.HTTP_204_NO_CONTENT) # 204 No Content
 
-    if db_item is None:
-        raise HTTPException(status_code=404, detail="일정을 찾을 수 없습니다.")
+async def reorder_items(
+    db: AsyncSession,
+    current_user: Principal,
+    new_orders: dict[int, int],
+    trip_id: int | None = None,
+    day: int | None = None,
+):
+    """
+    {일정 id: 새 순서} 를 소유권 확인 후 한 번에 반영하고 (갱신된 일정 목록, {trip_id: 새 version})을 반환합니다.
+    (커밋은 호출한 쪽에서 합니다)
+    """
+    # 1. (보안) 소유권 확인과 일괄 업데이트를 한 문으로 처리합니다.
+    #    UPDATE ... SET order_sequence = CASE id WHEN ... END WHERE 소유권 RETURNING (행마다 왕복하지 않음)
+    updated_items = await ownership.update_item_orders(db, current_user.id, new_orders, trip_id=trip_id, day=day)
 
-    # 2. (보안) 그 아이템이 속한 여행(Trip)이 현재 로그인한 사용자의 소유인지 확인
-    # db_item.trip 관계(relationship)를 통해 소유자(owner)에 접근합니다.
-    if db_item.trip.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="삭제 권한이 없습니다.")
-        
-    # 3. 아이템 삭제
-    db.delete(db_item)
-    db.commit()
-    return # 204 No Content
+    # (요청에 들어온 순서대로 응답합니다.)
+    position = {item_id: index for index, item_id in enumerate(new_orders)}
+    updated_items = sorted(updated_items, key=lambda item: position[item.id])
+
+    # 2. 관련 여행의 version을 올립니다.
+    versions = await bump_trip_versions(db, {item.trip_id for item in updated_items})
+    return updated_items, versions
 
 # --- 세부 일정(Item) 순서 일괄 업데이트 ---
-@app.post("/api/items/reorder", response_model=List[schemas.ItineraryItem])
-def reorder_itinerary_items(
+@router.post("/api/items/reorder", response_model=List[schemas.ItineraryItem] | schemas.Trip | schemas.TripDelta)
+async def reorder_itinerary_items(
     updates: List[schemas.ItemOrderUpdate], # 방금 만든 스키마의 '리스트'를 받음
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    trip_id: int | None = None, # (선택) 이 여행의 일정만 재정렬
+    day: int | None = None,     # (선택) 이 날짜(N일차)의 일정만 재정렬
+    return_mode: WriteReturnMode = Query(default="item", alias="return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     세부 일정(ItineraryItem)의 순서(order_sequence)를 일괄 업데이트합니다.
+    trip_id/day를 지정하면 해당 여행/날짜에 속한 일정만 재정렬할 수 있습니다.
+    ?return=trip / ?return=delta 는 한 여행의 일정만 재정렬할 때 사용할 수 있습니다.
     """
-    # (매우 중요)
-    # 이 로직은 간단한 구현이며,
-    # 실제 프로덕션에서는 더 효율적인 bulk update 쿼리를 사용해야 합니다.
-    
-    updated_items = []
-    
-    # 1. DB에서 업데이트할 ID 목록을 먼저 조회합니다.
-    item_ids = [update.id for update in updates]
-    db_items = db.query(models.ItineraryItem).filter(
-        models.ItineraryItem.id.in_(item_ids)
-    ).all()
-    
-    # { id: db_item } 형태의 딕셔너리로 변환 (빠른 조회를 위해)
-    item_map = {item.id: item for item in db_items}
-    
-    if len(db_items) != len(updates):
-        raise HTTPException(status_code=404, detail="일부 일정을 찾을 수 없습니다.")
+    if not updates:
+        return []
 
-    # 2. 각 아이템의 소유권 검사 및 순서 업데이트
-    for update in updates:
-        db_item = item_map.get(update.id)
-        
-        # (보안) 이 아이템이 속한 여행이 현재 사용자 소유인지 확인
-        if db_item.trip.owner_id != current_user.id:
-            raise HTTPException(status_code=403, detail=f"일정(ID: {db_item.id}) 수정 권한이 없습니다.")
-            
-        # 순서 업데이트
-        db_item.order_sequence = update.order_sequence
-        updated_items.append(db_item)
-        
-    # 3. DB에 일괄 커밋
-    db.commit()
-    
-    # (선택) refresh가 필요하면 루프를 다시 돌아야 함
-    # for item in updated_items:
-    #     db.refresh(item)
-        
-    return updated_items
\ No newline at end of file
+    # { id: 새 순서 } 형태의 딕셔너리로 변환
+    new_orders = {update.id: update.order_sequence for update in updates}
+    if len(new_orders) != len(updates):
+        raise HTTPException(status_code=400, detail="중복된 일정 ID가 있습니다.")
+
+    updated_items, versions = await reorder_items(db, current_user, new_orders, trip_id=trip_id, day=day)
+    if return_mode != "item" and len(versions) > 1:
+        # (커밋하지 않으므로 변경 내용은 롤백됩니다)
+        raise HTTPException(status_code=400, detail="return=trip/delta 는 한 여행의 일정만 재정렬할 때 사용할 수 있습니다.")
+
+    # 응답을 만든 뒤 DB에 커밋
+    if return_mode != "item":
+        (only_trip_id,) = versions
+        response = await build_write_response(db, return_mode, only_trip_id, versions[only_trip_id], items=updated_items)
+    else:
+        response = [schemas.ItineraryItem.model_validate(item) for item in updated_items]
+    await db.commit()
+    await publish_item_changes(versions, items=updated_items)
+    return response
+
+# --- 일자별 동선(경로) ---
+
+def compute_trip_route(trip_id: int, version: int, rows) -> schemas.TripRoute:
+    """(day, order_sequence) 순으로 정렬된 (id, day, latitude, longitude) 행으로 일자별 동선을 계산합니다."""
+    days: list[schemas.DayRoute] = []
+    day_rows: list = []
+
+    def flush():
+        located = [row for row in day_rows if row.latitude is not None and row.longitude is not None]
+        skipped = [row.id for row in day_rows if row.latitude is None or row.longitude is None]
+        lats = [row.latitude for row in located]
+        lngs = [row.longitude for row in located]
+        # 현재 순서와 제안 순서의 총 거리를 같은 거리 행렬에서 반올림 전 값으로 구하고, 마지막에 한 번만 반올림합니다.
+        # (구간별로 반올림한 값을 더하면 이미 최적인 순서도 제안 거리와 달라 보일 수 있습니다)
+        dist = routing.distance_matrix(lats, lngs)
+        legs = [
+            schemas.RouteLeg(from_item_id=start.id, to_item_id=end.id, distance_m=round(float(dist[index, index + 1]), 1))
+            for index, (start, end) in enumerate(zip(located, located[1:]))
+        ]
+        order, optimized_distance = routing.optimize_order(lats, lngs, dist)
+        days.append(schemas.DayRoute(
+            day=day_rows[0].day,
+            item_ids=[row.id for row in day_rows],
+            legs=legs,
+            total_distance_m=round(routing.path_length(dist, range(len(located))), 1),
+            optimized_item_ids=[located[index].id for index in order] + skipped,
+            optimized_distance_m=round(optimized_distance, 1),
+            skipped_item_ids=skipped,
+        ))
+
+    for row in rows:
+        if day_rows and day_rows[0].day != row.day:
+            flush()
+            day_rows = []
+        day_rows.append(row)
+    if day_rows:
+        flush()
+    return schemas.TripRoute(trip_id=trip_id, version=version, days=days)
+
+async def get_trip_route(db: AsyncSession, db_trip: models.Trip) -> schemas.TripRoute:
+    """캐시에 (trip_id, version) 결과가 있으면 그대로, 없으면 일정 좌표만 읽어 계산합니다."""
+    route = route_cache.get(db_trip.id, db_trip.version)
+    if route is None:
+        Item = models.ItineraryItem
+        rows = (await db.execute(
+            select(Item.id, Item.day, Item.latitude, Item.longitude)
+            .where(Item.trip_id == db_trip.id)
+            .order_by(Item.day, Item.order_sequence, Item.id)
+        )).all()
+        route = compute_trip_route(db_trip.id, db_trip.version, rows)
+        route_cache.set(db_trip.id, db_trip.version, route)
+    return route
+
+@router.get("/api/trips/{trip_id}/route", response_model=schemas.TripRoute)
+async def read_trip_route(
+    trip_id: int,
+    response: Response,
+    day: int | None = None, # (선택) 이 날짜(N일차)만
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    일자별로 현재 순서(order_sequence)의 구간 거리와 총 이동 거리, 그리고 더 짧은 방문 순서 제안을 반환합니다.
+    제안 순서는 각 날짜의 첫 장소를 출발지로 고정하고 최근접 이웃 + 2-opt로 계산합니다.
+    결과는 여행 version 별로 캐시되며, 일정이 바뀌면 다시 계산합니다.
+    """
+    db_trip = await ownership.get_trip(db, trip_id, current_user.id)
+
+    etag = make_etag("route", db_trip.id, db_trip.version, day)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers.update(CACHE_HEADERS)
+
+    route = await get_trip_route(db, db_trip)
+    if day is not None:
+        route = route.model_copy(update={"days": [day_route for day_route in route.days if day_route.day == day]})
+    return route
+
+@router.post("/api/trips/{trip_id}/route:apply", response_model=List[schemas.ItineraryItem] | schemas.Trip | schemas.TripDelta)
+async def apply_trip_route(
+    trip_id: int,
+    day: int | None = None, # (선택) 이 날짜(N일차)만 적용
+    return_mode: WriteReturnMode = Query(default="item", alias="return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    제안된 방문 순서를 실제 일정 순서(order_sequence = 1, 2, ...)로 반영합니다. (일정 순서 일괄 업데이트와 같은 방식)
+    순서가 이미 같은 날짜는 건너뜁니다.
+    """
+    db_trip = await ownership.get_trip(db, trip_id, current_user.id)
+    route = await get_trip_route(db, db_trip)
+
+    new_orders: dict[int, int] = {}
+    for day_route in route.days:
+        if day is not None and day_route.day != day:
+            continue
+        if day_route.optimized_item_ids == day_route.item_ids:
+            continue
+        for sequence, item_id in enumerate(day_route.optimized_item_ids, start=1):
+            new_orders[item_id] = sequence
+
+    if not new_orders:
+        # 바꿀 것이 없으면 version을 올리지 않습니다.
+        return await build_write_response(db, return_mode, trip_id, db_trip.version) or []
+
+    updated_items, versions = await reorder_items(db, current_user, new_orders, trip_id=trip_id)
+    response = await build_write_response(db, return_mode, trip_id, versions[trip_id], items=updated_items)
+    if response is None:
+        response = [schemas.ItineraryItem.model_validate(item) for item in updated_items]
+    await db.commit()
+    await publish_item_changes(versions, items=updated_items)
+    return response
+
+# --- 검색 (여행 제목 / 장소 이름 / 주소 / 메모) ---
+
+def search_score_expression(columns: dict, weights: dict[str, float], terms: list[str]):
+    """search.document_score 와 같은 규칙의 점수를 SQL 식으로 만듭니다."""
+    greatest = func.greatest if database.get_engines().async_engine.dialect.name == "postgresql" else func.max
+    total = None
+    for term in terms:
+        field_scores = [
+            case(
+                (columns[name].istartswith(term, autoescape=True), search.PREFIX_SCORE),
+                (columns[name].icontains(" " + term, autoescape=True), search.WORD_PREFIX_SCORE),
+                (columns[name].icontains(term, autoescape=True), search.CONTAINS_SCORE),
+                else_=0.0,
+            ) * weight
+            for name, weight in weights.items()
+        ]
+        term_score = field_scores[0] if len(field_scores) == 1 else greatest(*field_scores)
+        total = term_score if total is None else total + term_score
+    return total
+
+def search_match_conditions(columns: dict, terms: list[str]):
+    """모든 단어가 (어느 필드든) 포함되어야 합니다. (Postgres에서는 트라이그램 GIN 인덱스 사용)"""
+    return [
+        or_(*(column.icontains(term, autoescape=True) for column in columns.values()))
+        for term in terms
+    ]
+
+async def search_with_sql(db: AsyncSession, owner_id: int, terms: list[str], window: int) -> list[tuple[float, dict]]:
+    """여행/일정에서 각각 상위 window개를 찾아 합친 (점수, hit) 목록"""
+    Trip, Item = models.Trip, models.ItineraryItem
+    trip_columns = {"title": Trip.title}
+    item_columns = {"place_name": Item.place_name, "address": Item.address, "memo": Item.memo}
+
+    trip_score = search_score_expression(trip_columns, search.TRIP_FIELD_WEIGHTS, terms).label("score")
+    trip_rows = (await db.execute(
+        select(Trip.id, Trip.title, trip_score)
+        .where(Trip.owner_id == owner_id, *search_match_conditions(trip_columns, terms))
+        .order_by(trip_score.desc(), Trip.id)
+        .limit(window)
+    )).all()
+
+    item_score = search_score_expression(item_columns, search.ITEM_FIELD_WEIGHTS, terms).label("score")
+    item_rows = (await db.execute(
+        select(Item.id, Item.trip_id, Trip.title, Item.day, Item.place_name, Item.address, Item.memo, item_score)
+        .join(Trip, Item.trip_id == Trip.id)
+        .where(Trip.owner_id == owner_id, *search_match_conditions(item_columns, terms))
+        .order_by(item_score.desc(), Item.id)
+        .limit(window)
+    )).all()
+
+    results = [
+        (round(float(row.score), 4), {"kind": "trip", "id": row.id, "trip_id": row.id, "trip_title": row.title})
+        for row in trip_rows
+    ]
+    results += [
+        (round(float(row.score), 4), {
+            "kind": "item", "id": row.id, "trip_id": row.trip_id, "trip_title": row.title, "day": row.day,
+            "place_name": row.place_name, "address": row.address, "memo": row.memo,
+        })
+        for row in item_rows
+    ]
+    results.sort(key=search.sort_key)
+    return results
+
+async def load_search_index(db: AsyncSession, owner_id: int) -> search.InvertedIndex:
+    """사용자의 메모리 역색인 (여행/일정이 바뀌지 않았으면 캐시된 색인을 그대로 사용)"""
+    fingerprint = await trips_fingerprint(db, owner_id)
+    index = search_index_cache.get(owner_id, fingerprint)
+    if index is not None:
+        return index
+
+    Trip, Item = models.Trip, models.ItineraryItem
+    index = search.InvertedIndex()
+    trip_rows = (await db.execute(select(Trip.id, Trip.title).where(Trip.owner_id == owner_id))).all()
+    for row in trip_rows:
+        index.add(
+            {"kind": "trip", "id": row.id, "trip_id": row.id, "trip_title": row.title},
+            {"title": row.title},
+            search.TRIP_FIELD_WEIGHTS,
+        )
+    item_rows = await db.stream(
+        select(Item.id, Item.trip_id, Trip.title, Item.day, Item.place_name, Item.address, Item.memo)
+        .join(Trip, Item.trip_id == Trip.id)
+        .where(Trip.owner_id == owner_id)
+    )
+    async for row in item_rows:
+        index.add(
+            {
+                "kind": "item", "id": row.id, "trip_id": row.trip_id, "trip_title": row.title, "day": row.day,
+                "place_name": row.place_name, "address": row.address, "memo": row.memo,
+            },
+            {"place_name": row.place_name, "address": row.address, "memo": row.memo},
+            search.ITEM_FIELD_WEIGHTS,
+        )
+    search_index_cache.set(owner_id, fingerprint, index)
+    return index
+
+@router.get("/api/search", response_model=List[schemas.SearchHit])
+async def search_my_trips(
+    response: Response,
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    cursor: int = Query(default=0, ge=0, le=MAX_SEARCH_OFFSET),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    내 여행 제목과 세부 일정(장소 이름/주소/메모)에서 검색어를 찾아 점수 순으로 반환합니다.
+    - 검색어를 공백으로 나눈 모든 단어가 포함된 결과만 반환합니다. (대소문자 무시, 부분 일치)
+    - 점수: 단어마다 가장 잘 맞는 필드의 (가중치 x 일치 점수) 합. 가중치는 여행 제목 > 장소 이름 > 주소/메모,
+      일치 점수는 필드가 단어로 시작 > 어절이 단어로 시작 > 중간에 포함 순입니다.
+    - limit/cursor: 다음 페이지가 있으면 X-Next-Cursor 헤더로 cursor 값을 알려줍니다.
+    """
+    terms = search.query_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="검색어를 입력해 주세요.")
+
+    # 다음 페이지가 있는지 알기 위해 한 개 더 찾습니다.
+    window = cursor + limit + 1
+    if search_backend == "sql":
+        results = await search_with_sql(db, current_user.id, terms, window)
+    else:
+        results = (await load_search_index(db, current_user.id)).search(terms)
+
+    page = results[cursor:cursor + limit]
+    if len(results) > cursor + limit:
+        response.headers["X-Next-Cursor"] = str(cursor + limit)
+    return [schemas.SearchHit(score=score, **hit) for score, hit in page]
+
+# --- 위치(영역/주변) 검색 ---
+
+def parse_coordinates(text: str, count: int, name: str) -> list[float]:
+    """"a,b,c" 형태의 좌표 문자열을 숫자 리스트로 바꿉니다."""
+    try:
+        values = [float(value) for value in text.split(",")]
+    except ValueError:
+        values = []
+    if len(values) != count or not all(-1e9 < value < 1e9 for value in values):
+        raise HTTPException(status_code=400, detail=f"{name} 형식이 올바르지 않습니다.")
+    return values
+
+def check_lat_lng(lat: float, lng: float):
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        raise HTTPException(status_code=400, detail="위도는 -90~90, 경도는 -180~180 사이여야 합니다.")
+
+@router.get("/api/items/search", response_model=List[schemas.ItineraryItemSearchResult])
+async def search_itinerary_items(
+    bbox: str | None = Query(default=None, description="영역 검색: minLng,minLat,maxLng,maxLat"),
+    near: str | None = Query(default=None, description="주변 검색 중심점: lat,lng"),
+    radius: float = Query(default=1000, gt=0, le=MAX_SEARCH_RADIUS_M, description="주변 검색 반경(m)"),
+    limit: int = Query(default=100, ge=1, le=MAX_SEARCH_RESULTS),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    현재 사용자의 세부 일정 중 지정한 영역(bbox) 안 또는 중심점(near) 반경 안에 있는 일정을 찾습니다.
+    지오해시 B-tree 인덱스로 후보를 좁힌 뒤 실제 위경도로 다시 거릅니다.
+    near 검색 결과는 가까운 순으로 정렬되며 distance_m(중심점까지의 거리)이 포함됩니다.
+    """
+    if (bbox is None) == (near is None):
+        raise HTTPException(status_code=400, detail="bbox 또는 near 중 하나만 지정해야 합니다.")
+
+    center = None
+    if bbox is not None:
+        min_lng, min_lat, max_lng, max_lat = parse_coordinates(bbox, 4, "bbox")
+        check_lat_lng(min_lat, min_lng)
+        check_lat_lng(max_lat, max_lng)
+        if min_lat > max_lat:
+            raise HTTPException(status_code=400, detail="bbox의 최소 위도가 최대 위도보다 큽니다.")
+        # (min_lng > max_lng 이면 날짜변경선을 넘는 영역으로 봅니다)
+    else:
+        center = parse_coordinates(near, 2, "near")
+        check_lat_lng(*center)
+        min_lat, min_lng, max_lat, max_lng = geo.radius_bbox(*center, radius)
+
+    # 1. 영역을 덮는 지오해시 prefix 범위(인덱스 범위 검색) + 실제 위경도 조건
+    Item = models.ItineraryItem
+    regions = []
+    for r_min_lat, r_min_lng, r_max_lat, r_max_lng in geo.split_antimeridian(min_lat, min_lng, max_lat, max_lng):
+        prefix_ranges = [
+            Item.geohash.between(*geo.prefix_range(prefix))
+            for prefix in geo.covering_prefixes(r_min_lat, r_min_lng, r_max_lat, r_max_lng)
+            if prefix
+        ]
+        conditions = [
+            Item.latitude.between(r_min_lat, r_max_lat),
+            Item.longitude.between(r_min_lng, r_max_lng),
+        ]
+        if prefix_ranges:
+            conditions.append(or_(*prefix_ranges))
+        else:
+            conditions.append(Item.geohash.is_not(None))
+        regions.append(and_(*conditions))
+
+    # 2. 현재 사용자 소유 여행의 일정만 (Trip과 JOIN)
+    query = (
+        select(Item)
+        .join(models.Trip, Item.trip_id == models.Trip.id)
+        .where(models.Trip.owner_id == current_user.id, or_(*regions))
+        .order_by(Item.id)
+    )
+    if center is None:
+        items = (await db.scalars(query.limit(limit))).all()
+        return [schemas.ItineraryItemSearchResult.model_validate(item) for item in items]
+
+    # 3. near 검색: 사각형 후보 중 반경 안의 일정만 남기고 가까운 순으로 정렬
+    results = []
+    for item in (await db.scalars(query)).all():
+        distance = geo.haversine_m(center[0], center[1], item.latitude, item.longitude)
+        if distance <= radius:
+            result = schemas.ItineraryItemSearchResult.model_validate(item)
+            result.distance_m = round(distance, 1)
+            results.append(result)
+    results.sort(key=lambda result: (result.distance_m, result.id))
+    return results[:limit]
+
+# --- 실시간 알림 (WebSocket) ---
+async def receive_ws_token(websocket: WebSocket) -> str:
+    """첫 메시지 {"type": "auth", "token": "..."} 의 토큰. 제때 오지 않거나 형식이 틀리면 빈 문자열 (-> 4401)"""
+    try:
+        async with asyncio.timeout(settings.live_auth_timeout_seconds):
+            message = await websocket.receive()
+        data = json.loads(message.get("text") or "")
+    except (TimeoutError, ValueError):
+        return ""
+    if not isinstance(data, dict) or data.get("type") != "auth" or not isinstance(data.get("token"), str):
+        return ""
+    return data["token"]
+
+@router.websocket("/ws/trips/{trip_id}")
+async def trip_events(websocket: WebSocket, trip_id: int):
+    """
+    여행의 변경 사항(일정 추가/수정/삭제/순서 변경, 여행 수정/삭제)을 schemas.TripEvent JSON으로 보냅니다.
+    - 인증: Authorization: Bearer 헤더, 없으면 연결 직후 첫 메시지 {"type": "auth", "token": "..."}
+      (브라우저 WebSocket은 헤더를 보낼 수 없습니다. URL(?token=)에 넣으면 접근 로그에 토큰이 남으므로 받지 않습니다)
+    - 연결 직후 {"type": "subscribed", "version": N}을 보냅니다. 가진 여행의 version과 다르면 다시 조회하세요.
+    - 닫는 코드: 4401(인증 실패), 4404(여행 없음), 1013(연결 수 초과 또는 너무 느린 연결)
+    """
+    await websocket.accept()
+    await live_hub.start()
+
+    # (인증/소유권 확인에만 세션을 잠깐 사용합니다. 연결이 유지되는 동안 DB 커넥션을 잡고 있지 않습니다)
+    async with database.get_engines().AsyncSessionLocal() as db:
+        try:
+            current_user = await authenticate_token(db, bearer_token(websocket.scope) or await receive_ws_token(websocket))
+        except HTTPException:
+            await websocket.close(code=4401, reason="유효한 자격 증명을 찾을 수 없습니다.")
+            return
+
+        # 먼저 구독한 뒤 version을 읽어야 그 사이의 변경을 놓치지 않습니다.
+        subscription = live_hub.subscribe(trip_id)
+        if subscription is None:
+            await websocket.close(code=1013, reason="연결이 너무 많습니다.")
+            return
+        version = await db.scalar(
+            ownership.owned_trips(current_user.id, models.Trip.version).where(models.Trip.id == trip_id)
+        )
+
+    if version is None:
+        live_hub.unsubscribe(subscription)
+        await websocket.close(code=4404, reason="여행을 찾을 수 없습니다.")
+        return
+
+    async def send_events():
+        while True:
+            message = await subscription.get()
+            # (asyncio.timeout은 wait_for와 달리 보낼 때마다 태스크를 만들지 않습니다)
+            async with asyncio.timeout(settings.live_send_timeout_seconds):
+                await websocket.send_text(message)
+
+    async def wait_for_disconnect():
+        # (클라이언트가 보내는 메시지는 사용하지 않습니다)
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = []
+    try:
+        await websocket.send_text(
+            schemas.TripEvent(type="subscribed", trip_id=trip_id, version=version).model_dump_json()
+        )
+        sender = asyncio.create_task(send_events())
+        tasks = [sender, asyncio.create_task(wait_for_disconnect())]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        errors = {task: task.exception() for task in done}
+        if isinstance(errors.get(sender), TimeoutError):
+            # (너무 느린 연결) 보내지 못한 채로 기다리지 않고 끊습니다. 다시 연결하면 subscribed부터 받습니다.
+            await asyncio.wait_for(websocket.close(code=1013, reason="연결이 너무 느립니다."), 1)
+    except Exception:
+        # (클라이언트가 먼저 끊은 경우 등)
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        live_hub.unsubscribe(subscription)
+
+# === 내부(운영용) 엔드포인트 ===
+
+def verify_internal_token(x_internal_token: str | None = Header(default=None)):
+    """
+    내부용 엔드포인트 보호: X-Internal-Token 헤더가 INTERNAL_API_TOKEN과 같아야 합니다.
+    (기본으로 막혀 있습니다. INTERNAL_API_TOKEN을 설정하지 않으면 엔드포인트가 없는 것처럼 404를 반환합니다)
+    """
+    if not settings.internal_api_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_internal_token is None or not hmac.compare_digest(x_internal_token.encode(), settings.internal_api_token.encode()):
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
+
+# --- Prometheus 지표 ---
+@router.get("/metrics", dependencies=[Depends(verify_internal_token)], include_in_schema=False)
+def read_metrics():
+    """
+    라우트별 요청 처리 시간 히스토그램, 요청당 DB 쿼리 수 히스토그램, DB 시간, 느린 쿼리 수,
+    커넥션 풀 상태를 Prometheus 텍스트 형식으로 반환합니다.
+    (INTERNAL_API_TOKEN을 설정하고 수집기가 X-Internal-Token 헤더로 보내야 합니다. 설정하지 않으면 404)
+    """
+    lines = request_metrics.render()
+    lines += live_hub.render()
+    lines += render_prometheus(database.get_engines().pools())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# --- DB 커넥션 풀 상태 ---
+@router.get("/internal/db-pool", dependencies=[Depends(verify_internal_token)])
+def read_db_pool_status():
+    """
+    동기/비동기 엔진의 커넥션 풀 상태와 누적 지표(대기 시간 히스토그램, 타임아웃 횟수)를 반환합니다.
+    워커 수를 Postgres max_connections에 맞출 때 참고합니다.
+    """
+    engines = database.get_engines()
+    return {
+        "sync": pool_status(engines.engine.pool),
+        "async": pool_status(engines.async_engine.sync_engine.pool),
+        # (복제본별 상태: 연결 실패로 건너뛰는 중인지, 풀 상태)
+        "replicas": [
+            {**status, "pool": pool_status(replica.engine.sync_engine.pool)}
+            for replica, status in zip(engines.replica_set.replicas, engines.replica_set.status())
+        ],
+    }
+
+# === 앱 생성 (워커 프로세스마다 한 번) ===
+
+# json_response로 직렬화하는 응답 타입 (시작할 때 TypeAdapter를 미리 만들어 첫 요청의 스키마 빌드 시간을 없앱니다)
+SERIALIZED_RESPONSE_TYPES = [
+    schemas.User,
+    schemas.Trip,
+    schemas.TripGrouped,
+    schemas.TripDelta,
+    schemas.ItineraryItem,
+    List[dict],
+    List[schemas.Trip],
+    List[schemas.TripSummary],
+    List[schemas.ItineraryItem],
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    시작: 엔진/커넥션 풀 생성, 커넥션 미리 열기(DB_WARMUP_CONNECTIONS)와 ORM 쿼리 준비, 직렬화기 준비, 실시간 알림 허브 시작
+    종료: 실시간 알림 허브, 비밀번호 해싱 프로세스 풀, 모든 엔진(복제본 포함)의 커넥션 정리
+    """
+    database.init_engines(settings)
+    # (시작 도중 실패해도 엔진을 정리합니다. aiosqlite 커넥션 스레드가 남으면 프로세스가 끝나지 않습니다)
+    try:
+        await database.warm_up(statements=[
+            select(model).limit(0) for model in (models.User, models.Trip, models.ItineraryItem)
+        ])
+        for response_type in SERIALIZED_RESPONSE_TYPES:
+            type_adapter(response_type)
+        await live_hub.start()
+        yield
+    finally:
+        await live_hub.close()
+        shutdown_executor()
+        await database.dispose_engines()
+
+def create_app(app_settings: Settings | None = None) -> FastAPI:
+    """
+    앱을 만듭니다. 설정은 여기서 한 번 읽고 검증하며, DB 접속은 lifespan(시작 이벤트)에서 합니다.
+    (임포트만으로는 .env를 읽거나 DB에 접속하지 않으므로, 워커를 fork한 뒤 각 워커가 자기 커넥션 풀을 만듭니다)
+
+    여러 워커로 실행 (backend 폴더에서):
+        uvicorn main:create_app --factory --host 0.0.0.0 --port 8000 --workers 4
+        gunicorn -c gunicorn.conf.py        # (Linux) gunicorn.conf.py 참고
+    """
+    configure(app_settings or get_settings())
+
+    app = FastAPI(lifespan=lifespan)
+
+    if settings.rate_limit_enabled:
+        # (CORS보다 먼저 등록해야 CORS 미들웨어가 바깥에 위치하여 429 응답에도 CORS 헤더가 붙습니다)
+        app.add_middleware(
+            RateLimitMiddleware,
+            store=(
+                RedisTokenBucketStore(settings.rate_limit_redis_url) if settings.rate_limit_backend == "redis"
+                else MemoryTokenBucketStore(max_keys=settings.rate_limit_max_keys)
+            ),
+            policies=rate_limit_policies(settings),
+            identify_user=rate_limit_subject,
+            trust_forwarded=settings.rate_limit_trust_forwarded,
+            trusted_proxy_hops=settings.rate_limit_trusted_proxy_hops,
+        )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,       # origins 리스트에 있는 주소에서의 요청을 허용
+        allow_credentials=True,    # 쿠키를 포함한 요청을 허용
+        allow_methods=["*"],         # 모든 HTTP 메소드(GET, POST 등)를 허용
+        allow_headers=["*"],         # 모든 HTTP 헤더를 허용
+        expose_headers=["X-Next-Cursor", "ETag", "Retry-After"], # 페이지네이션 cursor, ETag, 429 재시도 대기 시간 헤더를 브라우저에서 읽을 수 있도록 허용
+    )
+
+    # --- 요청 지표 (라우트별 지연 시간, 요청당 DB 쿼리 수/시간 -> /metrics, Server-Timing 헤더) ---
+    # (가장 마지막에 등록하여 가장 바깥에서 CORS/속도 제한까지 포함한 시간을 잽니다)
+    app.add_middleware(RequestMetricsMiddleware, router=app.router)
+
+    app.include_router(router)
+    return app
+
+_app: FastAPI | None = None
+
+def __getattr__(name: str):
+    """(기존 실행 방법 `uvicorn main:app` 호환) main.app 에 처음 접근할 때 앱을 만듭니다."""
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,62 @@
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, pool
+
+# 내부 모듈 임포트 (alembic.ini의 prepend_sys_path = . 덕분에 backend 폴더 기준으로 임포트됩니다)
+import models
+
+# (마이그레이션에는 DB 주소만 필요하므로 앱 설정 전체(settings.py)를 검증하지 않고 DATABASE_URL만 읽습니다)
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+config = context.config
+
+# alembic.ini의 로깅 설정 적용
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# autogenerate (alembic revision --autogenerate) 가 비교할 모델 메타데이터
+target_metadata = models.Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """특정 DB 전용(ddl_if)으로 선언된 인덱스는 다른 DB에서는 비교하지 않습니다."""
+    ddl_if = getattr(object, "_ddl_if", None)
+    if not reflected and ddl_if is not None and ddl_if.dialect is not None:
+        dialects = (ddl_if.dialect,) if isinstance(ddl_if.dialect, str) else ddl_if.dialect
+        return context.get_context().dialect.name in dialects
+    return True
+
+
+def run_migrations_offline() -> None:
+    """DB에 접속하지 않고 SQL 스크립트만 출력합니다. (alembic upgrade head --sql)"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """.env 의 DATABASE_URL 에 접속하여 마이그레이션을 실행합니다."""
+    connectable = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,72 @@
+"""baseline: create_all 로 만들던 기존 스키마
+
+이미 create_all 로 테이블이 만들어진 DB는 이 리비전을 실행하지 말고
+`alembic stamp 0001_baseline` 으로 표시만 한 뒤 `alembic upgrade head` 를 실행하세요.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "trips",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=True),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_trips_id", "trips", ["id"])
+    op.create_index("ix_trips_title", "trips", ["title"])
+
+    op.create_table(
+        "itinerary_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Integer(), nullable=False),
+        sa.Column("order_sequence", sa.Integer(), nullable=False),
+        sa.Column("place_name", sa.String(), nullable=False),
+        sa.Column("address", sa.String(), nullable=True),
+        sa.Column("memo", sa.String(), nullable=True),
+        sa.Column("latitude", sa.Float(), nullable=True),
+        sa.Column("longitude", sa.Float(), nullable=True),
+        sa.Column("trip_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["trip_id"], ["trips.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_itinerary_items_id", "itinerary_items", ["id"])
+    op.create_index("ix_itinerary_items_day", "itinerary_items", ["day"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("itinerary_items")
+    op.drop_table("trips")
+    op.drop_table("users")
@@ -0,0 +1,45 @@
+"""엔드포인트 쿼리 형태에 맞춘 복합 인덱스
+
+- trips(owner_id, start_date): 내 여행 목록, 시작일 범위 필터, /api/users/me 의 trips 로딩
+- itinerary_items(trip_id, day, order_sequence): 여행별 일정 로딩(외래 키 조회), cascade 삭제, 날짜/순서 정렬
+- 단독으로는 조회하지 않는 trips.title, itinerary_items.day 단일 인덱스는 제거합니다.
+
+Revision ID: 0002_query_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_query_indexes"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (if_not_exists) create_all 로 이미 이 인덱스가 만들어진 DB도 있을 수 있습니다.
+    op.create_index(
+        "ix_trips_owner_id_start_date", "trips", ["owner_id", "start_date"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_itinerary_items_trip_id_day_order",
+        "itinerary_items",
+        ["trip_id", "day", "order_sequence"],
+        if_not_exists=True,
+    )
+    op.drop_index("ix_trips_title", table_name="trips", if_exists=True)
+    op.drop_index("ix_itinerary_items_day", table_name="itinerary_items", if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_itinerary_items_day", "itinerary_items", ["day"])
+    op.create_index("ix_trips_title", "trips", ["title"])
+    op.drop_index("ix_itinerary_items_trip_id_day_order", table_name="itinerary_items")
+    op.drop_index("ix_trips_owner_id_start_date", table_name="trips")
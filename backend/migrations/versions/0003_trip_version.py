@@ -0,0 +1,29 @@
+"""trips.version: 여행/일정 변경 시 증가하는 버전 (ETag용)
+
+Revision ID: 0003_trip_version
+Revises: 0002_query_indexes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_trip_version"
+down_revision: Union[str, Sequence[str], None] = "0002_query_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("trips", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.drop_column("version")
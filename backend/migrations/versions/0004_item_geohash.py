@@ -0,0 +1,63 @@
+"""itinerary_items.geohash: 주변 장소 / 영역 검색용 지오해시 컬럼과 인덱스
+
+기존 일정은 위경도로 지오해시를 계산하여 채웁니다.
+
+Revision ID: 0004_item_geohash
+Revises: 0003_trip_version
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+import geo
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_item_geohash"
+down_revision: Union[str, Sequence[str], None] = "0003_trip_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("itinerary_items", sa.Column("geohash", sa.String(geo.GEOHASH_PRECISION), nullable=True))
+
+    # 기존 데이터 채우기 (id 순으로 나누어 처리)
+    items = sa.table(
+        "itinerary_items",
+        sa.column("id", sa.Integer),
+        sa.column("latitude", sa.Float),
+        sa.column("longitude", sa.Float),
+        sa.column("geohash", sa.String),
+    )
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(items.c.id, items.c.latitude, items.c.longitude)
+            .where(items.c.id > last_id, items.c.latitude.is_not(None), items.c.longitude.is_not(None))
+            .order_by(items.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            items.update().where(items.c.id == sa.bindparam("item_id")).values(geohash=sa.bindparam("value")),
+            [{"item_id": row.id, "value": geo.encode(row.latitude, row.longitude)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.create_index("ix_itinerary_items_geohash", "itinerary_items", ["geohash"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_itinerary_items_geohash", table_name="itinerary_items")
+    with op.batch_alter_table("itinerary_items") as batch_op:
+        batch_op.drop_column("geohash")
@@ -0,0 +1,47 @@
+"""검색용 pg_trgm 트라이그램 GIN 인덱스 (Postgres 전용)
+
+trips.title, itinerary_items.place_name/address/memo 의 부분 일치 검색(ILIKE '%...%')에 사용됩니다.
+다른 DB(SQLite 등)에서는 아무것도 하지 않습니다. (메모리 역색인으로 검색)
+
+Revision ID: 0005_search_trgm
+Revises: 0004_item_geohash
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_search_trgm"
+down_revision: Union[str, Sequence[str], None] = "0004_item_geohash"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ("ix_trips_title_trgm", "trips", "title"),
+    ("ix_itinerary_items_place_name_trgm", "itinerary_items", "place_name"),
+    ("ix_itinerary_items_address_trgm", "itinerary_items", "address"),
+    ("ix_itinerary_items_memo_trgm", "itinerary_items", "memo"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name, table, [column],
+            postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
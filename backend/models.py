@@ -1,6 +1,13 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship 
 from database import Base
+import geo
+
+def trigram_index(name: str, column: str) -> Index:
+    """pg_trgm GIN 인덱스 (Postgres에서만 생성되며, 다른 DB에서는 건너뜁니다)"""
+    return Index(
+        name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+    ).ddl_if(dialect="postgresql")
 
 class User(Base):
     __tablename__ = "users"
@@ -13,20 +20,43 @@ class User(Base):
 class Trip(Base):
     __tablename__ = "trips"
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True, nullable=False)
+    title = Column(String, nullable=False)
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # 여행 정보나 일정이 바뀔 때마다 1씩 증가합니다. (ETag / 조건부 GET에 사용)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     owner = relationship("User", back_populates="trips")
 
     # Trip이 삭제되면 관련 Item들도 모두 삭제되도록 (cascade) 설정
-    items = relationship("ItineraryItem", back_populates="trip", cascade="all, delete-orphan")
+    # (day, order_sequence) 순으로 정렬하여 불러옵니다. (ix_itinerary_items_trip_id_day_order 인덱스 사용)
+    items = relationship(
+        "ItineraryItem",
+        back_populates="trip",
+        cascade="all, delete-orphan",
+        order_by="(ItineraryItem.day, ItineraryItem.order_sequence, ItineraryItem.id)",
+    )
+
+    # 내 여행 목록 조회 + 시작일 범위 필터용 복합 인덱스
+    __table_args__ = (
+        Index("ix_trips_owner_id_start_date", "owner_id", "start_date"),
+        # (Postgres 전용) 제목 부분 일치 검색(ILIKE '%...%')용 트라이그램 GIN 인덱스
+        trigram_index("ix_trips_title_trgm", "title"),
+    )
+
+def geohash_default(context):
+    """INSERT 되는 행의 위도/경도로 지오해시를 계산합니다. (다중 행 INSERT에서도 행마다 호출됨)"""
+    params = context.get_current_parameters()
+    latitude, longitude = params.get("latitude"), params.get("longitude")
+    if latitude is None or longitude is None:
+        return None
+    return geo.encode(latitude, longitude)
 
 class ItineraryItem(Base):
     __tablename__ = "itinerary_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    day = Column(Integer, index=True, nullable=False) # 여행 N일차 (예: 1, 2, 3)
+    day = Column(Integer, nullable=False) # 여행 N일차 (예: 1, 2, 3)
     order_sequence = Column(Integer, nullable=False)  # 같은 날짜 내의 순서
     
     place_name = Column(String, nullable=False)
@@ -36,6 +66,8 @@ class ItineraryItem(Base):
     # --- 지도 API 연동을 위한 핵심 데이터 ---
     latitude = Column(Float, nullable=True)  # 위도 (예: 33.450701)
     longitude = Column(Float, nullable=True) # 경도 (예: 126.570667)
+    # 위경도로 계산한 지오해시 (주변 장소 / 영역 검색용, INSERT 시 자동으로 채워집니다)
+    geohash = Column(String(geo.GEOHASH_PRECISION), nullable=True, default=geohash_default)
     
     # --- 외래 키 설정 ---
     # "trips" 테이블의 "id" 컬럼을 참조합니다.
@@ -43,4 +75,14 @@ class ItineraryItem(Base):
 
     # --- 관계 설정 ---
     # 이 Item이 "trip" (Trip 모델)과 관계가 있음을 알려줍니다.
-    trip = relationship("Trip", back_populates="items")
\ No newline at end of file
+    trip = relationship("Trip", back_populates="items")
+
+    # 여행별 일정 조회(외래 키), cascade 삭제, (day, order_sequence) 정렬에 쓰이는 복합 인덱스
+    __table_args__ = (
+        Index("ix_itinerary_items_trip_id_day_order", "trip_id", "day", "order_sequence"),
+        Index("ix_itinerary_items_geohash", "geohash"),
+        # (Postgres 전용) 검색용 트라이그램 GIN 인덱스
+        trigram_index("ix_itinerary_items_place_name_trgm", "place_name"),
+        trigram_index("ix_itinerary_items_address_trgm", "address"),
+        trigram_index("ix_itinerary_items_memo_trgm", "memo"),
+    )
\ No newline at end of file
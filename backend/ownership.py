@@ -0,0 +1,171 @@
+from fastapi import HTTPException
+from sqlalchemy import case, delete, exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+
+# --- 소유권 범위 쿼리 (여행 / 일정) ---
+# 여행은 owner_id 조건을, 일정은 "속한 여행의 owner_id가 현재 사용자" 조건(EXISTS, trips 기본 키 조회)을
+# 조회/수정/삭제 문에 함께 넣어 한 번의 왕복으로 소유권 확인과 작업을 끝냅니다.
+# 0행일 때(실패 경로)만 한 번 더 조회하여 404(없음)와 403(다른 사용자의 일정)을 구분합니다.
+
+Trip, Item = models.Trip, models.ItineraryItem
+
+TRIP_NOT_FOUND = "여행을 찾을 수 없습니다."
+ITEM_NOT_FOUND = "일정을 찾을 수 없습니다."
+
+
+def owned_trips(owner_id: int, *columns):
+    """본인 여행 SELECT (columns를 주면 그 컬럼만)"""
+    return select(*(columns or (Trip,))).where(Trip.owner_id == owner_id)
+
+
+def owns_item(owner_id: int):
+    """일정 문의 WHERE 절에 넣는 소유권 조건"""
+    return exists().where(Trip.id == Item.trip_id, Trip.owner_id == owner_id)
+
+
+async def get_trip(db: AsyncSession, trip_id: int, owner_id: int, *options) -> models.Trip:
+    """본인 여행을 불러옵니다. (없거나 다른 사용자의 여행이면 404)"""
+    db_trip = (await db.scalars(owned_trips(owner_id).options(*options).where(Trip.id == trip_id))).first()
+    if db_trip is None:
+        raise HTTPException(status_code=404, detail=TRIP_NOT_FOUND)
+    return db_trip
+
+
+async def bump_trip_version(db: AsyncSession, trip_id: int, owner_id: int) -> int:
+    """
+    본인 여행의 version을 1 올리고 새 version을 반환합니다. (아니면 404)
+    일정을 추가하기 전에 호출하면 소유권 확인과 version 올리기를 UPDATE 한 문으로 끝낼 수 있습니다.
+    """
+    version = (await db.scalars(
+        update(Trip)
+        .where(Trip.id == trip_id, Trip.owner_id == owner_id)
+        .values(version=Trip.version + 1)
+        .returning(Trip.version),
+        execution_options={"synchronize_session": False},
+    )).first()
+    if version is None:
+        raise HTTPException(status_code=404, detail=TRIP_NOT_FOUND)
+    return version
+
+
+async def delete_trip(db: AsyncSession, trip_id: int, owner_id: int):
+    """
+    본인 여행과 그 일정을 일정 수와 관계없이 DELETE 두 문으로 삭제합니다. (없거나 다른 사용자의 여행이면 404)
+    (ORM cascade는 일정을 모두 불러와 한 행씩 삭제하므로 쓰지 않습니다)
+    """
+    await db.execute(
+        delete(Item).where(Item.trip_id.in_(owned_trips(owner_id, Trip.id).where(Trip.id == trip_id))),
+        execution_options={"synchronize_session": False},
+    )
+    deleted = (await db.scalars(
+        delete(Trip).where(Trip.id == trip_id, Trip.owner_id == owner_id).returning(Trip.id),
+        execution_options={"synchronize_session": False},
+    )).first()
+    if deleted is None:
+        raise HTTPException(status_code=404, detail=TRIP_NOT_FOUND)
+
+
+async def raise_for_missing_items(
+    db: AsyncSession,
+    owner_id: int,
+    item_ids,
+    forbidden_detail: str,
+    not_found_detail: str = ITEM_NOT_FOUND,
+    conditions=(),
+):
+    """
+    (실패 경로) 소유권 조건 때문에 처리되지 않은 일정이 있을 때 호출합니다.
+    조건에 맞는 일정 자체가 없으면 404, 있지만 다른 사용자의 일정이면 403을 발생시킵니다.
+    forbidden_detail 의 {item_id} 는 첫 번째 다른 사용자 일정의 id로 채워집니다.
+    """
+    item_ids = list(item_ids)
+    rows = (await db.execute(
+        select(Item.id, Trip.owner_id)
+        .join(Trip, Item.trip_id == Trip.id)
+        .where(Item.id.in_(item_ids), *conditions)
+    )).all()
+    if len(rows) != len(item_ids):
+        raise HTTPException(status_code=404, detail=not_found_detail)
+    for item_id, item_owner_id in rows:
+        if item_owner_id != owner_id:
+            raise HTTPException(status_code=403, detail=forbidden_detail.format(item_id=item_id))
+    # (여기까지 왔다면 그 사이에 다른 요청이 일정을 바꾼 경우입니다)
+    raise HTTPException(status_code=404, detail=not_found_detail)
+
+
+async def get_item(db: AsyncSession, item_id: int, owner_id: int, forbidden_detail: str) -> models.ItineraryItem:
+    db_item = (await db.scalars(select(Item).where(Item.id == item_id, owns_item(owner_id)))).first()
+    if db_item is None:
+        await raise_for_missing_items(db, owner_id, [item_id], forbidden_detail)
+    return db_item
+
+
+async def update_item(db: AsyncSession, item_id: int, owner_id: int, values: dict) -> models.ItineraryItem:
+    """UPDATE ... WHERE id AND 소유권 RETURNING 한 문으로 수정하고 수정된 행을 반환합니다. (values가 비면 조회만)"""
+    forbidden = "수정 권한이 없습니다."
+    if not values:
+        return await get_item(db, item_id, owner_id, forbidden)
+    db_item = (await db.scalars(
+        update(Item)
+        .where(Item.id == item_id, owns_item(owner_id))
+        .values(**values)
+        .returning(Item),
+        execution_options={"synchronize_session": False},
+    )).first()
+    if db_item is None:
+        await raise_for_missing_items(db, owner_id, [item_id], forbidden)
+    return db_item
+
+
+async def delete_item(db: AsyncSession, item_id: int, owner_id: int) -> int:
+    """DELETE ... WHERE id AND 소유권 RETURNING trip_id 한 문으로 삭제하고, 일정이 속했던 여행 id를 반환합니다."""
+    trip_id = (await db.scalars(
+        delete(Item)
+        .where(Item.id == item_id, owns_item(owner_id))
+        .returning(Item.trip_id),
+        execution_options={"synchronize_session": False},
+    )).first()
+    if trip_id is None:
+        await raise_for_missing_items(db, owner_id, [item_id], "삭제 권한이 없습니다.")
+    return trip_id
+
+
+async def update_item_orders(
+    db: AsyncSession,
+    owner_id: int,
+    new_orders: dict[int, int],
+    trip_id: int | None = None,
+    day: int | None = None,
+) -> list[models.ItineraryItem]:
+    """
+    {일정 id: 새 순서} 를 UPDATE ... SET order_sequence = CASE id WHEN ... END 단일 문으로 반영합니다.
+    하나라도 조건(소유권, trip_id, day)에 맞지 않으면 404/403을 발생시킵니다.
+    (일부만 수정된 상태이므로 호출한 쪽은 커밋하지 않아야 합니다. 세션을 닫으면 롤백됩니다)
+    """
+    conditions = []
+    if trip_id is not None:
+        conditions.append(Item.trip_id == trip_id)
+    if day is not None:
+        conditions.append(Item.day == day)
+
+    updated_items = (await db.scalars(
+        update(Item)
+        .where(Item.id.in_(new_orders.keys()), owns_item(owner_id), *conditions)
+        .values(order_sequence=case(new_orders, value=Item.id))
+        .returning(Item),
+        execution_options={"synchronize_session": False},
+    )).all()
+
+    if len(updated_items) != len(new_orders):
+        updated_ids = {item.id for item in updated_items}
+        await raise_for_missing_items(
+            db,
+            owner_id,
+            [item_id for item_id in new_orders if item_id not in updated_ids],
+            forbidden_detail="일정(ID: {item_id}) 수정 권한이 없습니다.",
+            not_found_detail="일부 일정을 찾을 수 없습니다.",
+            conditions=conditions,
+        )
+    return updated_items
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+# --- 비밀번호 해싱 설정 (.env의 PASSWORD_HASH_ROUNDS / PASSWORD_HASH_WORKERS -> settings.py) ---
+# 반복 횟수를 바꾸면 기존 해시는 다음 로그인 때 새 비용으로 다시 해싱됩니다.
+# 작업 프로세스 수가 0이면 별도 프로세스 없이 스레드풀에서 실행합니다.
+# (임포트할 때는 기본값을 쓰고, 앱이 create_app()에서 configure()로 설정값을 적용합니다)
+DEFAULT_ROUNDS = 29000
+
+logger = logging.getLogger("app.password_hashing")
+
+def make_context(rounds: int) -> CryptContext:
+    # min_rounds/max_rounds를 기본값과 같게 두어, 반복 횟수가 다른 해시는 needs_update가 True가 됩니다.
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
+
+pwd_context = make_context(DEFAULT_ROUNDS)
+_rounds = DEFAULT_ROUNDS
+_workers = os.cpu_count() or 1
+
+def set_rounds(rounds: int):
+    """(작업 프로세스의 initializer로도 사용) 이 프로세스의 해싱 비용을 바꿉니다."""
+    global pwd_context, _rounds
+    if rounds != _rounds:
+        pwd_context = make_context(rounds)
+        _rounds = rounds
+
+def configure(rounds: int, workers: int):
+    """해싱 비용과 작업 프로세스 수를 적용합니다. (이미 만든 프로세스 풀은 닫고 다음 요청에서 새로 만듭니다)"""
+    global _workers
+    if rounds != _rounds or workers != _workers:
+        shutdown_executor()
+    set_rounds(rounds)
+    _workers = workers
+
+
+# --- 실제 계산 함수 (작업 프로세스에서 실행되므로 모듈 최상위 함수여야 합니다) ---
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_and_update(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """비밀번호를 검증하고, 해싱 비용이 바뀌었으면 새 해시도 함께 반환합니다."""
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+# --- 프로세스 풀 ---
+# PBKDF2는 CPU만 쓰는 작업이라 스레드에서는 GIL 때문에 병렬로 돌지 않습니다.
+# 별도 프로세스에서 실행하여 여러 코어를 쓰고, 이벤트 루프/스레드풀이 막히지 않도록 합니다.
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if _workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # (spawn) 이벤트 루프/DB 커넥션을 가진 프로세스를 fork하지 않도록 합니다.
+            # (spawn한 프로세스는 모듈을 새로 임포트하므로 initializer로 같은 비용을 적용합니다)
+            _executor = ProcessPoolExecutor(
+                max_workers=_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=set_rounds,
+                initargs=(_rounds,),
+            )
+        return _executor
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """망가진 풀을 버립니다. (그사이 다른 요청이 새 풀을 만들었으면 그 풀은 그대로 둡니다)"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+async def _run(func, *args):
+    # 작업 프로세스가 죽으면(OOM 등) 풀 전체가 BrokenProcessPool이 됩니다.
+    # 풀을 새로 만들어 한 번 더 시도하고, 그래도 안 되면 이번 요청은 스레드풀에서 계산합니다.
+    for _ in range(2):
+        executor = get_executor()
+        if executor is None:
+            break
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            logger.warning("password hashing process pool is broken, recreating it", exc_info=True)
+            _discard_executor(executor)
+    return await run_in_threadpool(func, *args)
+
+
+# --- 엔드포인트에서 사용하는 비동기 함수 ---
+
+async def get_password_hash(password: str) -> str:
+    return await _run(hash_password, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """(검증 결과, 새 해시 또는 None)을 반환합니다."""
+    return await _run(verify_and_update, plain_password, hashed_password)
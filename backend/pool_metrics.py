@@ -0,0 +1,115 @@
+import bisect
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 커넥션 대기 시간 히스토그램 구간 (ms, 누적 카운트로 집계합니다)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """커넥션 풀의 체크아웃 횟수, 대기 시간 분포, 타임아웃 횟수를 기록합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_sum = 0.0
+        self.wait_ms_max = 0.0
+        # 마지막 칸은 +Inf 구간입니다.
+        self._bucket_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe_wait(self, wait_ms: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_ms_sum += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            self._bucket_counts[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, histogram = 0, {}
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self._bucket_counts):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+            return {
+                "checkouts_total": self.checkouts,
+                "checkout_timeouts_total": self.timeouts,
+                "wait_ms_sum": round(self.wait_ms_sum, 3),
+                "wait_ms_max": round(self.wait_ms_max, 3),
+                "wait_ms_histogram": histogram,
+            }
+
+
+class InstrumentedPoolMixin:
+    """커넥션을 꺼낼 때(_do_get) 걸린 시간을 측정하는 풀 믹스인입니다."""
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait((time.perf_counter() - start) * 1000)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() 등으로 풀이 다시 만들어져도 누적 지표는 유지합니다.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool) -> dict:
+    """현재 풀 상태(사용 중/대기 중 커넥션, overflow)와 누적 지표를 함께 반환합니다."""
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
+
+
+def render_prometheus(pools: dict) -> list[str]:
+    """{이름: 풀} 의 상태를 Prometheus 텍스트 형식 줄 목록으로 만듭니다. (/metrics)"""
+    metrics = [
+        ("db_pool_checked_out", "gauge", "현재 사용 중인 커넥션 수", "checked_out"),
+        ("db_pool_overflow", "gauge", "pool_size를 넘어 추가로 연 커넥션 수", "overflow"),
+        ("db_pool_checkouts_total", "counter", "커넥션 체크아웃 횟수", "checkouts_total"),
+        ("db_pool_checkout_timeouts_total", "counter", "커넥션 대기 타임아웃 횟수", "checkout_timeouts_total"),
+        ("db_pool_wait_ms_sum", "counter", "커넥션 대기 시간 합계 (ms)", "wait_ms_sum"),
+    ]
+    statuses = {name: pool_status(pool) for name, pool in pools.items()}
+    lines = []
+    for metric, kind, help_text, key in metrics:
+        values = [(name, status[key]) for name, status in statuses.items() if key in status]
+        if not values:
+            continue
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{{engine="{name}"}} {value}' for name, value in values]
+    return lines
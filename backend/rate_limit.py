@@ -0,0 +1,203 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from starlette.responses import JSONResponse
+
+# --- 요청 속도 제한 (토큰 버킷) ---
+# 키(IP 또는 사용자)마다 capacity개의 토큰을 가진 버킷을 두고, 요청마다 1개씩 꺼냅니다.
+# 토큰은 초당 refill_per_second개씩 다시 채워지며, 비어 있으면 429와 Retry-After(초)를 반환합니다.
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str                               # 버킷 종류 (키 앞에 붙어 정책별로 버킷이 분리됩니다)
+    capacity: int                           # 한 번에 허용하는 최대 요청 수 (버스트)
+    refill_per_second: float                # 초당 채워지는 토큰 수
+    match: Callable[[str, str], bool]       # (method, path) -> 이 정책을 적용할지
+    per_user: bool = False                  # True면 로그인 사용자는 사용자 id로, 아니면 IP로 구분
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0 and self.refill_per_second > 0
+
+
+class MemoryTokenBucketStore:
+    """
+    (기본) 프로세스 메모리 저장소. 키당 (남은 토큰, 마지막 갱신 시각)만 보관합니다.
+    - 조회/갱신 모두 O(1) (OrderedDict)
+    - 최대 max_keys 개까지만 보관하고, 넘치면 가장 오래 사용하지 않은 키부터 버립니다.
+      (오래 쉬던 키는 어차피 버킷이 가득 찼을 것이므로 버려도 결과가 같습니다)
+    워커(프로세스)마다 따로 세므로, 여러 워커로 실행할 때는 RedisTokenBucketStore 를 사용합니다.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, capacity: int, refill_per_second: float, cost: float = 1) -> tuple[bool, float]:
+        """(허용 여부, 다시 시도하기까지 기다려야 하는 초)"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(capacity)
+            else:
+                tokens, updated_at = bucket
+                tokens = min(float(capacity), tokens + (now - updated_at) * refill_per_second)
+                self._buckets.move_to_end(key)
+
+            if tokens >= cost:
+                allowed, retry_after = True, 0.0
+                tokens -= cost
+            else:
+                allowed, retry_after = False, (cost - tokens) / refill_per_second
+
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# Redis에서 토큰 버킷 계산을 원자적으로 처리하는 스크립트 (모든 워커가 같은 버킷을 공유)
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisTokenBucketStore:
+    """
+    여러 워커/서버가 버킷을 공유하는 Redis 저장소입니다. (redis 패키지가 필요합니다: pip install redis)
+    키는 버킷이 가득 찰 시간이 지나면 자동으로 만료되므로 메모리가 계속 늘지 않습니다.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            from redis.asyncio import Redis
+        except ImportError as error:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis 를 사용하려면 redis 패키지를 설치해야 합니다.") from error
+        self.prefix = prefix
+        self._redis = Redis.from_url(url)
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, capacity: int, refill_per_second: float, cost: float = 1) -> tuple[bool, float]:
+        allowed, retry_after = await self._script(keys=[self.prefix + key], args=[capacity, refill_per_second, cost])
+        return bool(int(allowed)), float(retry_after)
+
+
+def client_ip(scope, trust_forwarded: bool = False, trusted_proxy_hops: int = 1) -> str:
+    """
+    요청한 클라이언트 IP
+    프록시 뒤라면 trust_forwarded=True로 X-Forwarded-For를 사용합니다. 각 프록시는 받은 요청의 IP를 맨 뒤에 붙이므로,
+    신뢰하는 프록시가 trusted_proxy_hops개이면 오른쪽에서 trusted_proxy_hops번째 값이 실제 클라이언트입니다.
+    (앞쪽 값은 클라이언트가 마음대로 넣을 수 있으므로 사용하지 않습니다)
+    """
+    if trust_forwarded:
+        addresses = [
+            address.strip()
+            for name, value in scope.get("headers", ())
+            if name == b"x-forwarded-for"
+            for address in value.decode("latin-1").split(",")
+            if address.strip()
+        ]
+        if addresses:
+            # (값이 hops개보다 적으면 모두 프록시가 붙인 값이므로 가장 왼쪽 값)
+            return addresses[max(0, len(addresses) - trusted_proxy_hops)]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def bearer_token(scope) -> str | None:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token.strip() if scheme.lower() == "bearer" and token else None
+    return None
+
+
+class RateLimitMiddleware:
+    """
+    정책 목록에서 (method, path)에 맞는 첫 번째 정책의 버킷에서 토큰을 꺼냅니다.
+    토큰이 없으면 엔드포인트를 실행하지 않고 바로 429를 반환합니다. (비밀번호 해싱 등 비싼 작업 전에 차단)
+    identify_user(token) 은 토큰에서 사용자 식별자를 꺼내는 함수입니다. (DB 조회 없이 서명만 확인)
+    """
+
+    def __init__(
+        self,
+        app,
+        store,
+        policies: list[RateLimitPolicy],
+        identify_user: Callable[[str], str | None] | None = None,
+        trust_forwarded: bool = False,
+        trusted_proxy_hops: int = 1,
+    ):
+        self.app = app
+        self.store = store
+        self.policies = [policy for policy in policies if policy.enabled]
+        self.identify_user = identify_user
+        self.trust_forwarded = trust_forwarded
+        self.trusted_proxy_hops = trusted_proxy_hops
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.policies:
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        policy = next((policy for policy in self.policies if policy.match(method, path)), None)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        subject = None
+        if policy.per_user and self.identify_user is not None:
+            token = bearer_token(scope)
+            user = self.identify_user(token) if token else None
+            if user is not None:
+                subject = f"user:{user}"
+        if subject is None:
+            subject = f"ip:{client_ip(scope, self.trust_forwarded, self.trusted_proxy_hops)}"
+
+        allowed, retry_after = await self.store.take(
+            f"{policy.name}:{subject}", policy.capacity, policy.refill_per_second
+        )
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": "요청이 너무 많습니다. 잠시 후 다시 시도해 주세요."},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
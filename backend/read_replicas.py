@@ -0,0 +1,106 @@
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+# --- 읽기 복제본 라우팅 ---
+# 읽기 전용 엔드포인트는 복제본 세션을, 쓰기 엔드포인트는 primary 세션을 사용합니다.
+# - 복제본 여러 개를 돌아가며(round-robin) 사용합니다.
+# - 연결(체크아웃)에 실패한 복제본은 retry_seconds 동안 건너뛰고, 그 뒤 다음 요청이 다시 시도합니다. (모두 안 되면 primary)
+# - read-your-writes: 쓰기를 커밋한 사용자는 window_seconds 동안 primary에서 읽어 복제 지연으로 방금 쓴 내용이 안 보이는 일을 막습니다.
+
+logger = logging.getLogger("app.read_replicas")
+
+
+class Replica:
+    __slots__ = ("name", "engine", "sessionmaker", "down_until", "failures", "last_error")
+
+    def __init__(self, name: str, engine, sessionmaker):
+        self.name = name
+        self.engine = engine
+        self.sessionmaker = sessionmaker
+        self.down_until = 0.0
+        self.failures = 0
+        self.last_error: str | None = None
+
+
+class ReplicaSet:
+    """복제본 목록. 순서 선택/상태 기록은 잠금 안에서 하며, 실제 연결 확인은 호출한 쪽(세션 체크아웃)이 합니다."""
+
+    def __init__(self, replicas: list[Replica], retry_seconds: float = 30.0):
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> list[Replica]:
+        """이번 요청에서 시도할 복제본 (건강한 것만, round-robin으로 시작 위치를 돌립니다)"""
+        now = time.monotonic()
+        healthy = [replica for replica in self.replicas if replica.down_until <= now]
+        if not healthy:
+            return []
+        # (건너뛰는 복제본이 있어도 남은 복제본에 고르게 나뉘도록, 건강한 것들 안에서 돌립니다)
+        with self._lock:
+            start = next(self._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, replica: Replica, error: Exception):
+        with self._lock:
+            replica.down_until = time.monotonic() + self.retry_seconds
+            replica.failures += 1
+            replica.last_error = f"{type(error).__name__}: {error}"[:300]
+        logger.warning("read replica %s is unavailable for %ss: %s", replica.name, self.retry_seconds, replica.last_error)
+
+    def mark_up(self, replica: Replica):
+        if replica.down_until:
+            with self._lock:
+                replica.down_until = 0.0
+            logger.info("read replica %s is available again", replica.name)
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.down_until <= now,
+                "retry_in_seconds": round(max(0.0, replica.down_until - now), 1),
+                "failures": replica.failures,
+                "last_error": replica.last_error,
+            }
+            for replica in self.replicas
+        ]
+
+    def __len__(self):
+        return len(self.replicas)
+
+
+class RecentWriters:
+    """
+    최근에 쓰기를 커밋한 사용자 id -> 만료 시각. (최대 max_size명, 넘치면 오래된 것부터 버립니다)
+    워커(프로세스)마다 따로 기록하므로, 여러 워커로 실행할 때는 window_seconds를 복제 지연보다 넉넉하게 잡고
+    같은 사용자의 요청이 같은 워커로 가도록(sticky) 로드밸런서를 설정하는 것이 좋습니다.
+    """
+
+    def __init__(self, window_seconds: float = 5.0, max_size: int = 100000):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._until: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int):
+        if self.window_seconds <= 0:
+            return
+        with self._lock:
+            self._until[user_id] = time.monotonic() + self.window_seconds
+            self._until.move_to_end(user_id)
+            while len(self._until) > self.max_size:
+                self._until.popitem(last=False)
+
+    def is_recent(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._until.clear()
@@ -0,0 +1,223 @@
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+# --- 요청별 지표 (지연 시간, DB 쿼리 수/시간) ---
+# RequestMetricsMiddleware 가 요청마다 RequestStats 를 컨텍스트 변수에 두고,
+# SQLAlchemy 커서 이벤트가 같은 컨텍스트의 RequestStats 에 쿼리 수와 DB 시간을 더합니다.
+# 결과는 Prometheus 텍스트 형식(/metrics)과 Server-Timing 응답 헤더로 확인할 수 있습니다.
+
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# (N+1 감지용) 요청당 쿼리 수 구간
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+class RequestStats:
+    """요청 하나의 DB 쿼리 수와 DB 시간"""
+
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+_current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels) -> str:
+    escape = lambda value: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+class RequestMetrics:
+    """라우트(경로 템플릿)별 누적 지표. 라벨은 경로 템플릿이므로 개수가 라우트 수로 제한됩니다."""
+
+    def __init__(self, slow_query_ms: float = 200.0):
+        # 이 시간(ms) 이상 걸린 쿼리는 요청 경로와 함께 로그로 남깁니다. (0이면 끔, .env의 SLOW_QUERY_MS -> main.configure)
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._latency: dict[tuple, Histogram] = {}
+        self._queries: dict[tuple, Histogram] = {}
+        self._db_seconds: dict[tuple, float] = {}
+        self._slow_queries: dict[str, int] = {}
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            key = (method, route, status_code)
+            if key not in self._latency:
+                self._latency[key] = Histogram(LATENCY_BUCKETS_S)
+            self._latency[key].observe(seconds)
+
+            route_key = (method, route)
+            if route_key not in self._queries:
+                self._queries[route_key] = Histogram(QUERY_COUNT_BUCKETS)
+            self._queries[route_key].observe(stats.queries)
+            self._db_seconds[route_key] = self._db_seconds.get(route_key, 0.0) + stats.db_seconds
+
+    def observe_slow_query(self, route: str):
+        with self._lock:
+            self._slow_queries[route] = self._slow_queries.get(route, 0) + 1
+
+    def render(self) -> list[str]:
+        """Prometheus 텍스트 형식의 줄 목록"""
+        lines = []
+        with self._lock:
+            lines += _render_histogram(
+                "http_request_duration_seconds", "요청 처리 시간 (초)",
+                {_labels(method=m, route=r, status=s): h for (m, r, s), h in self._latency.items()},
+            )
+            lines += _render_histogram(
+                "http_request_db_queries", "요청당 실행한 DB 쿼리 수",
+                {_labels(method=m, route=r): h for (m, r), h in self._queries.items()},
+            )
+            lines += [
+                "# HELP http_request_db_seconds_total 요청 처리 중 DB 쿼리에 쓴 시간 합계 (초)",
+                "# TYPE http_request_db_seconds_total counter",
+            ]
+            lines += [
+                f"http_request_db_seconds_total{{{_labels(method=m, route=r)}}} {seconds:.6f}"
+                for (m, r), seconds in self._db_seconds.items()
+            ]
+            lines += [
+                f"# HELP db_slow_queries_total {self.slow_query_ms:g}ms 이상 걸린 쿼리 수",
+                "# TYPE db_slow_queries_total counter",
+            ]
+            lines += [
+                f"db_slow_queries_total{{{_labels(route=route)}}} {count}"
+                for route, count in self._slow_queries.items()
+            ]
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._latency.clear()
+            self._queries.clear()
+            self._db_seconds.clear()
+            self._slow_queries.clear()
+
+
+def _render_histogram(name: str, help_text: str, histograms: dict[str, Histogram]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in histograms.items():
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+request_metrics = RequestMetrics()
+
+
+# --- SQLAlchemy 커서 이벤트 ---
+
+def attach_query_metrics(engine):
+    """엔진(비동기 엔진이면 sync_engine)의 모든 쿼리를 현재 요청의 지표에 더합니다."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get("query_start_times")
+        if not start_times:
+            return
+        elapsed = time.perf_counter() - start_times.pop()
+        stats = _current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+        slow_query_ms = request_metrics.slow_query_ms
+        if slow_query_ms > 0 and elapsed * 1000 >= slow_query_ms:
+            route = stats.route if stats is not None else "-"
+            request_metrics.observe_slow_query(route)
+            slow_query_logger.warning(
+                "slow query %.1fms route=%s %s", elapsed * 1000, route, " ".join(statement.split())[:1000]
+            )
+
+
+# --- 미들웨어 ---
+
+class RequestMetricsMiddleware:
+    """
+    요청 처리 시간과 DB 쿼리 수/시간을 라우트별로 기록하고,
+    응답 헤더에 Server-Timing (app: 응답 시작까지 걸린 시간, db: DB 시간과 쿼리 수)을 붙입니다.
+    가장 바깥에 등록해야 다른 미들웨어(CORS, 속도 제한)에서 걸린 시간과 429 응답까지 함께 기록됩니다.
+    """
+
+    def __init__(self, app, router=None):
+        self.app = app
+        # (라우터까지 가지 못한 요청(429 등)의 경로 템플릿을 찾는 데 사용)
+        self.router = router
+
+    def _route_of(self, scope) -> str:
+        if "route" in scope or self.router is None:
+            return RequestStats(scope).route
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", UNMATCHED_ROUTE)
+        return UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                app_ms = (time.perf_counter() - start) * 1000
+                server_timing = (
+                    f'app;dur={app_ms:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", server_timing.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            request_metrics.observe_request(
+                scope["method"], self._route_of(scope), status_code, time.perf_counter() - start, stats
+            )
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from geo import EARTH_RADIUS_M
+
+# --- 일자별 동선(경로) 계산 ---
+# 같은 날 방문하는 장소들의 이동 거리를 구하고, 더 짧은 방문 순서를 제안합니다.
+# (첫 번째 장소(숙소 등)는 출발지로 고정하고, 마지막 장소는 자유롭게 두는 열린 경로입니다)
+
+# 2-opt 개선 반복 횟수 상한 (장소 수가 많아도 응답 시간이 일정 수준을 넘지 않도록)
+MAX_TWO_OPT_ITERATIONS = 2000
+# 이보다 작은 개선(m)은 무시합니다. (부동소수점 오차로 무한 반복하지 않도록)
+MIN_IMPROVEMENT_M = 1e-6
+
+
+def distance_matrix(lats, lngs) -> np.ndarray:
+    """모든 장소 쌍의 대원 거리(m) 행렬 (NumPy로 한 번에 계산)"""
+    phi = np.radians(np.asarray(lats, dtype=float))
+    lam = np.radians(np.asarray(lngs, dtype=float))
+    d_phi = phi[:, None] - phi[None, :]
+    d_lam = lam[:, None] - lam[None, :]
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(d_lam / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def path_length(dist: np.ndarray, order) -> float:
+    order = np.asarray(order)
+    if len(order) < 2:
+        return 0.0
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbour(dist: np.ndarray, start: int = 0) -> list[int]:
+    """출발지에서 시작해 매번 가장 가까운 미방문 장소로 이동하는 초기 경로"""
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    order = [start]
+    visited[start] = True
+    for _ in range(n - 1):
+        candidates = np.where(visited, np.inf, dist[order[-1]])
+        nearest = int(np.argmin(candidates))
+        order.append(nearest)
+        visited[nearest] = True
+    return order
+
+
+def two_opt(dist: np.ndarray, order: list[int]) -> list[int]:
+    """
+    경로의 한 구간을 뒤집어 총 거리가 줄어들면 적용하는 과정을 반복합니다.
+    매 반복마다 가능한 모든 (i, j) 구간의 개선량을 행렬 연산으로 한 번에 계산하여 가장 큰 것을 적용합니다.
+    """
+    n = len(order)
+    if n < 4:
+        return order
+
+    # 경로 끝에 모든 장소와의 거리가 0인 가상 지점을 붙여, 열린 경로도 같은 식으로 계산합니다.
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = dist
+    path = np.array(order + [n])
+
+    # 구간 [i, j] (1 <= i < j <= n-1)를 뒤집을 때:
+    #   제거되는 간선 (path[i-1], path[i]), (path[j], path[j+1])
+    #   추가되는 간선 (path[i-1], path[j]), (path[i], path[j+1])
+    i_index = np.arange(1, n)
+    upper = np.triu(np.ones((n - 1, n - 1), dtype=bool), k=1)
+    for _ in range(MAX_TWO_OPT_ITERATIONS):
+        before, first = path[i_index - 1], path[i_index]
+        last, after = path[i_index], path[i_index + 1]
+        removed = padded[before, first][:, None] + padded[last, after][None, :]
+        added = padded[before[:, None], last[None, :]] + padded[first[:, None], after[None, :]]
+        gain = np.where(upper, removed - added, 0.0)
+        best = int(np.argmax(gain))
+        row, col = divmod(best, n - 1)
+        if gain[row, col] <= MIN_IMPROVEMENT_M:
+            break
+        i, j = row + 1, col + 1
+        path[i:j + 1] = path[i:j + 1][::-1].copy()
+    return [int(node) for node in path[:-1]]
+
+
+def optimize_order(lats, lngs, dist: np.ndarray | None = None) -> tuple[list[int], float]:
+    """
+    (제안 방문 순서(인덱스), 그 순서의 총 거리(m)) — 첫 번째 장소는 고정
+    dist: 이미 계산한 distance_matrix(lats, lngs) (없으면 여기서 계산)
+    """
+    if len(lats) < 3:
+        order = list(range(len(lats)))
+        if not order:
+            return order, 0.0
+        return order, path_length(dist if dist is not None else distance_matrix(lats, lngs), order)
+    if dist is None:
+        dist = distance_matrix(lats, lngs)
+    order = two_opt(dist, nearest_neighbour(dist, start=0))
+    # (휴리스틱이 현재 순서보다 나빠지는 경우는 현재 순서를 그대로 제안)
+    current = list(range(len(lats)))
+    if path_length(dist, current) <= path_length(dist, order):
+        order = current
+    return order, path_length(dist, order)
+
+
+class RouteCache:
+    """
+    (trip_id, version) -> 계산된 동선을 저장하는 LRU 캐시입니다.
+    일정이 바뀌면 여행 version이 올라가므로 이전 항목은 더 이상 조회되지 않고 자연히 밀려납니다.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, trip_id: int, version: int):
+        with self._lock:
+            value = self._entries.get((trip_id, version))
+            if value is not None:
+                self._entries.move_to_end((trip_id, version))
+            return value
+
+    def set(self, trip_id: int, version: int, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[(trip_id, version)] = value
+            self._entries.move_to_end((trip_id, version))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
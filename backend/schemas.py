@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
 from datetime import date
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 # --- Token  ---
 class Token(BaseModel):
@@ -9,6 +9,7 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: str | None = None
+    user_id: int | None = None
 
 # 세부 일정의 기본 스키마
 class ItineraryItemBase(BaseModel):
@@ -51,8 +52,11 @@ class ItineraryItem(ItineraryItemBase):
     id: int
     trip_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+# 위치 검색 결과 (near 검색이면 중심점까지의 거리(m) 포함)
+class ItineraryItemSearchResult(ItineraryItem):
+    distance_m: float | None = None
 
 # Trip 생성/수정 시 사용할 기본 스키마
 class TripBase(BaseModel):
@@ -95,10 +99,88 @@ class TripUpdate(BaseModel):
 class Trip(TripBase):
     id: int
     owner_id: int 
+    version: int = 1
+    items: List[ItineraryItem] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+# 날짜(N일차)별로 묶은 일정
+class TripDay(BaseModel):
+    day: int
     items: List[ItineraryItem] = []
 
-    class Config:
-        orm_mode = True
+# 일정을 날짜별로 묶어서 응답하는 여행 상세 스키마 (view=grouped)
+class TripGrouped(TripBase):
+    id: int
+    owner_id: int
+    version: int = 1
+    days: List[TripDay] = []
+
+# 일정 변경 후 바뀐 부분만 돌려주는 응답 (?return=delta)
+class TripDelta(BaseModel):
+    trip_id: int
+    version: int
+    items: List[ItineraryItem] = []         # 추가/수정된 일정
+    deleted_item_ids: List[int] = []        # 삭제된 일정 id
+
+# 실시간 알림 이벤트 (WebSocket /ws/trips/{trip_id})
+# subscribed: 연결 직후 현재 version / delta: 일정 변경분 / trip: 제목·날짜 변경 / deleted: 여행 삭제
+# resync: 놓친 이벤트가 있으니 여행을 다시 조회해야 함
+class TripEvent(BaseModel):
+    type: Literal["subscribed", "delta", "trip", "deleted", "resync"]
+    trip_id: int
+    version: Optional[int] = None
+    items: List[ItineraryItem] = []         # (delta) 추가/수정된 일정
+    deleted_item_ids: List[int] = []        # (delta) 삭제된 일정 id
+    title: Optional[str] = None             # (trip)
+    start_date: Optional[date] = None       # (trip)
+    end_date: Optional[date] = None         # (trip)
+
+# 여행 목록 요약용 스키마 (items 대신 일정 개수만 포함)
+class TripSummary(TripBase):
+    id: int
+    owner_id: int
+    version: int = 1
+    item_count: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+# --- 일자별 동선(경로) ---
+class RouteLeg(BaseModel):
+    from_item_id: int
+    to_item_id: int
+    distance_m: float
+
+class DayRoute(BaseModel):
+    day: int
+    item_ids: List[int] = []                # 현재 순서 (order_sequence 순)
+    legs: List[RouteLeg] = []               # 현재 순서의 구간별 거리
+    total_distance_m: float = 0
+    optimized_item_ids: List[int] = []      # 제안하는 방문 순서 (첫 장소는 고정)
+    optimized_distance_m: float = 0
+    skipped_item_ids: List[int] = []        # 위경도가 없어 계산에서 제외된 일정 (제안 순서의 맨 뒤에 둠)
+
+class TripRoute(BaseModel):
+    trip_id: int
+    version: int
+    days: List[DayRoute] = []
+
+# --- 검색 결과 (여행 또는 세부 일정) ---
+class SearchHit(BaseModel):
+    kind: Literal["trip", "item"]
+    id: int                         # 여행 id 또는 일정 id
+    trip_id: int
+    trip_title: str
+    day: int | None = None          # (일정만)
+    place_name: str | None = None   # (일정만)
+    address: str | None = None      # (일정만)
+    memo: str | None = None         # (일정만)
+    score: float
+
+# 여행 데이터 가져오기 결과
+class ImportResult(BaseModel):
+    trips_created: int
+    items_created: int
 
 # --- User ---
 class UserCreate(BaseModel):
@@ -116,8 +198,7 @@ class User(BaseModel):
     username: str
     trips: list[Trip] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- 세부 일정 순서 일괄 업데이트용 스키마 ---
 class ItemOrderUpdate(BaseModel):
@@ -0,0 +1,144 @@
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# --- 검색 (여행 제목 / 장소 이름 / 주소 / 메모) ---
+# 검색어를 공백으로 나눈 모든 단어가 (어느 필드든) 포함된 문서만 찾습니다.
+# 점수는 Postgres(SQL)와 메모리 색인에서 같은 규칙으로 계산됩니다:
+#   단어마다 가장 잘 맞는 필드의 (필드 가중치 x 일치 점수)를 더합니다.
+
+MAX_QUERY_TERMS = 8
+
+# 필드 가중치
+TRIP_FIELD_WEIGHTS = {"title": 3.0}
+ITEM_FIELD_WEIGHTS = {"place_name": 2.0, "address": 1.0, "memo": 1.0}
+
+# 일치 점수: 필드가 단어로 시작 > 필드 안의 어떤 어절이 단어로 시작 > 중간에 포함
+PREFIX_SCORE = 1.0
+WORD_PREFIX_SCORE = 0.8
+CONTAINS_SCORE = 0.5
+
+
+def normalize(text: str) -> str:
+    """전각/반각, 대소문자 차이를 없앱니다. (ILIKE와 같은 대소문자 무시 비교)"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def query_terms(q: str) -> list[str]:
+    """검색어를 중복 없는 단어 목록으로 나눕니다."""
+    terms = list(dict.fromkeys(normalize(q).split()))
+    return terms[:MAX_QUERY_TERMS]
+
+
+def match_score(text: str | None, term: str) -> float:
+    if not text:
+        return 0.0
+    if text.startswith(term):
+        return PREFIX_SCORE
+    if " " + term in text:
+        return WORD_PREFIX_SCORE
+    if term in text:
+        return CONTAINS_SCORE
+    return 0.0
+
+
+def document_score(fields: dict[str, str | None], weights: dict[str, float], terms: list[str]) -> float:
+    """모든 단어가 포함되면 점수를, 하나라도 없으면 0을 반환합니다. (fields는 normalize된 값)"""
+    total = 0.0
+    for term in terms:
+        best = max(weights[name] * match_score(fields.get(name), term) for name in weights)
+        if best == 0:
+            return 0.0
+        total += best
+    return round(total, 4)
+
+
+def _grams(text: str) -> set[str]:
+    """문자 1-gram과 2-gram (부분 문자열 검색 후보를 좁히는 용도)"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class InvertedIndex:
+    """
+    (Postgres 외 DB용) 한 사용자의 여행/일정으로 만든 메모리 역색인입니다.
+    문자 n-gram -> 문서 번호 집합으로 후보를 좁힌 뒤, 실제 포함 여부와 점수를 계산합니다.
+    """
+
+    def __init__(self):
+        self.documents: list[tuple[dict, dict[str, str | None], dict[str, float]]] = []
+        self._postings: dict[str, set[int]] = {}
+
+    def add(self, hit: dict, fields: dict[str, str | None], weights: dict[str, float]):
+        """hit: 검색 결과로 돌려줄 값, fields: 검색 대상 필드 원문"""
+        doc_id = len(self.documents)
+        normalized = {name: normalize(value) if value else None for name, value in fields.items()}
+        self.documents.append((hit, normalized, weights))
+        for value in normalized.values():
+            if value:
+                for gram in _grams(value):
+                    self._postings.setdefault(gram, set()).add(doc_id)
+
+    def _candidates(self, term: str) -> set[int]:
+        grams = [term] if len(term) == 1 else [term[i:i + 2] for i in range(len(term) - 1)]
+        postings = sorted((self._postings.get(gram, set()) for gram in set(grams)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        return set.intersection(*postings)
+
+    def search(self, terms: list[str]) -> list[tuple[float, dict]]:
+        """(점수, hit) 목록을 점수 내림차순으로 반환합니다."""
+        if not terms:
+            return []
+        candidates = None
+        for term in sorted(terms, key=len, reverse=True):
+            found = self._candidates(term)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return []
+        results = []
+        for doc_id in candidates:
+            hit, fields, weights = self.documents[doc_id]
+            score = document_score(fields, weights, terms)
+            if score > 0:
+                results.append((score, hit))
+        results.sort(key=sort_key)
+        return results
+
+
+def sort_key(result: tuple[float, dict]):
+    """점수 내림차순, 같은 점수면 여행 -> 일정, id 순"""
+    score, hit = result
+    return -score, hit["kind"] != "trip", hit["id"]
+
+
+class SearchIndexCache:
+    """
+    user_id -> (지문, 역색인) LRU 캐시입니다.
+    지문(여행 개수, 최대 id, version 합)이 바뀌면 (여행/일정이 바뀌면) 색인을 다시 만듭니다.
+    """
+
+    def __init__(self, max_size: int = 100):
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple[tuple, InvertedIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, fingerprint: tuple) -> InvertedIndex | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != fingerprint:
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id: int, fingerprint: tuple, index: InvertedIndex):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (fingerprint, index)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
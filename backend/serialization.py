@@ -0,0 +1,40 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# --- 응답 직렬화 빠른 경로 ---
+# FastAPI 기본 경로: ORM 객체 -> 응답 모델 검증 -> (mode="json") dict -> json.dumps -> 바이트
+# 여기서는 캐시된 TypeAdapter로 한 번 검증한 뒤, pydantic-core가 중간 dict 없이 바로 JSON 바이트를 씁니다.
+# (응답 모델이 큰 목록(여행 + 일정 수백 개)일수록 차이가 큽니다)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    """응답 타입별 TypeAdapter (스키마 빌드는 타입당 한 번만 합니다)"""
+    return TypeAdapter(response_type)
+
+
+def dump_json(response_type: Any, content: Any) -> bytes:
+    """ORM 객체(또는 스키마 인스턴스)를 response_type으로 검증하고 JSON 바이트로 만듭니다."""
+    adapter = type_adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def json_response(
+    response_type: Any,
+    content: Any,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    dump_json 결과를 그대로 담은 응답입니다.
+    (Response를 직접 반환하면 엔드포인트에 주입된 response의 헤더는 합쳐지지 않으므로 headers로 넘겨야 합니다)
+    """
+    return Response(
+        content=dump_json(response_type, content),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
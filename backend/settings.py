@@ -0,0 +1,110 @@
+import os
+from functools import lru_cache
+from typing import Literal
+
+from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+# --- 앱 설정 ---
+# 필드 이름을 대문자로 바꾼 환경 변수(.env 포함)에서 읽습니다. (예: db_pool_size <- DB_POOL_SIZE)
+# 임포트할 때가 아니라 get_settings()를 처음 호출할 때(create_app) 한 번만 읽고 검증합니다.
+# (빈 값은 설정하지 않은 것으로 봅니다)
+
+
+class Settings(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # --- DB ---
+    database_url: str
+    async_database_url: str | None = None          # 없으면 database_url에서 비동기 드라이버 URL로 변환
+    # 워커 수 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) 가 Postgres max_connections 를 넘지 않도록 맞춰야 합니다.
+    db_pool_size: int = Field(5, ge=1)
+    db_max_overflow: int = Field(10, ge=0)
+    db_pool_timeout: float = Field(30, gt=0)        # 커넥션 대기 최대 시간(초)
+    db_pool_recycle: int = -1                       # 커넥션 재생성 주기(초), -1이면 사용 안 함
+    db_pool_pre_ping: bool = False
+    db_statement_timeout_ms: int = Field(0, ge=0)   # 0이면 사용 안 함 (Postgres 전용)
+    # 시작할 때 미리 열어 둘 커넥션 수 (없으면 DB_POOL_SIZE, 0이면 미리 열지 않음)
+    db_warmup_connections: int | None = Field(None, ge=0)
+
+    # --- 읽기 복제본 (설정하지 않으면 모든 읽기도 primary에서 합니다) ---
+    database_replica_urls: list[str] = []           # 쉼표로 구분
+    db_replica_retry_seconds: float = Field(30, ge=0)   # 연결에 실패한 복제본을 건너뛰는 시간(초)
+    db_replica_pre_ping: bool = True
+    db_read_your_writes_seconds: float = Field(5, ge=0)  # 쓰기를 커밋한 사용자가 primary에서 읽는 시간(초)
+
+    # --- JWT ---
+    secret_key: str
+    algorithm: str
+    access_token_expire_minutes: int = Field(gt=0)
+
+    # --- 요청 속도 제한 ---
+    rate_limit_enabled: bool = True
+    rate_limit_backend: Literal["memory", "redis"] = "memory"     # redis: 여러 워커가 버킷 공유
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    rate_limit_max_keys: int = Field(100000, ge=1)
+    rate_limit_auth_burst: int = Field(10, ge=0)
+    rate_limit_auth_per_minute: float = Field(20, ge=0)
+    rate_limit_write_burst: int = Field(60, ge=0)
+    rate_limit_write_per_minute: float = Field(300, ge=0)
+    rate_limit_trust_forwarded: bool = False        # 프록시(nginx 등) 뒤에서 실행할 때만 true (X-Forwarded-For를 신뢰)
+    # 앱 앞에 있는 (X-Forwarded-For에 IP를 붙이는) 신뢰하는 프록시 수. 오른쪽에서 이 번째 값을 클라이언트 IP로 씁니다.
+    rate_limit_trusted_proxy_hops: int = Field(1, ge=1)
+
+    # --- 비밀번호 해싱 (password_hashing.py) ---
+    password_hash_rounds: int = Field(29000, ge=1000)   # PBKDF2 반복 횟수 (바꾸면 다음 로그인 때 다시 해싱)
+    # 해싱 전용 프로세스 수 (0이면 별도 프로세스 없이 스레드풀에서 실행)
+    password_hash_workers: int = Field(default_factory=lambda: os.cpu_count() or 1, ge=0)
+
+    # --- 요청 지표 ---
+    slow_query_ms: float = Field(200, ge=0)     # 이 시간(ms) 이상 걸린 쿼리를 로그로 남김 (0이면 끔)
+
+    # --- 내부용 엔드포인트(/metrics, /internal/db-pool) 보호 토큰 ---
+    # 요청의 X-Internal-Token 헤더가 이 값과 같아야 합니다. 설정하지 않으면 내부용 엔드포인트는 404입니다. (기본으로 막힘)
+    internal_api_token: str | None = None
+
+    # --- 캐시/제한 ---
+    # (인증 사용자 캐시) 다른 워커에서 수정/삭제한 사용자는 최대 이 시간 동안 예전 정보로 인증됩니다. 짧게 유지하세요.
+    principal_cache_ttl_seconds: float = Field(10, ge=0)
+    principal_cache_max_size: int = Field(10000, ge=0)
+    max_batch_items: int = Field(500, ge=1)
+    route_cache_max_size: int = Field(1000, ge=0)
+    search_backend: Literal["sql", "memory"] | None = None   # 없으면 DB에 따라 결정 (Postgres면 sql)
+    search_index_cache_max_size: int = Field(100, ge=0)
+    export_batch_size: int = Field(1000, ge=1)
+    import_chunk_size: int = Field(1000, ge=1)
+
+    # --- 실시간 알림 ---
+    live_broker: Literal["memory", "redis"] = "memory"          # redis: 여러 워커가 이벤트 공유
+    live_redis_url: str = "redis://localhost:6379/0"
+    live_queue_size: int = Field(100, ge=1)             # 구독자당 쌓아둘 최대 이벤트 수
+    live_max_subscribers: int = Field(10000, ge=0)      # 워커당 최대 연결 수
+    live_send_timeout_seconds: float = Field(10, gt=0)  # 이보다 오래 못 보내면 연결을 끊음
+    live_auth_timeout_seconds: float = Field(10, gt=0)  # 연결 후 이 시간 안에 auth 메시지가 없으면 4401
+
+    @field_validator("database_replica_urls", mode="before")
+    @classmethod
+    def split_urls(cls, value):
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
+    @classmethod
+    def from_env(cls, environ=None) -> "Settings":
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name in cls.model_fields:
+            value = environ.get(name.upper())
+            if value is not None and value.strip() != "":
+                values[name] = value
+        return cls.model_validate(values)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """.env와 환경 변수를 한 번만 읽고 검증합니다. (잘못된 값이 있으면 앱이 시작되지 않습니다)"""
+    load_dotenv()
+    try:
+        return Settings.from_env()
+    except ValidationError as error:
+        raise RuntimeError(f"환경 설정이 올바르지 않습니다.\n{error}") from error
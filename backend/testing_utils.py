@@ -0,0 +1,56 @@
+"""
+벤치마크(benchmarks/load.py)와 테스트가 함께 쓰는 측정 도우미
+
+- asgi_stream: 응답 본문을 모으지 않고 버리면서 앱을 직접 호출합니다. (스트리밍 응답의 메모리 측정용)
+- rss_mb: 현재 프로세스의 RSS(MB). /proc/self/status 가 없는 환경(macOS, Windows)에서는 None
+"""
+import asyncio
+
+
+async def asgi_stream(app, path: str, query: str, headers: dict) -> tuple[int, dict, int]:
+    """
+    (내보내기 등 스트리밍 응답 측정용) 응답 본문을 버리면서 읽습니다.
+    httpx의 ASGI transport는 본문 전체를 메모리에 모으므로, 스트리밍 메모리를 재려면 앱을 직접 호출합니다.
+    """
+    status, response_headers, size = 0, {}, 0
+    request_sent = False
+    disconnect = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, response_headers, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = {key.decode(): value.decode() for key, value in message["headers"]}
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnect.set()
+    return status, response_headers, size
+
+
+def rss_mb() -> float | None:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
@@ -0,0 +1,93 @@
+"""
+테스트 공용 fixture
+
+임시 SQLite 파일 DB로 create_app()을 만들고, lifespan을 실행한 상태에서
+httpx.ASGITransport로 요청을 보냅니다. (서버/네트워크 없이 실행)
+요청당 DB 쿼리 수는 request_metrics의 커서 이벤트가 붙이는 Server-Timing 헤더에서 읽습니다.
+"""
+import re
+
+import httpx
+import pytest
+
+import database
+import main
+import models
+from settings import Settings
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+PASSWORD = "password1"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def app_settings(tmp_path) -> Settings:
+    return Settings(
+        database_url=f"sqlite:///{tmp_path / 'app.db'}",
+        secret_key="test-secret-key-test-secret-key-0",
+        algorithm="HS256",
+        access_token_expire_minutes=30,
+        rate_limit_enabled=False,
+        password_hash_rounds=1000,
+        password_hash_workers=0,     # (테스트에서는 프로세스 풀 없이 스레드풀에서 해싱)
+        slow_query_ms=0,
+        db_warmup_connections=1,
+    )
+
+
+@pytest.fixture
+async def client(app_settings):
+    app = main.create_app(app_settings)
+    models.Base.metadata.create_all(database.init_engines(app_settings).engine)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+
+
+def query_count(response: httpx.Response) -> int:
+    """요청 처리 중 실행한 DB 쿼리 수 (Server-Timing: db;desc="N queries")"""
+    return int(SERVER_TIMING_QUERIES.search(response.headers["server-timing"]).group(1))
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    """사용자를 만들고 로그인한 뒤, 인증 헤더를 반환합니다. (사용자 캐시도 미리 채웁니다)"""
+    username = email.split("@")[0]
+    response = await client.post("/api/auth/register", json={"email": email, "username": username, "password": PASSWORD})
+    assert response.status_code == 201, response.text
+    response = await client.post("/api/auth/login", data={"username": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # (첫 인증 요청은 사용자 행을 조회하므로, 쿼리 수를 재는 요청보다 먼저 한 번 보냅니다)
+    assert (await client.get("/api/trips", headers=headers)).status_code == 200
+    return headers
+
+
+@pytest.fixture
+async def auth(client) -> dict:
+    return await login(client, "owner@example.com")
+
+
+@pytest.fixture
+async def other_auth(client) -> dict:
+    return await login(client, "other@example.com")
+
+
+async def create_trip(client: httpx.AsyncClient, headers: dict, items: int = 0) -> dict:
+    response = await client.post(
+        "/api/trips", json={"title": "제주 여행", "start_date": "2025-05-01", "end_date": "2025-05-03"}, headers=headers
+    )
+    assert response.status_code == 201, response.text
+    trip = response.json()
+    if items:
+        response = await client.post(f"/api/trips/{trip['id']}/items:batch", json=[
+            {"day": 1 + number % 2, "order_sequence": number, "place_name": f"장소 {number}"}
+            for number in range(items)
+        ], headers=headers)
+        assert response.status_code == 201, response.text
+        trip["items"] = response.json()
+    return trip
@@ -0,0 +1,90 @@
+"""
+여행 version / ETag 테스트
+일정(또는 여행)을 바꾸는 모든 엔드포인트가 trips.version을 올리고,
+ETag가 같으면 본문을 만들지 않고 304를 반환해야 합니다.
+"""
+import pytest
+
+from conftest import create_trip, query_count
+
+pytestmark = pytest.mark.anyio
+
+
+async def trip_version(client, headers, trip_id: int) -> int:
+    response = await client.get(f"/api/trips/{trip_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["version"]
+
+
+# (이름, 요청을 만드는 함수) 요청 함수는 (trip, items)를 받아 (method, url, json)을 반환합니다.
+MUTATIONS = {
+    "create_item": lambda trip, items: (
+        "POST", f"/api/trips/{trip['id']}/items", {"day": 1, "order_sequence": 9, "place_name": "새 장소"}
+    ),
+    "create_items_batch": lambda trip, items: (
+        "POST", f"/api/trips/{trip['id']}/items:batch",
+        [{"day": 2, "order_sequence": number, "place_name": f"추가 {number}"} for number in range(3)],
+    ),
+    "update_item": lambda trip, items: ("PUT", f"/api/items/{items[0]['id']}", {"memo": "메모"}),
+    "delete_item": lambda trip, items: ("DELETE", f"/api/items/{items[0]['id']}", None),
+    "reorder_items": lambda trip, items: (
+        "POST", "/api/items/reorder",
+        [{"id": items[0]["id"], "order_sequence": 7}, {"id": items[1]["id"], "order_sequence": 6}],
+    ),
+    "update_trip": lambda trip, items: ("PUT", f"/api/trips/{trip['id']}", {"title": "수정된 여행"}),
+}
+
+
+@pytest.mark.parametrize("name", MUTATIONS)
+async def test_mutation_bumps_trip_version(client, auth, name):
+    trip = await create_trip(client, auth, items=3)
+    before = await trip_version(client, auth, trip["id"])
+
+    method, url, body = MUTATIONS[name](trip, trip["items"])
+    response = await client.request(method, url, json=body, headers=auth)
+    assert response.status_code < 300, response.text
+
+    assert await trip_version(client, auth, trip["id"]) == before + 1
+
+
+async def test_failed_mutation_keeps_version(client, auth, other_auth):
+    trip = await create_trip(client, auth, items=2)
+    before = await trip_version(client, auth, trip["id"])
+
+    response = await client.put(f"/api/items/{trip['items'][0]['id']}", json={"memo": "남의 일정"}, headers=other_auth)
+    assert response.status_code == 403
+
+    assert await trip_version(client, auth, trip["id"]) == before
+
+
+async def test_trip_detail_not_modified(client, auth):
+    trip = await create_trip(client, auth, items=3)
+    response = await client.get(f"/api/trips/{trip['id']}", headers=auth)
+    etag = response.headers["etag"]
+
+    # 여행 행만 조회하고 일정은 불러오지 않습니다.
+    response = await client.get(f"/api/trips/{trip['id']}", headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert query_count(response) == 1
+
+    await client.put(f"/api/items/{trip['items'][0]['id']}", json={"memo": "바뀜"}, headers=auth)
+    response = await client.get(f"/api/trips/{trip['id']}", headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+async def test_trip_list_not_modified(client, auth):
+    trip = await create_trip(client, auth, items=3)
+    response = await client.get("/api/trips", headers=auth)
+    etag = response.headers["etag"]
+
+    response = await client.get("/api/trips", headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert query_count(response) == 1
+
+    # 일정만 바뀌어도 (version 합이 달라지므로) 목록 ETag가 바뀝니다.
+    await client.delete(f"/api/items/{trip['items'][0]['id']}", headers=auth)
+    response = await client.get("/api/trips", headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,77 @@
+"""
+(느린 테스트) 일정 100만 개를 내보내는 동안 메모리(RSS)가 내보내는 크기만큼 늘지 않아야 합니다.
+
+    cd backend
+    python -m pytest -m slow
+    EXPORT_TEST_ITEMS=200000 python -m pytest -m slow     # 일정 수 조절
+"""
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import insert, select
+
+import database
+import main
+import models
+from testing_utils import asgi_stream, rss_mb
+
+pytestmark = [pytest.mark.anyio, pytest.mark.slow]
+
+EXPORT_ITEMS = int(os.environ.get("EXPORT_TEST_ITEMS", "1000000"))
+ITEMS_PER_TRIP = 1000
+MAX_RSS_GROWTH_MB = 100
+SEED_CHUNK_SIZE = 10000
+
+
+def seed(engine) -> int:
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "export@example.com", "username": "export", "hashed_password": "-"}])
+        user_id = conn.scalar(select(models.User.id))
+        trip_count = -(-EXPORT_ITEMS // ITEMS_PER_TRIP)
+        conn.execute(insert(models.Trip), [{"owner_id": user_id, "title": f"여행 {n}"} for n in range(trip_count)])
+        trip_ids = conn.scalars(select(models.Trip.id).order_by(models.Trip.id)).all()
+        rows = (
+            {
+                "trip_id": trip_ids[n // ITEMS_PER_TRIP], "day": 1, "order_sequence": n % ITEMS_PER_TRIP,
+                "place_name": f"장소 {n}", "address": f"주소 {n}번길", "memo": "메모",
+            }
+            for n in range(EXPORT_ITEMS)
+        )
+        while chunk := [row for _, row in zip(range(SEED_CHUNK_SIZE), rows)]:
+            conn.execute(insert(models.ItineraryItem), chunk)
+    return user_id
+
+
+@pytest.mark.skipif(rss_mb() is None, reason="/proc/self/status 가 없는 환경")
+async def test_export_streams_with_bounded_memory(app_settings):
+    app = main.create_app(app_settings)
+    engine = database.init_engines(app_settings).engine
+    models.Base.metadata.create_all(engine)
+    user_id = seed(engine)
+    token = main.create_access_token({"sub": "export@example.com", "uid": user_id})
+
+    async with app.router.lifespan_context(app):
+        baseline = peak = rss_mb()
+        done = asyncio.Event()
+
+        async def sample():
+            nonlocal peak
+            while not done.is_set():
+                peak = max(peak, rss_mb())
+                await asyncio.sleep(0.05)
+
+        sampler = asyncio.create_task(sample())
+        try:
+            status, headers, size = await asgi_stream(
+                app, "/api/trips/export", "format=ndjson", {"Authorization": f"Bearer {token}"}
+            )
+        finally:
+            done.set()
+            await sampler
+
+    assert status == 200
+    # (헤더 한 줄 + 일정마다 한 줄) 내보낸 크기보다 메모리가 훨씬 적게 늘어야 합니다.
+    assert size > EXPORT_ITEMS * 50
+    growth = peak - baseline
+    assert growth < MAX_RSS_GROWTH_MB, f"{size / 2**20:.0f}MB를 내보내는 동안 RSS가 {growth:.0f}MB 늘었습니다."
@@ -0,0 +1,37 @@
+"""
+내부용 엔드포인트 (/internal/db-pool, /metrics) 보호 테스트
+INTERNAL_API_TOKEN을 설정하지 않으면 막혀 있어야 하고, 설정하면 같은 X-Internal-Token 헤더로만 읽을 수 있습니다.
+"""
+import httpx
+import pytest
+
+import database
+import main
+import models
+
+pytestmark = pytest.mark.anyio
+
+INTERNAL_PATHS = ["/internal/db-pool", "/metrics"]
+
+
+@pytest.fixture
+async def token_client(app_settings):
+    app = main.create_app(app_settings.model_copy(update={"internal_api_token": "internal-secret"}))
+    models.Base.metadata.create_all(database.init_engines(main.settings).engine)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+
+
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+async def test_internal_endpoint_hidden_without_configured_token(client, path):
+    assert (await client.get(path)).status_code == 404
+    assert (await client.get(path, headers={"X-Internal-Token": ""})).status_code == 404
+
+
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+async def test_internal_endpoint_requires_matching_token(token_client, path):
+    assert (await token_client.get(path)).status_code == 403
+    assert (await token_client.get(path, headers={"X-Internal-Token": "wrong"})).status_code == 403
+    assert (await token_client.get(path, headers={"X-Internal-Token": "internal-secret"})).status_code == 200
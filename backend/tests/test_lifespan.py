@@ -0,0 +1,63 @@
+"""
+lifespan 테스트
+종료할 때(시작 도중 실패해도) 엔진을 정리해야 합니다. (aiosqlite 커넥션 스레드가 남으면 프로세스가 끝나지 않습니다)
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import database
+import main
+
+pytestmark = pytest.mark.anyio
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_process_exits_after_lifespan(tmp_path):
+    script = textwrap.dedent("""
+        import asyncio
+        import httpx
+        import database, main, models
+
+        async def run():
+            app = main.create_app()
+            models.Base.metadata.create_all(database.init_engines(main.settings).engine)
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+                    response = await client.get("/api/trips", headers={"Authorization": "Bearer invalid"})
+                    assert response.status_code == 401
+
+        asyncio.run(run())
+    """)
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'app.db'}",
+        "SECRET_KEY": "test-secret-key-test-secret-key-0",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+        "PASSWORD_HASH_WORKERS": "0",
+    }
+    env.pop("ASYNC_DATABASE_URL", None)
+    # (엔진을 정리하지 않으면 여기서 시간 초과로 실패합니다)
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, timeout=60)
+    assert result.returncode == 0, result.stderr.decode()
+
+
+async def test_startup_failure_disposes_engines(app_settings, monkeypatch):
+    app = main.create_app(app_settings)
+
+    async def fail():
+        raise RuntimeError("broker unavailable")
+
+    monkeypatch.setattr(main.live_hub, "start", fail)
+    try:
+        with pytest.raises(RuntimeError):
+            async with app.router.lifespan_context(app):
+                pass
+        assert database._engines is None
+    finally:
+        await database.dispose_engines()     # (실패했을 때 테스트 프로세스가 멈추지 않도록)
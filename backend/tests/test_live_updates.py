@@ -0,0 +1,124 @@
+"""
+실시간 알림 테스트 (live_updates.py, WebSocket /ws/trips/{trip_id})
+Redis 브로커는 가짜 클라이언트로 재연결/잘못된 메시지 처리를 확인하고,
+WebSocket은 ASGI 앱을 직접 호출해 인증 방식을 확인합니다.
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import database
+import main
+import models
+from conftest import create_trip, login
+from live_updates import RedisBroker, TripEventHub
+
+pytestmark = pytest.mark.anyio
+
+
+# --- Redis 브로커 (재연결) ---
+class FakePubSub:
+    def __init__(self, messages: list, fail: bool):
+        self.messages = messages
+        self.fail = fail
+        self.closed = False
+
+    async def subscribe(self, channel):
+        pass
+
+    async def listen(self):
+        for data in self.messages:
+            yield {"type": "message", "data": data}
+        if self.fail:
+            raise ConnectionError("connection reset")
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeRedis:
+    """pubsub()를 부를 때마다 다음 연결을 돌려줍니다. 마지막 연결만 끊기지 않습니다."""
+
+    def __init__(self, *connections: list):
+        self.pubsubs = [FakePubSub(messages, fail=number < len(connections) - 1) for number, messages in enumerate(connections)]
+        self.opened = 0
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = self.pubsubs[self.opened]
+        self.opened += 1
+        return pubsub
+
+    async def aclose(self):
+        pass
+
+
+async def test_redis_broker_skips_malformed_messages_and_resyncs_after_reconnect():
+    redis = FakeRedis([b"not-a-trip:{}", b"\xff\xfe", b"1:first"], [b"1:second"])
+    hub = TripEventHub(RedisBroker("redis://unused", reconnect_delay=0.01, client=redis))
+    subscription = hub.subscribe(1)
+    await hub.start()
+    try:
+        messages = [await asyncio.wait_for(subscription.get(), 1) for _ in range(3)]
+    finally:
+        await hub.close()
+
+    assert messages == ["first", json.dumps({"type": "resync", "trip_id": 1}), "second"]
+    assert redis.opened == 2
+    assert all(pubsub.closed for pubsub in redis.pubsubs)
+
+
+# --- WebSocket 인증 ---
+@pytest.fixture
+async def ws_app(app_settings):
+    app = main.create_app(app_settings.model_copy(update={"live_auth_timeout_seconds": 1}))
+    models.Base.metadata.create_all(database.init_engines(main.settings).engine)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield app, client
+
+
+async def websocket_session(app, path: str, sent: list[dict], headers: list = (), query: bytes = b"") -> dict:
+    """연결해서 sent의 텍스트 메시지를 보낸 뒤, 서버가 처음 보낸 메시지(send 또는 close)를 반환합니다."""
+    incoming: asyncio.Queue = asyncio.Queue()
+    outgoing: asyncio.Queue = asyncio.Queue()
+    scope = {
+        "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query, "headers": list(headers), "subprotocols": [],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    await incoming.put({"type": "websocket.connect"})
+    for message in sent:
+        await incoming.put({"type": "websocket.receive", "text": json.dumps(message)})
+    task = asyncio.create_task(app(scope, incoming.get, outgoing.put))
+    try:
+        assert (await asyncio.wait_for(outgoing.get(), 5))["type"] == "websocket.accept"
+        return await asyncio.wait_for(outgoing.get(), 5)
+    finally:
+        await incoming.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(task, 5)
+
+
+async def test_websocket_authenticates_with_first_message(ws_app):
+    app, client = ws_app
+    headers = await login(client, "owner@example.com")
+    trip = await create_trip(client, headers)
+    token = headers["Authorization"].removeprefix("Bearer ")
+
+    message = await websocket_session(app, f"/ws/trips/{trip['id']}", [{"type": "auth", "token": token}])
+    assert message["type"] == "websocket.send"
+    assert json.loads(message["text"])["type"] == "subscribed"
+
+
+async def test_websocket_ignores_token_in_query_string(ws_app):
+    app, client = ws_app
+    headers = await login(client, "owner@example.com")
+    trip = await create_trip(client, headers)
+    token = headers["Authorization"].removeprefix("Bearer ")
+
+    # (URL의 토큰은 접근 로그에 남으므로 받지 않습니다. auth 메시지가 없으면 4401)
+    message = await websocket_session(app, f"/ws/trips/{trip['id']}", [], query=f"token={token}".encode())
+    assert message == {"type": "websocket.close", "code": 4401, "reason": "유효한 자격 증명을 찾을 수 없습니다."}
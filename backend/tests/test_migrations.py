@@ -0,0 +1,65 @@
+"""
+마이그레이션 테스트
+빈 SQLite 파일에 alembic upgrade head 를 실행한 뒤, 실제 쿼리 모양이 인덱스를 사용하는지 EXPLAIN QUERY PLAN 으로 확인합니다.
+"""
+import os
+import subprocess
+import sys
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+import models
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def migrated_engine(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('migrations') / 'app.db'}"
+    env = {**os.environ, "DATABASE_URL": url}
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement) -> str:
+    sql = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return "\n".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def test_upgrade_creates_model_tables(migrated_engine):
+    with migrated_engine.connect() as conn:
+        tables = set(conn.scalars(text("SELECT name FROM sqlite_master WHERE type = 'table'")))
+    assert set(models.Base.metadata.tables) <= tables
+
+
+def test_trip_list_uses_owner_start_date_index(migrated_engine):
+    # (read_my_trips 의 start_from/start_to 필터)
+    statement = (
+        select(models.Trip)
+        .where(
+            models.Trip.owner_id == 1,
+            models.Trip.start_date >= date(2025, 1, 1),
+            models.Trip.start_date <= date(2025, 12, 31),
+        )
+        .order_by(models.Trip.id)
+    )
+    assert "ix_trips_owner_id_start_date" in query_plan(migrated_engine, statement)
+
+
+def test_trip_items_use_day_order_index(migrated_engine):
+    # (read_trip_details 의 정렬된 일정 조회)
+    Item = models.ItineraryItem
+    statement = select(Item).where(Item.trip_id == 1).order_by(Item.day, Item.order_sequence, Item.id)
+    plan = query_plan(migrated_engine, statement)
+    assert "ix_itinerary_items_trip_id_day_order" in plan
+    # (day, order_sequence 정렬은 인덱스 순서를 그대로 사용합니다)
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan
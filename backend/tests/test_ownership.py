@@ -0,0 +1,86 @@
+"""
+소유권 확인 테스트 (ownership.py)
+일정 생성/수정/재정렬/삭제는 소유권 확인을 쓰기 문에 포함하여, version 갱신까지 쿼리 2번으로 끝나야 합니다.
+없는 일정은 404, 다른 사용자의 일정은 403 (여행은 다른 사용자의 것이어도 404)
+"""
+import pytest
+
+from conftest import create_trip, query_count
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_item_query_count(client, auth):
+    trip = await create_trip(client, auth)
+    response = await client.post(
+        f"/api/trips/{trip['id']}/items", json={"day": 1, "order_sequence": 1, "place_name": "성산일출봉"}, headers=auth
+    )
+    assert response.status_code == 201, response.text
+    assert query_count(response) == 2
+
+
+async def test_update_item_query_count(client, auth):
+    trip = await create_trip(client, auth, items=2)
+    response = await client.put(f"/api/items/{trip['items'][0]['id']}", json={"memo": "일찍 가기"}, headers=auth)
+    assert response.status_code == 200, response.text
+    assert response.json()["memo"] == "일찍 가기"
+    assert query_count(response) == 2
+
+
+async def test_reorder_items_query_count(client, auth):
+    trip = await create_trip(client, auth, items=20)
+    updates = [{"id": item["id"], "order_sequence": 100 - number} for number, item in enumerate(trip["items"])]
+    response = await client.post("/api/items/reorder", json=updates, headers=auth)
+    assert response.status_code == 200, response.text
+    assert [item["order_sequence"] for item in response.json()] == [update["order_sequence"] for update in updates]
+    assert query_count(response) == 2
+
+
+async def test_delete_item_query_count(client, auth):
+    trip = await create_trip(client, auth, items=2)
+    response = await client.delete(f"/api/items/{trip['items'][0]['id']}", headers=auth)
+    assert response.status_code == 204, response.text
+    assert query_count(response) == 2
+
+
+async def test_delete_trip_query_count(client, auth):
+    trip = await create_trip(client, auth, items=10)
+    response = await client.delete(f"/api/trips/{trip['id']}", headers=auth)
+    assert response.status_code == 204, response.text
+    assert query_count(response) == 2
+    assert (await client.get(f"/api/trips/{trip['id']}", headers=auth)).status_code == 404
+
+
+async def test_other_users_item_is_forbidden(client, auth, other_auth):
+    trip = await create_trip(client, auth, items=2)
+    item_id = trip["items"][0]["id"]
+
+    assert (await client.put(f"/api/items/{item_id}", json={"memo": "x"}, headers=other_auth)).status_code == 403
+    assert (await client.delete(f"/api/items/{item_id}", headers=other_auth)).status_code == 403
+    response = await client.post("/api/items/reorder", json=[{"id": item_id, "order_sequence": 5}], headers=other_auth)
+    assert response.status_code == 403
+
+    # 변경되지 않았는지 확인
+    response = await client.get(f"/api/trips/{trip['id']}", headers=auth)
+    assert response.json()["items"][0] == trip["items"][0]
+
+
+async def test_missing_item_is_not_found(client, auth):
+    assert (await client.put("/api/items/99999", json={"memo": "x"}, headers=auth)).status_code == 404
+    assert (await client.delete("/api/items/99999", headers=auth)).status_code == 404
+    response = await client.post("/api/items/reorder", json=[{"id": 99999, "order_sequence": 1}], headers=auth)
+    assert response.status_code == 404
+
+
+async def test_other_users_trip_is_not_found(client, auth, other_auth):
+    trip = await create_trip(client, auth, items=1)
+    trip_id = trip["id"]
+
+    assert (await client.get(f"/api/trips/{trip_id}", headers=other_auth)).status_code == 404
+    assert (await client.put(f"/api/trips/{trip_id}", json={"title": "x"}, headers=other_auth)).status_code == 404
+    response = await client.post(
+        f"/api/trips/{trip_id}/items", json={"day": 1, "order_sequence": 1, "place_name": "x"}, headers=other_auth
+    )
+    assert response.status_code == 404
+    assert (await client.delete(f"/api/trips/{trip_id}", headers=other_auth)).status_code == 404
+    assert (await client.get(f"/api/trips/{trip_id}", headers=auth)).status_code == 200
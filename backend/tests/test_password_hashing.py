@@ -0,0 +1,53 @@
+"""
+비밀번호 해싱 프로세스 풀 테스트 (password_hashing.py)
+작업 프로세스가 죽어 풀이 망가져도(BrokenProcessPool) 요청이 실패하지 않아야 합니다.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import password_hashing
+
+pytestmark = pytest.mark.anyio
+
+
+class BrokenExecutor:
+    """작업 프로세스가 죽은 ProcessPoolExecutor처럼 모든 작업을 BrokenProcessPool로 끝냅니다."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, func, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def executors(monkeypatch):
+    """get_executor가 차례로 돌려줄 풀 목록"""
+    queue = []
+    monkeypatch.setattr(password_hashing, "get_executor", lambda: queue.pop(0))
+    return queue
+
+
+async def test_broken_pool_is_recreated_and_retried(executors):
+    broken = BrokenExecutor()
+    with ThreadPoolExecutor(1) as healthy:
+        executors += [broken, healthy]
+        hashed = await password_hashing.get_password_hash("password1")
+
+    assert broken.shut_down and not executors
+    assert password_hashing.pwd_context.verify("password1", hashed)
+
+
+async def test_falls_back_to_threadpool_when_pool_stays_broken(executors):
+    executors += [BrokenExecutor(), BrokenExecutor()]
+    hashed = await password_hashing.get_password_hash("password1")
+
+    assert not executors
+    assert password_hashing.pwd_context.verify("password1", hashed)
@@ -0,0 +1,38 @@
+"""
+인증 사용자 캐시 무효화 테스트 (main.invalidate_cached_principal / invalidate_principals_after_bulk_write)
+캐시에 들어간 사용자를 ORM 객체 없이(Core 쿼리로) 수정/삭제해도 다음 요청에서 예전 정보로 인증되지 않아야 합니다.
+"""
+import pytest
+from sqlalchemy import delete, update
+
+import database
+import main
+import models
+from conftest import login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_core_bulk_update_invalidates_cached_principal(client):
+    headers = await login(client, "owner@example.com")
+    assert len(main.principal_cache) == 1
+
+    async with database.get_engines().AsyncSessionLocal() as db:
+        await db.execute(
+            update(models.User.__table__).where(models.User.__table__.c.email == "owner@example.com").values(email="moved@example.com")
+        )
+        await db.commit()
+
+    assert len(main.principal_cache) == 0
+    # (토큰의 이메일과 더 이상 맞지 않으므로 인증 실패)
+    assert (await client.get("/api/trips", headers=headers)).status_code == 401
+
+
+async def test_orm_bulk_delete_invalidates_cached_principal(client):
+    headers = await login(client, "owner@example.com")
+
+    async with database.get_engines().AsyncSessionLocal() as db:
+        await db.execute(delete(models.User).where(models.User.email == "owner@example.com"))
+        await db.commit()
+
+    assert (await client.get("/api/trips", headers=headers)).status_code == 401
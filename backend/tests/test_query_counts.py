@@ -0,0 +1,46 @@
+"""
+(N+1 회귀 테스트) 여행/일정 수와 관계없이 목록/상세/내 정보 조회의 쿼리 수가 일정해야 합니다.
+"""
+import pytest
+
+from conftest import create_trip, query_count
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def trips(client, auth):
+    return [await create_trip(client, auth, items=5) for _ in range(4)]
+
+
+async def test_list_trips_query_count(client, auth, trips):
+    # ETag 확인 1 + 여행 1 + 일정(selectinload) 1
+    response = await client.get("/api/trips", headers=auth)
+    assert response.status_code == 200
+    assert len(response.json()) == len(trips)
+    assert all(len(trip["items"]) == 5 for trip in response.json())
+    assert query_count(response) == 3
+
+
+async def test_list_trips_summary_query_count(client, auth, trips):
+    # ETag 확인 1 + 여행과 일정 개수(상관 서브쿼리) 1
+    response = await client.get("/api/trips", params={"view": "summary"}, headers=auth)
+    assert response.status_code == 200
+    assert [trip["item_count"] for trip in response.json()] == [5] * len(trips)
+    assert query_count(response) == 2
+
+
+async def test_trip_detail_query_count(client, auth, trips):
+    # 여행(소유권 확인) 1 + 정렬된 일정 1
+    response = await client.get(f"/api/trips/{trips[0]['id']}", headers=auth)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
+    assert query_count(response) == 2
+
+
+async def test_users_me_query_count(client, auth, trips):
+    # 사용자 1 + 여행 1 + 일정 1
+    response = await client.get("/api/users/me", headers=auth)
+    assert response.status_code == 200
+    assert len(response.json()["trips"]) == len(trips)
+    assert query_count(response) == 3
@@ -0,0 +1,50 @@
+"""
+요청 속도 제한 테스트 (rate_limit.py)
+"""
+import httpx
+import pytest
+from starlette.responses import PlainTextResponse
+
+from rate_limit import MemoryTokenBucketStore, RateLimitMiddleware, RateLimitPolicy, client_ip
+
+pytestmark = pytest.mark.anyio
+
+
+def scope_with(forwarded: list[str], client: str = "10.0.0.1") -> dict:
+    return {
+        "type": "http",
+        "headers": [(b"x-forwarded-for", value.encode()) for value in forwarded],
+        "client": (client, 50000),
+    }
+
+
+def test_client_ip_uses_rightmost_forwarded_address():
+    assert client_ip(scope_with(["203.0.113.7"]), trust_forwarded=True) == "203.0.113.7"
+    # (클라이언트가 앞에 넣은 값은 무시하고, 프록시가 붙인 마지막 값을 씁니다)
+    assert client_ip(scope_with(["1.2.3.4, 203.0.113.7"]), trust_forwarded=True) == "203.0.113.7"
+    assert client_ip(scope_with(["1.2.3.4", "203.0.113.7"]), trust_forwarded=True) == "203.0.113.7"
+
+
+def test_client_ip_with_multiple_trusted_proxies():
+    forwarded = ["1.2.3.4, 203.0.113.7, 10.0.0.2"]   # (가짜, 클라이언트, CDN이 붙인 내부 프록시 IP)
+    assert client_ip(scope_with(forwarded), trust_forwarded=True, trusted_proxy_hops=2) == "203.0.113.7"
+    assert client_ip(scope_with(["203.0.113.7"]), trust_forwarded=True, trusted_proxy_hops=2) == "203.0.113.7"
+
+
+def test_client_ip_ignores_forwarded_header_by_default():
+    assert client_ip(scope_with(["203.0.113.7"])) == "10.0.0.1"
+
+
+async def test_spoofed_forwarded_address_does_not_get_new_bucket():
+    async def app(scope, receive, send):
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    policy = RateLimitPolicy(name="auth", capacity=3, refill_per_second=0.001, match=lambda method, path: True)
+    middleware = RateLimitMiddleware(app, MemoryTokenBucketStore(), [policy], trust_forwarded=True)
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        statuses = [
+            (await client.post("/api/auth/login", headers={"X-Forwarded-For": f"198.51.100.{n}, 203.0.113.7"})).status_code
+            for n in range(5)
+        ]
+    assert statuses == [200, 200, 200, 429, 429]
@@ -0,0 +1,30 @@
+"""
+일자별 동선 계산 테스트 (main.compute_trip_route)
+"""
+from collections import namedtuple
+
+import main
+
+Row = namedtuple("Row", "id day latitude longitude")
+
+
+def test_already_optimal_order_reports_same_total_as_optimized():
+    # (한 방향으로 약 11m씩 떨어진 장소들: 지금 순서가 가장 짧은 순서)
+    # 구간별로 반올림한 거리를 더하면 55.5m, 반올림 전 합은 55.6m입니다.
+    rows = [Row(id=index + 1, day=1, latitude=33.0 + 0.0001 * index, longitude=126.5) for index in range(6)]
+
+    day = main.compute_trip_route(trip_id=1, version=1, rows=rows).days[0]
+
+    assert day.optimized_item_ids == day.item_ids
+    assert day.total_distance_m == day.optimized_distance_m == 55.6
+    assert [leg.distance_m for leg in day.legs] == [11.1] * 5
+
+
+def test_items_without_coordinates_are_skipped():
+    rows = [Row(1, 1, 33.0, 126.5), Row(2, 1, None, None), Row(3, 1, 33.0001, 126.5)]
+
+    day = main.compute_trip_route(trip_id=1, version=1, rows=rows).days[0]
+
+    assert day.skipped_item_ids == [2]
+    assert day.optimized_item_ids == [1, 3, 2]
+    assert day.total_distance_m == day.optimized_distance_m == 11.1
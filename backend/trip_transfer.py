@@ -0,0 +1,178 @@
+import codecs
+import csv
+import io
+import json
+from datetime import date
+from typing import AsyncIterator, Literal
+
+# --- 여행 데이터 내보내기 / 가져오기 형식 ---
+# ndjson: 한 줄에 하나의 JSON 객체. 여행 줄({"type": "trip", ...}) 다음에 그 여행의 일정 줄({"type": "item", ...})이 옵니다.
+# csv: 한 행에 일정 하나 (여행 정보는 trip_* 열에 반복). 일정이 없는 여행은 일정 열이 비어 있는 행 하나로 나타냅니다.
+
+TransferFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+TRIP_FIELDS = ("id", "title", "start_date", "end_date")
+ITEM_FIELDS = ("id", "trip_id", "day", "order_sequence", "place_name", "address", "memo", "latitude", "longitude")
+CSV_COLUMNS = [
+    "trip_id", "trip_title", "trip_start_date", "trip_end_date",
+    "item_id", "day", "order_sequence", "place_name", "address", "memo", "latitude", "longitude",
+]
+
+# 한 줄(레코드)의 최대 크기 (줄바꿈 없는 거대한 입력으로 메모리를 다 쓰지 않도록)
+MAX_RECORD_CHARS = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    def __init__(self, line: int, message: str):
+        super().__init__(f"{line}번째 줄: {message}")
+        self.line = line
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} 는 JSON으로 변환할 수 없습니다.")
+
+
+class ExportWriter:
+    """
+    (trips LEFT JOIN itinerary_items) 행을 순서대로 받아 내보낼 텍스트 조각으로 바꿉니다.
+    행은 trip_id 순으로 정렬되어 있어야 하며, 한 번에 한 묶음(partition)씩만 메모리에 둡니다.
+    행의 열 이름은 CSV_COLUMNS 와 같습니다.
+    """
+
+    def __init__(self, format: TransferFormat):
+        self.format = format
+        self._last_trip_id = None
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer, lineterminator="\n")
+
+    def header(self) -> str:
+        if self.format == "csv":
+            self._csv.writerow(CSV_COLUMNS)
+            return self._drain()
+        return ""
+
+    def write(self, rows) -> str:
+        for row in rows:
+            if self.format == "csv":
+                self._csv.writerow(["" if value is None else value for value in row])
+                continue
+            if row.trip_id != self._last_trip_id:
+                self._last_trip_id = row.trip_id
+                self._write_json({
+                    "type": "trip",
+                    "id": row.trip_id,
+                    "title": row.trip_title,
+                    "start_date": row.trip_start_date,
+                    "end_date": row.trip_end_date,
+                })
+            if row.item_id is not None:
+                self._write_json({
+                    "type": "item",
+                    "id": row.item_id,
+                    "trip_id": row.trip_id,
+                    **{name: getattr(row, name) for name in ITEM_FIELDS[2:]},
+                })
+        return self._drain()
+
+    def _write_json(self, record: dict):
+        self._buffer.write(json.dumps(record, ensure_ascii=False, default=_json_default))
+        self._buffer.write("\n")
+
+    def _drain(self) -> str:
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """바이트 조각을 UTF-8(BOM 허용)로 풀어 한 줄씩 돌려줍니다."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+        if len(pending) > MAX_RECORD_CHARS:
+            raise ImportFormatError(0, "한 줄이 너무 깁니다.")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def read_records(chunks: AsyncIterator[bytes], format: TransferFormat) -> AsyncIterator[tuple[int, dict]]:
+    """
+    요청 본문을 스트리밍으로 읽어 (줄 번호, 레코드)를 하나씩 돌려줍니다.
+    레코드는 형식과 관계없이 ndjson 줄과 같은 모양({"type": "trip" | "item", ...})입니다.
+    """
+    if format == "ndjson":
+        line_no = 0
+        async for line in _lines(chunks):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                raise ImportFormatError(line_no, "JSON 형식이 올바르지 않습니다.")
+            if not isinstance(record, dict):
+                raise ImportFormatError(line_no, "각 줄은 JSON 객체여야 합니다.")
+            yield line_no, record
+        return
+
+    # CSV: 따옴표 안의 줄바꿈(메모 등)을 위해, 따옴표 개수가 짝수가 될 때까지 줄을 이어 붙여 한 레코드로 읽습니다.
+    header = None
+    seen_trip_ids = set()
+    line_no, start_line, record_text = 0, 0, ""
+    async for line in _lines(chunks):
+        line_no += 1
+        if not record_text:
+            start_line = line_no
+            record_text = line
+        else:
+            record_text += "\n" + line
+        if record_text.count('"') % 2:
+            if len(record_text) > MAX_RECORD_CHARS:
+                raise ImportFormatError(start_line, "한 줄이 너무 깁니다.")
+            continue
+        text, record_text = record_text, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = values
+            missing = [column for column in CSV_COLUMNS if column not in header]
+            if missing:
+                raise ImportFormatError(start_line, f"필요한 열이 없습니다: {', '.join(missing)}")
+            continue
+        if len(values) != len(header):
+            raise ImportFormatError(start_line, "열 개수가 머리글과 다릅니다.")
+        row = {column: (value if value != "" else None) for column, value in zip(header, values)}
+
+        trip_id = row["trip_id"]
+        if trip_id not in seen_trip_ids:
+            seen_trip_ids.add(trip_id)
+            yield start_line, {
+                "type": "trip",
+                "id": trip_id,
+                "title": row["trip_title"],
+                "start_date": row["trip_start_date"],
+                "end_date": row["trip_end_date"],
+            }
+        if row["item_id"] is not None:
+            yield start_line, {
+                "type": "item",
+                "id": row["item_id"],
+                "trip_id": trip_id,
+                **{name: row[name] for name in ITEM_FIELDS[2:]},
+            }
+    if record_text:
+        raise ImportFormatError(start_line, "닫히지 않은 따옴표가 있습니다.")
@@ -1,4 +1,4 @@
-import React, { createContext, useContext, useState, useEffect } from 'react';
+import React, { createContext, useContext, useState, useEffect, useCallback } from 'react';
 import axios from 'axios';
 
 const API_URL = 'http://127.0.0.1:8000';
@@ -65,9 +65,10 @@ export function AuthProvider({ children }) {
   };
 
   // 5. 로그아웃 함수
-  const logout = () => {
+  // (useCallback) effect 의존성으로 쓰는 페이지가 있으므로 렌더링마다 새로 만들지 않습니다.
+  const logout = useCallback(() => {
     setToken(null); // 토큰 상태를 null로 변경 -> useEffect가 실행됨
-  };
+  }, []);
 
   // 6. Context를 통해 공유할 값들
   const value = {
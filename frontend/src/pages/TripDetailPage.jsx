@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useRef, useMemo } from 'react'
+import React, { useState, useEffect, useRef, useMemo, useCallback } from 'react'
 import { useParams, Link, useNavigate, useSearchParams } from 'react-router-dom'
 import { useAuth } from '../context/AuthContext' 
 import '../App.css'
@@ -112,7 +112,8 @@ export default function TripDetailPage() {
   }, [isLoaded]);
   
   // 7. API 호출 함수: fetchTripDetails
-  const fetchTripDetails = () => {
+  // (useCallback) 아래 effect들의 의존성으로 쓰이므로, tripId/token이 바뀔 때만 새로 만듭니다.
+  const fetchTripDetails = useCallback(() => {
     // 토큰이 없으면 요청하지 않음 (방어 코드)
     if (!token) return;
 
@@ -145,7 +146,7 @@ export default function TripDetailPage() {
           navigate('/'); 
         }
       })
-  }
+  }, [api, token, tripId, logout, navigate])
 
   // 8. 페이지 로드 시 데이터 호출
   useEffect(() => {
@@ -155,7 +156,53 @@ export default function TripDetailPage() {
       setLoading(false);
       setError("이 페이지에 접근하려면 로그인이 필요합니다.");
     }
-  }, [tripId, token])
+  }, [token, fetchTripDetails])
+
+  // 8-1. 실시간 알림: 다른 탭/기기에서 바뀐 내용을 다시 조회하지 않고 바로 반영합니다.
+  const tripRef = useRef(null);
+  useEffect(() => { tripRef.current = trip; }, [trip]);
+
+  useEffect(() => {
+    if (!token) return;
+    const wsUrl = `${api.defaults.baseURL.replace(/^http/, 'ws')}/ws/trips/${tripId}`;
+    const socket = new WebSocket(wsUrl);
+    // (토큰은 URL에 넣으면 서버/프록시 로그에 남으므로 연결 직후 첫 메시지로 보냅니다)
+    socket.onopen = () => socket.send(JSON.stringify({ type: 'auth', token }));
+    socket.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      const current = tripRef.current;
+      if (event.type === 'deleted') {
+        navigate('/');
+        return;
+      }
+      if (event.type === 'resync') {
+        fetchTripDetails(); // (연결이 느려 놓친 변경이 있음)
+        return;
+      }
+      // 이미 반영된 변경(내가 보낸 요청 등)은 건너뛰고, 중간에 놓친 version이 있으면 다시 조회합니다.
+      if (!current || event.version <= current.version) return;
+      if (event.type === 'subscribed' || event.version !== current.version + 1) {
+        fetchTripDetails();
+        return;
+      }
+
+      let next;
+      if (event.type === 'trip') {
+        next = { ...current, version: event.version, title: event.title, start_date: event.start_date, end_date: event.end_date };
+      } else {
+        const changedIds = new Set(event.items.map(item => item.id));
+        const deletedIds = new Set(event.deleted_item_ids);
+        const items = current.items
+          .filter(item => !changedIds.has(item.id) && !deletedIds.has(item.id))
+          .concat(event.items)
+          .sort((a, b) => a.day - b.day || a.order_sequence - b.order_sequence || a.id - b.id);
+        next = { ...current, version: event.version, items };
+      }
+      tripRef.current = next;
+      setTrip(next);
+    };
+    return () => socket.close();
+  }, [api, tripId, token, navigate, fetchTripDetails])
 
   // 9. Autocomplete 핸들러
   const onLoad = (autocompleteInstance) => setAutocomplete(autocompleteInstance);
@@ -190,14 +237,16 @@ export default function TripDetailPage() {
     
     setError('');
     try {
-      const response = await api.post(`/api/trips/${tripId}/items`, newItemData);
+      // (return=trip) 응답으로 갱신된 여행 전체를 받아 다시 조회하지 않습니다.
+      const response = await api.post(`/api/trips/${tripId}/items?return=trip`, newItemData);
       setSearchMemo("");
       setSelectedPlace(null);
       if (autocompleteInputRef.current) {
         autocompleteInputRef.current.value = "";
       }
-      fetchTripDetails(); 
-      setHighlightedItemId(response.data.id); 
+      setTrip(response.data);
+      const newItem = response.data.items.reduce((last, item) => (item.id > last.id ? item : last));
+      setHighlightedItemId(newItem.id); 
     } catch (err) {
       setError("일정 추가에 실패했습니다.");
       if (err.response && err.response.status === 401) logout();
@@ -227,12 +276,12 @@ export default function TripDetailPage() {
     setError('');
 
     try {
-      await api.put(`/api/items/${currentItemToEdit.id}`, {
+      const response = await api.put(`/api/items/${currentItemToEdit.id}?return=trip`, {
         memo: modalEditMemo,
         day: modalEditDay 
       });
       closeMemoModal();
-      fetchTripDetails(); 
+      setTrip(response.data); 
     } catch (err) {
       setError("일정 수정에 실패했습니다."); 
       if (err.response && err.response.status === 401) logout();
@@ -244,8 +293,8 @@ export default function TripDetailPage() {
     if (!window.confirm("이 일정을 삭제하시겠습니까?")) return;
     setError('');
     try {
-      await api.delete(`/api/items/${itemId}`);
-      fetchTripDetails(); 
+      const response = await api.delete(`/api/items/${itemId}?return=trip`);
+      setTrip(response.data); 
     } catch (err) {
       setError("일정 삭제에 실패했습니다.");
       if (err.response && err.response.status === 401) logout();
@@ -279,13 +328,14 @@ export default function TripDetailPage() {
     
     setError('');
     try {
-      await api.put(`/api/trips/${tripId}`, {
+      // 수정 응답에 일정까지 포함된 여행 전체가 오므로 다시 조회하지 않습니다.
+      const response = await api.put(`/api/trips/${tripId}`, {
         title: modalEditTitle,
         start_date: modalEditStartDate || null,
         end_date: modalEditEndDate || null
       });
       closeTripEditModal();
-      fetchTripDetails(); 
+      setTrip(response.data); 
     } catch (err) {
       setError("여행 정보 수정에 실패했습니다.");
       if (err.response && err.response.status === 401) logout();
@@ -322,10 +372,9 @@ export default function TripDetailPage() {
       setItemsForSelectedDay([]);
       return;
     }
-    const filteredAndSortedItems = trip.items
-      .filter(item => item.day === selectedDay)
-      .sort((a, b) => a.order_sequence - b.order_sequence);
-    setItemsForSelectedDay(filteredAndSortedItems);
+    // 서버가 (day, order_sequence) 순으로 정렬해서 보내주므로 다시 정렬하지 않습니다.
+    const itemsOfDay = trip.items.filter(item => item.day === selectedDay);
+    setItemsForSelectedDay(itemsOfDay);
   }, [trip, selectedDay]);
 
   // 19. Polyline 경로 계산